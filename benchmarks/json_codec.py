@@ -0,0 +1,95 @@
+"""Compare the SDK JSON codec with stdlib json.
+
+Usage:
+    python benchmarks/json_codec.py
+
+Decodes the metadata fixtures of tests/data, a native UAPKI result with
+a 4 MB base64 payload and encodes a branch creation request body.
+"""
+import base64
+import json
+import os
+import timeit
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+from diia_client import codec
+from diia_client.enums import DocumentType
+from diia_client.sdk.service.branch_service import make_branch
+
+
+DATA_PATH = Path(__file__).parent.parent / "tests" / "data"
+
+
+def stdlib_loads(data: bytes) -> Any:
+    # as done before the codec: decode bytes to str, then parse
+    return json.loads(data.decode("utf-8"))
+
+
+def stdlib_dumps(obj: Any) -> bytes:
+    # as done by requests for `json=` argument
+    return json.dumps(obj, allow_nan=False).encode("utf-8")
+
+
+def measure(func: Callable[[], Any]) -> float:
+    number, _ = timeit.Timer(func).autorange()
+    best = min(timeit.Timer(func).repeat(repeat=5, number=number))
+    return best / number * 1e6
+
+
+def main() -> None:
+    cases: List[Tuple[str, Callable[[], Any], Callable[[], Any]]] = []
+
+    for path in sorted(DATA_PATH.glob("*.json")):
+        data = path.read_bytes()
+        cases.append(
+            (
+                f"loads {path.name} ({len(data)} B)",
+                lambda data=data: stdlib_loads(data),
+                lambda data=data: codec.loads(data),
+            )
+        )
+
+    payload = base64.b64encode(os.urandom(3 * 1024 * 1024)).decode()
+    native_result = json.dumps(
+        {"errorCode": 0, "method": "UNWRAP", "result": {"bytes": payload}}
+    ).encode()
+    cases.append(
+        (
+            f"loads UAPKI result ({len(native_result) // 1024} KB)",
+            lambda: stdlib_loads(native_result),
+            lambda: codec.loads(native_result),
+        )
+    )
+
+    branch = make_branch(
+        name="Назва відділення",
+        email="test@email.com",
+        region="Київська обл.",
+        district="Києво-Святошинський р-н",
+        location="м. Вишневе",
+        street="вул. Київська",
+        house="2г",
+        sharing=DocumentType.get_types_for_sharing(),
+    ).dict(by_alias=True)
+    cases.append(
+        (
+            "dumps branch",
+            lambda: stdlib_dumps(branch),
+            lambda: codec.dumps(branch),
+        )
+    )
+
+    print(f"codec: {codec._loads.__module__}")
+    print(f"{'case':<44}{'stdlib, us':>12}{'codec, us':>12}{'speedup':>9}")
+    for name, stdlib_func, codec_func in cases:
+        stdlib_time = measure(stdlib_func)
+        codec_time = measure(codec_func)
+        print(
+            f"{name:<44}{stdlib_time:>12.1f}{codec_time:>12.1f}"
+            f"{stdlib_time / codec_time:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
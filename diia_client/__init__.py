@@ -1,7 +1,35 @@
-from diia_client.crypto.base_service import AbstractCryptoService
-from diia_client.enums import DiiaIDAction, DocumentType
+from diia_client.crypto.base_service import AbstractCryptoService, AbstractHash
+from diia_client.crypto.pool import ProcessPoolCryptoService
+from diia_client.enums import (
+    ChangeAction,
+    CircuitState,
+    DiiaIDAction,
+    DocumentType,
+    EndpointFamily,
+)
+from diia_client.exceptions import (
+    CircuitOpenError,
+    DeadlineExceeded,
+    DiiaClientException,
+    RateLimitExceeded,
+)
+from diia_client.sdk.async_diia import AsyncDiia
+from diia_client.sdk.bulk import BulkItemResult, BulkResult
+from diia_client.sdk.cache import CacheConfig, CacheStats
+from diia_client.sdk.deadline import deadline
+from diia_client.sdk.deep_link_pool import (
+    AsyncDeepLinkPool,
+    DeepLinkPool,
+    DeepLinkPoolConfig,
+    DeepLinkPoolStats,
+)
 from diia_client.sdk.diia import Diia
-from diia_client.sdk.http.base_client import AbstractHTTPCLient
+from diia_client.sdk.hash_cache import HashCache, HashCacheConfig, HashCacheStats
+from diia_client.sdk.http.base_client import (
+    AbstractAsyncHTTPClient,
+    AbstractHTTPCLient,
+    Timeout,
+)
 from diia_client.sdk.model.auth_deep_link import AuthDeepLink
 from diia_client.sdk.model.birth_certificate import (
     Act,
@@ -12,9 +40,11 @@ from diia_client.sdk.model.birth_certificate import (
     Parents,
 )
 from diia_client.sdk.model.decoded_file import DecodedFile
+from diia_client.sdk.model.deep_link import DeepLink
 from diia_client.sdk.model.document_package import DocumentPackage
+from diia_client.sdk.model.document_request import DocumentRequest
 from diia_client.sdk.model.encoded_file import EncodedFile
-from diia_client.sdk.model.file import File
+from diia_client.sdk.model.file import AnyFile, File, PathFile, StreamFile
 from diia_client.sdk.model.foreign_passport import ForeignPassport
 from diia_client.sdk.model.hashed_file import HashedFile
 from diia_client.sdk.model.internal_passport import InternalPassport
@@ -26,46 +56,110 @@ from diia_client.sdk.model.reference_internally_displaced_person import (
 )
 from diia_client.sdk.model.signatures_package import Signature, SignaturePackage
 from diia_client.sdk.model.taxpayer_card import TaxpayerCard
+from diia_client.sdk.model.validation_result import ValidationResult
+from diia_client.sdk.offer_registry import OfferRegistry
+from diia_client.sdk.reconciler import (
+    Change,
+    DesiredBranch,
+    DesiredState,
+    Plan,
+    Reconciler,
+)
+from diia_client.sdk.remote.circuit_breaker import CircuitBreakerConfig
 from diia_client.sdk.remote.model.branch import Branch
 from diia_client.sdk.remote.model.branch_list import BranchList
 from diia_client.sdk.remote.model.branch_scopes import BranchScopes
 from diia_client.sdk.remote.model.offer import Offer
 from diia_client.sdk.remote.model.offer_list import OfferList
 from diia_client.sdk.remote.model.offer_scopes import OfferScopes
+from diia_client.sdk.remote.rate_limiter import RateLimit, RateLimiter
+from diia_client.sdk.remote.retry import RetryAttempt, RetryBudget, RetryPolicy
+from diia_client.sdk.signing_campaign import SigningCampaign
+from diia_client.sdk.token_store import (
+    AbstractTokenStore,
+    FileTokenStore,
+    MemoryTokenStore,
+)
 
 
 __all__ = [
+    "AbstractAsyncHTTPClient",
     "AbstractCryptoService",
     "AbstractHTTPCLient",
+    "AbstractHash",
+    "AbstractTokenStore",
     "Act",
     "Address",
+    "AnyFile",
+    "AsyncDeepLinkPool",
+    "AsyncDiia",
     "AuthDeepLink",
     "BirthCertificate",
     "Branch",
     "BranchList",
     "BranchScopes",
+    "BulkItemResult",
+    "BulkResult",
+    "CacheConfig",
+    "CacheStats",
+    "Change",
+    "ChangeAction",
     "Child",
+    "CircuitBreakerConfig",
+    "CircuitOpenError",
+    "CircuitState",
     "Data",
+    "DeadlineExceeded",
     "DecodedFile",
+    "DeepLink",
+    "DeepLinkPool",
+    "DeepLinkPoolConfig",
+    "DeepLinkPoolStats",
+    "DesiredBranch",
+    "DesiredState",
     "Diia",
+    "DiiaClientException",
     "DiiaIDAction",
     "DocIdentity",
     "Document",
     "DocumentPackage",
+    "DocumentRequest",
     "DocumentType",
     "EncodedFile",
+    "EndpointFamily",
     "File",
+    "FileTokenStore",
     "ForeignPassport",
+    "HashCache",
+    "HashCacheConfig",
+    "HashCacheStats",
     "HashedFile",
     "InternalPassport",
+    "MemoryTokenStore",
     "Metadata",
     "Offer",
     "OfferList",
+    "OfferRegistry",
     "OfferScopes",
     "Parent",
     "Parents",
+    "PathFile",
+    "Plan",
+    "ProcessPoolCryptoService",
+    "RateLimit",
+    "RateLimitExceeded",
+    "RateLimiter",
+    "Reconciler",
     "ReferenceInternallyDisplacedPerson",
+    "RetryAttempt",
+    "RetryBudget",
+    "RetryPolicy",
     "Signature",
     "SignaturePackage",
+    "SigningCampaign",
+    "StreamFile",
     "TaxpayerCard",
+    "Timeout",
+    "ValidationResult",
+    "deadline",
 ]
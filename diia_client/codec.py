@@ -0,0 +1,64 @@
+"""JSON codec used by the SDK for requests, responses and decrypted data.
+
+orjson is used when installed (`orjson` extra), stdlib json otherwise.
+Any other library (e.g. msgspec) can be plugged in with set_json_codec.
+"""
+import json
+from typing import Any, Callable, Union
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+Loads = Callable[[Union[bytes, str]], Any]
+Dumps = Callable[[Any], bytes]
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+if orjson is not None:
+    _loads: Loads = orjson.loads
+    _dumps: Dumps = orjson.dumps
+else:  # pragma: no cover
+    _loads = json.loads
+    _dumps = _stdlib_dumps
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Deserialize JSON from str or UTF-8 encoded bytes.
+
+    orjson parses bytes directly, while stdlib json decodes them to str first.
+    """
+    return _loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 encoded JSON."""
+    return _dumps(obj)
+
+
+def set_json_codec(loads: Loads, dumps: Dumps) -> None:
+    """Replace the JSON codec of the SDK.
+
+    Example:
+        import msgspec
+
+        set_json_codec(msgspec.json.decode, msgspec.json.encode)
+
+    Args:
+        loads: Function deserializing bytes or str.
+        dumps: Function serializing an object to UTF-8 encoded bytes.
+    """
+    global _loads, _dumps
+    _loads = loads
+    _dumps = dumps
+
+
+def use_stdlib_json_codec() -> None:
+    """Use stdlib json, e.g. to compare results with the fast codec."""
+    set_json_codec(json.loads, _stdlib_dumps)
@@ -1,4 +1,30 @@
+import base64
 from abc import ABC, abstractmethod
+from typing import Iterable, List, Sequence, Union
+
+from diia_client.types import Buffer
+
+
+class AbstractHash(ABC):
+    """Incremental hash: update() it with chunks of data, then digest() once."""
+
+    def __enter__(self) -> "AbstractHash":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @abstractmethod
+    def update(self, data: Buffer) -> None:
+        ...
+
+    @abstractmethod
+    def digest(self) -> bytes:
+        """Finish the hash, returning the raw hash."""
+        ...
+
+    def close(self) -> None:
+        """Free resources of an unfinished hash."""
 
 
 class AbstractCryptoService(ABC):
@@ -9,3 +35,48 @@ class AbstractCryptoService(ABC):
     @abstractmethod
     def calc_hash(self, data: str) -> str:
         ...
+
+    def decrypt_bytes(self, encrypted_data: Union[str, bytes]) -> bytes:
+        """Decrypt base64 encoded data, returning the decrypted content."""
+        if isinstance(encrypted_data, bytes):
+            encrypted_data = encrypted_data.decode()
+        return base64.b64decode(self.decrypt(encrypted_data))
+
+    def calc_hash_bytes(self, data: Buffer) -> bytes:
+        """Hash raw data, returning the raw hash."""
+        return base64.b64decode(self.calc_hash(base64.b64encode(data).decode()))
+
+    def calc_hashes(self, data: Sequence[Buffer]) -> List[bytes]:
+        """Hash several items, see calc_hash_bytes; in parallel if the service can."""
+        return [self.calc_hash_bytes(item) for item in data]
+
+    def new_hash(self) -> AbstractHash:
+        """Start an incremental hash, equal to calc_hash_bytes of all the data.
+
+        By default the data is buffered until digest(); services hashing
+        natively keep the memory flat.
+        """
+        return _BufferedHash(self)
+
+    def hash_chunks(self, chunks: Iterable[Buffer]) -> bytes:
+        """Hash data given by chunks, see new_hash."""
+        with self.new_hash() as hash_:
+            for chunk in chunks:
+                hash_.update(chunk)
+            return hash_.digest()
+
+    def decrypt_many(self, encrypted_data: Sequence[str]) -> List[bytes]:
+        """Decrypt several items, see decrypt_bytes; in parallel if the service can."""
+        return [self.decrypt_bytes(data) for data in encrypted_data]
+
+
+class _BufferedHash(AbstractHash):
+    def __init__(self, service: AbstractCryptoService) -> None:
+        self._service = service
+        self._data = bytearray()
+
+    def update(self, data: Buffer) -> None:
+        self._data += data
+
+    def digest(self) -> bytes:
+        return self._service.calc_hash_bytes(self._data)
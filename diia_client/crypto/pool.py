@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Sequence, Union
+
+from diia_client.crypto.base_service import AbstractCryptoService
+from diia_client.exceptions import DiiaClientException
+from diia_client.types import Buffer
+
+
+CryptoServiceFactory = Callable[[], AbstractCryptoService]
+
+# crypto service of a worker process
+_service: Optional[AbstractCryptoService] = None
+
+
+def _init_worker(factory: CryptoServiceFactory) -> None:
+    global _service
+    _service = factory()
+
+
+def _call(method: str, *args: Any) -> Any:
+    return getattr(_service, method)(*args)
+
+
+def _is_ready() -> bool:
+    return _service is not None
+
+
+class ProcessPoolCryptoService(AbstractCryptoService):
+    """Crypto service running calls in a pool of worker processes.
+
+    Every worker has its own crypto service made by the factory, so
+    services that aren't thread-safe (e.g. native libraries with global
+    state) decrypt in parallel on all cores. Calls are queued, up to
+    `max_pending` at once; callers beyond that wait for a free slot.
+
+    The factory is pickled into workers, so it must be a module-level
+    function, class or functools.partial of them.
+    """
+
+    def __init__(
+        self,
+        factory: CryptoServiceFactory,
+        *,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        mp_context: Optional[Any] = None,
+    ) -> None:
+        """
+        Args:
+            factory: Function making the crypto service of a worker.
+            workers: Number of worker processes, the number of CPUs by default.
+            max_pending: Max number of queued and running calls,
+              twice the number of workers by default.
+            mp_context: Multiprocessing context, "spawn" by default
+              as forking a process with threads isn't safe.
+
+        Raises:
+            DiiaClientException: If the crypto service can't be made.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self._pending = threading.BoundedSemaphore(max_pending or 2 * self.workers)
+        self._executor = ProcessPoolExecutor(
+            self.workers,
+            mp_context=mp_context or multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(factory,),
+        )
+        # fail fast on errors of the factory, e.g. a wrong key password
+        self._result(self._submit(_is_ready))
+
+    def __enter__(self) -> "ProcessPoolCryptoService":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def decrypt(self, encrypted_data: str) -> str:
+        return self._result(self._submit(_call, "decrypt", encrypted_data))
+
+    def calc_hash(self, data: str) -> str:
+        return self._result(self._submit(_call, "calc_hash", data))
+
+    def decrypt_bytes(self, encrypted_data: Union[str, bytes]) -> bytes:
+        return self._result(self._submit(_call, "decrypt_bytes", encrypted_data))
+
+    def calc_hash_bytes(self, data: Buffer) -> bytes:
+        # memoryviews and mmaps can't be pickled
+        return self._result(self._submit(_call, "calc_hash_bytes", bytes(data)))
+
+    def calc_hashes(self, data: Sequence[Buffer]) -> List[bytes]:
+        futures = [self._submit(_call, "calc_hash_bytes", bytes(item)) for item in data]
+        return [self._result(future) for future in futures]
+
+    def decrypt_many(self, encrypted_data: Sequence[str]) -> List[bytes]:
+        futures = [
+            self._submit(_call, "decrypt_bytes", data) for data in encrypted_data
+        ]
+        return [self._result(future) for future in futures]
+
+    def _submit(self, func: Callable[..., Any], *args: Any) -> "Future[Any]":
+        self._pending.acquire()
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        return future
+
+    def _result(self, future: "Future[Any]") -> Any:
+        try:
+            return future.result()
+        except BrokenProcessPool as e:
+            raise DiiaClientException("Crypto worker error", e) from None
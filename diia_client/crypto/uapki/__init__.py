@@ -1,4 +1,4 @@
-from .uapki import UAPKICryptoService
+from .uapki import UAPKICryptoService, UAPKIPoolCryptoService
 
 
-__all__ = ["UAPKICryptoService"]
+__all__ = ["UAPKICryptoService", "UAPKIPoolCryptoService"]
@@ -1,13 +1,18 @@
+import base64
 import json
 import os
+import threading
+from functools import partial
 from pathlib import Path
 from sys import platform
-from typing import Optional
+from typing import List, Optional, Sequence, Union
 
-from diia_client.crypto.base_service import AbstractCryptoService
+from diia_client.crypto.base_service import AbstractCryptoService, AbstractHash
+from diia_client.crypto.pool import ProcessPoolCryptoService
+from diia_client.crypto.uapki.uapkic import UAPKIC
 from diia_client.crypto.uapki.vendor.wrapper import UAPKI
 from diia_client.exceptions import DiiaClientException
-from diia_client.types import DataDict
+from diia_client.types import Buffer, DataDict
 
 
 BASE_DIR = Path(__file__).parent
@@ -24,7 +29,13 @@ else:
 
 
 class UAPKICryptoService(AbstractCryptoService):
-    """https://github.com/specinfo-ua/UAPKI"""
+    """https://github.com/specinfo-ua/UAPKI
+
+    Decryption calls to the library are serialized, as it isn't known to
+    be re-entrant; see UAPKIPoolCryptoService for parallel decryption.
+    Hashes are calculated by the uapkic library directly, on raw bytes
+    and in parallel threads.
+    """
 
     def __init__(
         self,
@@ -66,6 +77,8 @@ class UAPKICryptoService(AbstractCryptoService):
         self.diia_issuer_certificate = diia_issuer_certificate
 
         self._uapki = UAPKI()
+        self._uapkic = UAPKIC(str(VENDOR_DIR))
+        self._lock = threading.Lock()
         self._init_uapki_config()
 
     def _init_uapki_config(self) -> None:
@@ -119,9 +132,22 @@ class UAPKICryptoService(AbstractCryptoService):
             DiiaClientException
         """
 
-        _data: DataDict = self._uapki.Unwrap(encrypted_data)
-        self._check_result(_data, "Decryption error")
-        return _data["result"]["bytes"]
+        return self._unwrap(encrypted_data)
+
+    def decrypt_bytes(self, encrypted_data: Union[str, bytes]) -> bytes:
+        """Decrypt data.
+
+        Args:
+            encrypted_data: Base64 encoded encrypted data, bytes aren't copied
+
+        Returns:
+            Decrypted content
+
+        Raises:
+            DiiaClientException
+        """
+
+        return base64.b64decode(self._unwrap(encrypted_data))
 
     def calc_hash(self, data: str) -> str:
         """Hash data.
@@ -136,6 +162,101 @@ class UAPKICryptoService(AbstractCryptoService):
             DiiaClientException
         """
 
-        _data: DataDict = self._uapki.DigestGost34311(data)
-        self._check_result(_data, "Calculate hash error")
+        return base64.b64encode(self.calc_hash_bytes(base64.b64decode(data))).decode()
+
+    def calc_hash_bytes(self, data: Buffer) -> bytes:
+        """Hash data with GOST 34.311.
+
+        Args:
+            data: Data, also a bytearray, memoryview or mmap; it isn't copied.
+
+        Returns:
+            Hash.
+
+        Raises:
+            DiiaClientException
+        """
+
+        return self._uapkic.digest(data)
+
+    def calc_hashes(self, data: Sequence[Buffer]) -> List[bytes]:
+        """Hash several items with GOST 34.311 in parallel threads.
+
+        Args:
+            data: Items, see calc_hash_bytes.
+
+        Returns:
+            Hashes in the order of items.
+
+        Raises:
+            DiiaClientException
+        """
+
+        return self._uapkic.digest_many(data)
+
+    def new_hash(self) -> AbstractHash:
+        """Start an incremental GOST 34.311 hash, see calc_hash_bytes.
+
+        Chunks of data are hashed by the library as they come, so the
+        memory stays flat whatever the size of the data.
+        """
+
+        return self._uapkic.new_hash()
+
+    def _unwrap(self, encrypted_data: Union[str, bytes]) -> str:
+        with self._lock:
+            _data: DataDict = self._uapki.Unwrap(encrypted_data)
+        self._check_result(_data, "Decryption error")
         return _data["result"]["bytes"]
+
+
+class UAPKIPoolCryptoService(ProcessPoolCryptoService):
+    """UAPKICryptoService decrypting in parallel in worker processes.
+
+    Every worker process initializes its own UAPKI library, see
+    ProcessPoolCryptoService. Close the service to stop the workers.
+    Hashing doesn't need the key, so data is hashed in the calling
+    process as in UAPKICryptoService, without copying it to workers.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        password: str,
+        certificate: str,
+        subject_key_id: str,
+        diia_certificate: str,
+        diia_certificate_kep: str,
+        diia_issuer_certificate: Optional[str] = None,
+        *,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        """See UAPKICryptoService and ProcessPoolCryptoService."""
+        super().__init__(
+            partial(
+                UAPKICryptoService,
+                key=key,
+                password=password,
+                certificate=certificate,
+                subject_key_id=subject_key_id,
+                diia_certificate=diia_certificate,
+                diia_certificate_kep=diia_certificate_kep,
+                diia_issuer_certificate=diia_issuer_certificate,
+            ),
+            workers=workers,
+            max_pending=max_pending,
+        )
+        self._uapkic = UAPKIC(str(VENDOR_DIR))
+
+    def calc_hash(self, data: str) -> str:
+        return base64.b64encode(self.calc_hash_bytes(base64.b64decode(data))).decode()
+
+    def calc_hash_bytes(self, data: Buffer) -> bytes:
+        return self._uapkic.digest(data)
+
+    def calc_hashes(self, data: Sequence[Buffer]) -> List[bytes]:
+        return self._uapkic.digest_many(data)
+
+    def new_hash(self) -> AbstractHash:
+        return self._uapkic.new_hash()
@@ -0,0 +1,159 @@
+"""ctypes binding of hash functions of the uapkic library of UAPKI.
+
+Data is passed to the library as is, without the JSON and base64
+encoding of the UAPKI wrapper.
+"""
+import ctypes
+import os
+from concurrent.futures import ThreadPoolExecutor
+from sys import platform
+from typing import Any, List, Optional, Sequence
+
+from diia_client.crypto.base_service import AbstractHash
+from diia_client.exceptions import DiiaClientException
+from diia_client.types import Buffer
+
+
+# HashAlg of uapkic
+HASH_ALG_GOST34311 = 4
+
+# data is copied to the library by chunks, to keep the memory flat
+CHUNK_SIZE = 1 << 20
+
+if platform == "win32":
+    LIB_NAME = "uapkic.dll"
+elif platform == "darwin":
+    LIB_NAME = "libuapkic.2.0.0.dylib"
+else:
+    LIB_NAME = "libuapkic.so.2.0.0"
+
+
+class UAPKIC:
+    def __init__(self, lib_dir: str) -> None:
+        """Load the library from the directory.
+
+        Raises:
+            OSError: If the library can't be loaded.
+        """
+        lib = ctypes.CDLL(os.path.join(lib_dir, LIB_NAME))
+
+        lib.ba_alloc_from_uint8.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+        lib.ba_alloc_from_uint8.restype = ctypes.c_void_p
+        lib.ba_get_buf_const.argtypes = [ctypes.c_void_p]
+        lib.ba_get_buf_const.restype = ctypes.c_void_p
+        lib.ba_get_len.argtypes = [ctypes.c_void_p]
+        lib.ba_get_len.restype = ctypes.c_size_t
+        lib.ba_free.argtypes = [ctypes.c_void_p]
+        lib.ba_free.restype = None
+
+        lib.hash_alloc.argtypes = [ctypes.c_int]
+        lib.hash_alloc.restype = ctypes.c_void_p
+        lib.hash_update.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        lib.hash_update.restype = ctypes.c_int
+        lib.hash_final.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p)]
+        lib.hash_final.restype = ctypes.c_int
+        lib.hash_free.argtypes = [ctypes.c_void_p]
+        lib.hash_free.restype = None
+
+        self._lib = lib
+
+    def new_hash(self, alg: int = HASH_ALG_GOST34311) -> "NativeHash":
+        return NativeHash(self._lib, alg)
+
+    def digest(self, data: Buffer, alg: int = HASH_ALG_GOST34311) -> bytes:
+        with self.new_hash(alg) as hash_:
+            hash_.update(data)
+            return hash_.digest()
+
+    def digest_many(
+        self,
+        data: Sequence[Buffer],
+        alg: int = HASH_ALG_GOST34311,
+        *,
+        workers: Optional[int] = None,
+    ) -> List[bytes]:
+        """Hash several buffers in parallel threads, keeping their order.
+
+        The library is called without the GIL and hashes of different
+        contexts don't share state, so threads hash on all cores.
+        """
+        workers = min(len(data), workers or os.cpu_count() or 1)
+        if workers <= 1:
+            return [self.digest(item, alg) for item in data]
+        with ThreadPoolExecutor(workers) as executor:
+            return list(executor.map(lambda item: self.digest(item, alg), data))
+
+
+class NativeHash(AbstractHash):
+    """Incremental hash of the library, usable by one thread at a time.
+
+    Native memory is freed by `digest()` or `close()`.
+    """
+
+    def __init__(self, lib: Any, alg: int) -> None:
+        self._lib = lib
+        self._ctx: Optional[int] = lib.hash_alloc(alg)
+        if not self._ctx:
+            raise DiiaClientException("Hash init error", alg)
+
+    def __del__(self) -> None:
+        self.close()
+
+    def update(self, data: Buffer) -> None:
+        view = memoryview(data).cast("B")
+        if not view:
+            return
+        address = _get_address(data, view)
+        for start in range(0, len(view), CHUNK_SIZE):
+            end = min(start + CHUNK_SIZE, len(view))
+            if address is None:
+                chunk = bytes(view[start:end])
+                self._update(
+                    ctypes.cast(ctypes.c_char_p(chunk), ctypes.c_void_p).value,
+                    len(chunk),
+                )
+            else:
+                self._update(address + start, end - start)
+
+    def digest(self) -> bytes:
+        """Finish the hash and free it."""
+        out = ctypes.c_void_p()
+        try:
+            if self._lib.hash_final(self._get_ctx(), ctypes.byref(out)) != 0:
+                raise DiiaClientException("Hash final error")
+            return ctypes.string_at(
+                self._lib.ba_get_buf_const(out), self._lib.ba_get_len(out)
+            )
+        finally:
+            if out:
+                self._lib.ba_free(out)
+            self.close()
+
+    def close(self) -> None:
+        if self._ctx:
+            self._lib.hash_free(self._ctx)
+            self._ctx = None
+
+    def _update(self, address: Optional[int], size: int) -> None:
+        ba = self._lib.ba_alloc_from_uint8(address, size)
+        if not ba:
+            raise DiiaClientException("Hash update error")
+        try:
+            if self._lib.hash_update(self._get_ctx(), ba) != 0:
+                raise DiiaClientException("Hash update error")
+        finally:
+            self._lib.ba_free(ba)
+
+    def _get_ctx(self) -> int:
+        if not self._ctx:
+            raise DiiaClientException("Hash is finished")
+        return self._ctx
+
+
+def _get_address(data: Buffer, view: memoryview) -> Optional[int]:
+    """Address of the data to pass it without copying, None if unknown."""
+    if isinstance(data, bytes):
+        return ctypes.cast(ctypes.c_char_p(data), ctypes.c_void_p).value
+    if not view.readonly and view.c_contiguous:
+        return ctypes.addressof(ctypes.c_char.from_buffer(view))
+    return None
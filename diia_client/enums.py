@@ -46,3 +46,35 @@ class DocumentType(str, Enum):
             DocumentType.REFERENCE_INTERNALLY_DISPLACED_PERSON,
             DocumentType.BIRTH_CERTIFICATE,
         ]
+
+
+@unique
+class EndpointFamily(str, Enum):
+    """Group of Diia API endpoints sharing resilience settings."""
+
+    AUTH = "auth"
+    BRANCHES = "branches"
+    OFFERS = "offers"
+    OFFER_REQUEST = "offer-request"
+    DOCUMENT_REQUEST = "document-request"
+    DOCUMENT_IDENTIFICATION = "document-identification"
+
+
+@unique
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+@unique
+class ChangeAction(str, Enum):
+    """Change of branches and offers planned by Reconciler."""
+
+    CREATE_BRANCH = "create-branch"
+    UPDATE_BRANCH = "update-branch"
+    DELETE_BRANCH = "delete-branch"
+    CREATE_OFFER = "create-offer"
+    # Diia can't update offers, so changed ones are deleted and created anew
+    REPLACE_OFFER = "replace-offer"
+    DELETE_OFFER = "delete-offer"
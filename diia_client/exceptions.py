@@ -4,3 +4,15 @@ class BaseDiiaClientException(Exception):
 
 class DiiaClientException(BaseDiiaClientException):
     ...
+
+
+class CircuitOpenError(DiiaClientException):
+    """Request was not sent because the circuit breaker of the endpoint is open."""
+
+
+class DeadlineExceeded(DiiaClientException):
+    """The deadline set by `deadline()` expired before the call completed."""
+
+
+class RateLimitExceeded(DiiaClientException):
+    """Request was not sent because the client-side rate limit is used up."""
@@ -0,0 +1,540 @@
+import asyncio
+import weakref
+from typing import Any, AsyncIterator, List, Mapping, Optional, Sequence
+
+from diia_client.crypto.base_service import AbstractCryptoService
+from diia_client.enums import DiiaIDAction, DocumentType, EndpointFamily
+from diia_client.sdk.bulk import DEFAULT_BULK_CONCURRENCY, BulkItemResult, BulkResult
+from diia_client.sdk.cache import CacheConfig, TTLCache
+from diia_client.sdk.deep_link_pool import AsyncDeepLinkPool, DeepLinkPoolConfig, L
+from diia_client.sdk.hash_cache import HashCacheConfig
+from diia_client.sdk.http.base_client import AbstractAsyncHTTPClient, TimeoutValue
+from diia_client.sdk.model import (
+    AnyFile,
+    AuthDeepLink,
+    DeepLink,
+    DocumentPackage,
+    DocumentRequest,
+    EncodedFile,
+    SignaturePackage,
+    ValidationResult,
+)
+from diia_client.sdk.offer_registry import OfferRegistry
+from diia_client.sdk.pagination import DEFAULT_PREFETCH
+from diia_client.sdk.remote.async_diia_api import AsyncDiiaApi
+from diia_client.sdk.remote.circuit_breaker import CircuitBreakerConfig
+from diia_client.sdk.remote.model import Branch, BranchList, Offer, OfferList
+from diia_client.sdk.remote.rate_limiter import RateLimiter
+from diia_client.sdk.remote.retry import RetryPolicy
+from diia_client.sdk.service.branch_service import AsyncBranchService
+from diia_client.sdk.service.bulk_service import AsyncBulkService
+from diia_client.sdk.service.document_service import DocumentService
+from diia_client.sdk.service.offer_service import AsyncOfferService
+from diia_client.sdk.service.sharing_service import AsyncSharingService
+from diia_client.sdk.service.sign_service import AsyncSignService
+from diia_client.sdk.service.validation_service import AsyncValidationService
+from diia_client.sdk.signing_campaign import SigningCampaign
+from diia_client.sdk.token_store import AbstractTokenStore
+from diia_client.types import StrDict
+
+
+class AsyncDiia:
+    """Asyncio version of Diia.
+
+    Every method has the same arguments, result and errors as the method
+    of Diia with the same name, but does not block the event loop:
+    network calls are awaited and CPU-bound crypto operations run
+    in the default executor of the loop.
+
+    Close the instance, or use it as an async context manager, see Diia.
+    """
+
+    def __init__(
+        self,
+        *,
+        acquirer_token: str,
+        diia_host: str,
+        http_client: AbstractAsyncHTTPClient,
+        crypto_service: AbstractCryptoService,
+        token_store: Optional[AbstractTokenStore] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker_config: Optional[CircuitBreakerConfig] = None,
+        timeouts: Optional[Mapping[EndpointFamily, TimeoutValue]] = None,
+        coalesce_reads: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache_config: Optional[CacheConfig] = None,
+        validation_cache_config: Optional[CacheConfig] = None,
+        hash_cache_config: Optional[HashCacheConfig] = None,
+    ) -> None:
+        """Main AsyncDiia class constructor.
+
+        Args:
+            acquirer_token: A token used to identify the Partner.
+            diia_host: Base URL to Diia REST API.
+            http_client: Preconfigured implementation of AbstractAsyncHTTPClient.
+            crypto_service: Preconfigured implementation of AbstractCryptoService.
+            token_store: Optional storage to share the session token,
+              e.g. FileTokenStore to share it between worker processes.
+            retry_policy: Retry policy of Diia API requests,
+              by default idempotent requests make up to 3 attempts.
+            circuit_breaker_config: Settings of circuit breakers
+              of Diia API endpoint families.
+            timeouts: Request timeouts of endpoint families, seconds or Timeout
+              with separate connect and read timeouts; DEFAULT_TIMEOUT if not set.
+            coalesce_reads: Whether identical concurrent GET requests
+              share a single call to Diia.
+            rate_limiter: Client-side rate limiter of Diia API requests,
+              may be shared by Diia instances.
+            cache_config: Settings of the branch and offer cache,
+              get_branch and get_offer aren't cached if not set.
+            validation_cache_config: Settings of the cache of barcode
+              validation results, e.g. CacheConfig(ttl=5); `stale_ttl`
+              is ignored. Results aren't cached if not set.
+            hash_cache_config: Settings of the cache of hashes of files
+              to sign, keyed by their content; hashes aren't cached if not set.
+
+        """
+        self._diia_api = diia_api = AsyncDiiaApi(
+            acquirer_token=acquirer_token,
+            diia_host=diia_host,
+            http_client=http_client,
+            token_store=token_store,
+            retry_policy=retry_policy,
+            circuit_breaker_config=circuit_breaker_config,
+            timeouts=timeouts,
+            coalesce_reads=coalesce_reads,
+            rate_limiter=rate_limiter,
+        )
+
+        # invalidated by changes of both branches and offers
+        self.cache = TTLCache(cache_config) if cache_config is not None else None
+
+        self.document_service = DocumentService(crypto_service)
+        self.sharing_service = AsyncSharingService(diia_api=diia_api)
+        self.offer_registry = OfferRegistry()
+        self.branch_service = AsyncBranchService(
+            diia_api=diia_api, cache=self.cache, registry=self.offer_registry
+        )
+        self.offer_service = AsyncOfferService(
+            diia_api=diia_api, cache=self.cache, registry=self.offer_registry
+        )
+        self.bulk_service = AsyncBulkService(
+            branch_service=self.branch_service, offer_service=self.offer_service
+        )
+        self.validation_service = AsyncValidationService(
+            diia_api=diia_api, cache_config=validation_cache_config
+        )
+        self.sign_service = AsyncSignService(
+            diia_api=diia_api,
+            crypto_service=crypto_service,
+            hash_cache_config=hash_cache_config,
+        )
+        # pools made by the instance, dropped once closed and collected
+        self._pools: "weakref.WeakSet[AsyncDeepLinkPool[Any]]" = weakref.WeakSet()
+
+    async def __aenter__(self) -> "AsyncDiia":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """See Diia.close."""
+        await asyncio.gather(*(pool.close() for pool in list(self._pools)))
+        await self._diia_api.session_token_service.close()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.sign_service.close)
+
+    async def get_branches(
+        self, *, skip: Optional[int] = None, limit: Optional[int] = None
+    ) -> BranchList:
+        """See Diia.get_branches."""
+        return await self.branch_service.get_branches(skip=skip, limit=limit)
+
+    def iter_branches(
+        self, *, page_size: Optional[int] = None, prefetch: int = DEFAULT_PREFETCH
+    ) -> AsyncIterator[Branch]:
+        """See Diia.iter_branches."""
+        return self.branch_service.iter_branches(page_size=page_size, prefetch=prefetch)
+
+    async def get_branch(self, branch_id: str) -> Branch:
+        """See Diia.get_branch."""
+        return await self.branch_service.get_branch(branch_id)
+
+    async def delete_branch(self, branch_id: str) -> None:
+        """See Diia.delete_branch."""
+        return await self.branch_service.delete_branch(branch_id)
+
+    async def create_branch(
+        self,
+        name: str,
+        email: str,
+        region: str,
+        district: str,
+        location: str,
+        street: str,
+        house: str,
+        custom_full_name: Optional[str] = None,
+        custom_full_address: Optional[str] = None,
+        sharing: Optional[List[DocumentType]] = None,
+        document_identification: Optional[List[DocumentType]] = None,
+        identification: Optional[List[str]] = None,
+        diia_id: Optional[List[DiiaIDAction]] = None,
+        delivery_types: Sequence[str] = ("api",),
+        offer_request_type: str = "dynamic",
+    ) -> Branch:
+        """See Diia.create_branch."""
+        return await self.branch_service.create_branch(
+            name=name,
+            email=email,
+            region=region,
+            district=district,
+            location=location,
+            street=street,
+            house=house,
+            sharing=sharing,
+            document_identification=document_identification,
+            identification=identification,
+            diia_id=diia_id,
+            custom_full_name=custom_full_name,
+            custom_full_address=custom_full_address,
+            delivery_types=delivery_types,
+            offer_request_type=offer_request_type,
+        )
+
+    async def update_branch(self, branch: Branch) -> Branch:
+        """See Diia.update_branch."""
+        return await self.branch_service.update_branch(branch)
+
+    async def create_branches_bulk(
+        self,
+        branches: Sequence[Branch],
+        *,
+        skip_existing: bool = True,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> BulkResult[Branch, Branch]:
+        """See Diia.create_branches_bulk."""
+        return await self.bulk_service.create_branches_bulk(
+            branches, skip_existing=skip_existing, max_concurrency=max_concurrency
+        )
+
+    async def delete_branch_cascade(
+        self, branch_id: str, *, max_concurrency: int = DEFAULT_BULK_CONCURRENCY
+    ) -> BulkResult[str, None]:
+        """See Diia.delete_branch_cascade."""
+        return await self.bulk_service.delete_branch_cascade(
+            branch_id, max_concurrency=max_concurrency
+        )
+
+    async def get_offers(
+        self, *, branch_id: str, skip: Optional[int] = None, limit: Optional[int] = None
+    ) -> OfferList:
+        """See Diia.get_offers."""
+        return await self.offer_service.get_offers(
+            branch_id=branch_id, skip=skip, limit=limit
+        )
+
+    def iter_offers(
+        self,
+        *,
+        branch_id: str,
+        page_size: Optional[int] = None,
+        prefetch: int = DEFAULT_PREFETCH,
+    ) -> AsyncIterator[Offer]:
+        """See Diia.iter_offers."""
+        return self.offer_service.iter_offers(
+            branch_id=branch_id, page_size=page_size, prefetch=prefetch
+        )
+
+    async def get_offer(self, *, branch_id: str, offer_id: str) -> Offer:
+        """See Diia.get_offer."""
+        return await self.offer_service.get_offer(
+            branch_id=branch_id, offer_id=offer_id
+        )
+
+    async def find_offer(
+        self,
+        *,
+        branch_id: str,
+        sharing: Optional[List[DocumentType]] = None,
+        diia_id: Optional[List[DiiaIDAction]] = None,
+    ) -> Optional[Offer]:
+        """See Diia.find_offer."""
+        return await self.offer_service.find_offer(
+            branch_id=branch_id, sharing=sharing, diia_id=diia_id
+        )
+
+    async def get_or_create_offer(
+        self,
+        *,
+        branch_id: str,
+        name: str,
+        sharing: Optional[List[DocumentType]] = None,
+        diia_id: Optional[List[DiiaIDAction]] = None,
+        return_link: Optional[str] = None,
+    ) -> Offer:
+        """See Diia.get_or_create_offer."""
+        return await self.offer_service.get_or_create_offer(
+            branch_id=branch_id,
+            name=name,
+            sharing=sharing,
+            diia_id=diia_id,
+            return_link=return_link,
+        )
+
+    async def create_offers_bulk(
+        self,
+        *,
+        branch_id: str,
+        offers: Sequence[Offer],
+        skip_existing: bool = True,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> BulkResult[Offer, Offer]:
+        """See Diia.create_offers_bulk."""
+        return await self.bulk_service.create_offers_bulk(
+            branch_id=branch_id,
+            offers=offers,
+            skip_existing=skip_existing,
+            max_concurrency=max_concurrency,
+        )
+
+    async def delete_offers_bulk(
+        self,
+        *,
+        branch_id: str,
+        offer_ids: Sequence[str],
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> BulkResult[str, None]:
+        """See Diia.delete_offers_bulk."""
+        return await self.bulk_service.delete_offers_bulk(
+            branch_id=branch_id, offer_ids=offer_ids, max_concurrency=max_concurrency
+        )
+
+    async def create_offer(
+        self,
+        *,
+        branch_id: str,
+        name: str,
+        sharing: Optional[List[DocumentType]] = None,
+        diia_id: Optional[List[DiiaIDAction]] = None,
+        return_link: Optional[str] = None,
+    ) -> Offer:
+        """See Diia.create_offer."""
+        return await self.offer_service.create_offer(
+            branch_id=branch_id,
+            name=name,
+            return_link=return_link,
+            sharing=sharing,
+            diia_id=diia_id,
+        )
+
+    async def delete_offer(self, branch_id: str, offer_id: str) -> None:
+        """See Diia.delete_offer."""
+        return await self.offer_service.delete_offer(
+            branch_id=branch_id, offer_id=offer_id
+        )
+
+    async def get_deep_link(
+        self, *, branch_id: str, offer_id: str, request_id: str
+    ) -> str:
+        """See Diia.get_deep_link."""
+        return await self.sharing_service.get_deep_link(
+            branch_id=branch_id, offer_id=offer_id, request_id=request_id
+        )
+
+    async def get_sign_deep_link(
+        self,
+        *,
+        branch_id: str,
+        offer_id: str,
+        request_id: str,
+        files: Sequence[AnyFile],
+    ) -> str:
+        """See Diia.get_sign_deep_link."""
+        return await self.sign_service.get_sign_deep_link(
+            branch_id=branch_id,
+            offer_id=offer_id,
+            request_id=request_id,
+            files=files,
+        )
+
+    async def start_signing_campaign(
+        self,
+        *,
+        branch_id: str,
+        offer_id: str,
+        files: Sequence[AnyFile],
+        request_ids: Sequence[str],
+        campaign_id: Optional[str] = None,
+        forget_when_complete: bool = False,
+    ) -> SigningCampaign:
+        """See Diia.start_signing_campaign."""
+        return await self.sign_service.start_signing_campaign(
+            branch_id,
+            offer_id,
+            files,
+            request_ids,
+            campaign_id=campaign_id,
+            forget_when_complete=forget_when_complete,
+        )
+
+    def get_campaign_deep_links(
+        self,
+        campaign: SigningCampaign,
+        *,
+        request_ids: Optional[Sequence[str]] = None,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> AsyncIterator[BulkItemResult[str, str]]:
+        """See Diia.get_campaign_deep_links."""
+        return self.sign_service.get_campaign_deep_links(
+            campaign, request_ids=request_ids, max_concurrency=max_concurrency
+        )
+
+    def get_signing_campaign(self, campaign_id: str) -> Optional[SigningCampaign]:
+        """See Diia.get_signing_campaign."""
+        return self.sign_service.campaigns.get(campaign_id)
+
+    def forget_signing_campaign(self, campaign_id: str) -> None:
+        """See Diia.forget_signing_campaign."""
+        self.sign_service.campaigns.remove(campaign_id)
+
+    async def get_auth_deep_link(
+        self,
+        *,
+        branch_id: str,
+        offer_id: str,
+        request_id: str,
+        return_link: Optional[str] = None,
+    ) -> AuthDeepLink:
+        """See Diia.get_auth_deep_link."""
+        return await self.sign_service.get_auth_deep_link(
+            branch_id=branch_id,
+            offer_id=offer_id,
+            request_id=request_id,
+            return_link=return_link,
+        )
+
+    def deep_link_pool(
+        self,
+        *,
+        branch_id: str,
+        offer_id: str,
+        config: Optional[DeepLinkPoolConfig] = None,
+    ) -> AsyncDeepLinkPool[DeepLink]:
+        """See Diia.deep_link_pool, refilled by a task of the event loop."""
+
+        async def mint(request_id: str) -> DeepLink:
+            deep_link = await self.get_deep_link(
+                branch_id=branch_id, offer_id=offer_id, request_id=request_id
+            )
+            return DeepLink(deep_link=deep_link, request_id=request_id)
+
+        return self._add_pool(AsyncDeepLinkPool(mint, config))
+
+    def auth_deep_link_pool(
+        self,
+        *,
+        branch_id: str,
+        offer_id: str,
+        return_link: Optional[str] = None,
+        config: Optional[DeepLinkPoolConfig] = None,
+    ) -> AsyncDeepLinkPool[AuthDeepLink]:
+        """See Diia.auth_deep_link_pool."""
+        pool = AsyncDeepLinkPool(
+            lambda request_id: self.get_auth_deep_link(
+                branch_id=branch_id,
+                offer_id=offer_id,
+                request_id=request_id,
+                return_link=return_link,
+            ),
+            config,
+        )
+        return self._add_pool(pool)
+
+    def _add_pool(self, pool: AsyncDeepLinkPool[L]) -> AsyncDeepLinkPool[L]:
+        self._pools.add(pool)
+        return pool
+
+    async def validate_document_by_barcode(
+        self, *, branch_id: str, barcode: str
+    ) -> bool:
+        """See Diia.validate_document_by_barcode."""
+        return await self.validation_service.validate_document_by_barcode(
+            branch_id=branch_id, barcode=barcode
+        )
+
+    async def get_validation_result(
+        self, *, branch_id: str, barcode: str
+    ) -> ValidationResult:
+        """See Diia.get_validation_result."""
+        return await self.validation_service.get_validation_result(branch_id, barcode)
+
+    async def request_document_by_barcode(
+        self, *, branch_id: str, barcode: str, request_id: str
+    ) -> bool:
+        """See Diia.request_document_by_barcode."""
+        return await self.sharing_service.request_document_by_barcode(
+            branch_id=branch_id, barcode=barcode, request_id=request_id
+        )
+
+    async def request_document_by_qrcode(
+        self, *, branch_id: str, qrcode: str, request_id: str
+    ) -> bool:
+        """See Diia.request_document_by_qrcode."""
+        return await self.sharing_service.request_document_by_qrcode(
+            branch_id=branch_id, qrcode=qrcode, request_id=request_id
+        )
+
+    def validate_documents_by_barcode(
+        self,
+        *,
+        branch_id: str,
+        barcodes: Sequence[str],
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> AsyncIterator[BulkItemResult[str, bool]]:
+        """See Diia.validate_documents_by_barcode."""
+        return self.validation_service.validate_documents_by_barcode(
+            branch_id, barcodes, max_concurrency=max_concurrency
+        )
+
+    def request_documents(
+        self,
+        *,
+        branch_id: str,
+        requests: Sequence[DocumentRequest],
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> AsyncIterator[BulkItemResult[DocumentRequest, bool]]:
+        """See Diia.request_documents."""
+        return self.sharing_service.request_documents(
+            branch_id, requests, max_concurrency=max_concurrency
+        )
+
+    async def decode_document_package(
+        self,
+        *,
+        headers: StrDict,
+        encoded_files: List[EncodedFile],
+        encoded_json_data: str,
+    ) -> DocumentPackage:
+        """See Diia.decode_document_package."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: self.document_service.process_document_package(
+                headers=headers,
+                encoded_files=encoded_files,
+                encoded_json_data=encoded_json_data,
+            ),
+        )
+
+    async def decode_signature_package(
+        self,
+        *,
+        headers: StrDict,
+        encode_data: str,
+    ) -> SignaturePackage:
+        """See Diia.decode_signature_package."""
+        return self.sign_service.decode_signature_package(
+            headers=headers,
+            encode_data=encode_data,
+        )
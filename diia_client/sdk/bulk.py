@@ -0,0 +1,252 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_BULK_CONCURRENCY = 8
+
+
+@dataclass
+class BulkItemResult(Generic[T, R]):
+    item: T
+    result: Optional[R] = None
+    error: Optional[Exception] = None
+    # the item was done before, e.g. by an interrupted run
+    skipped: bool = False
+    # seconds the item took, None if skipped
+    duration: Optional[float] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BulkResult(Generic[T, R]):
+    """Per item results of a bulk operation, in the order of the items.
+
+    A bulk operation doesn't stop on failed items. To resume after a
+    partial failure, repeat it with the same items (done ones are
+    skipped) or with `failed_items()`.
+    """
+
+    items: List[BulkItemResult[T, R]]
+
+    @property
+    def ok(self) -> bool:
+        return all(item.ok for item in self.items)
+
+    @property
+    def succeeded(self) -> List[BulkItemResult[T, R]]:
+        return [item for item in self.items if item.ok]
+
+    @property
+    def failed(self) -> List[BulkItemResult[T, R]]:
+        return [item for item in self.items if not item.ok]
+
+    def failed_items(self) -> List[T]:
+        return [item.item for item in self.failed]
+
+
+def run_bulk(
+    func: Callable[[T], R],
+    items: Sequence[T],
+    *,
+    max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    done: Optional[Callable[[T], Optional[R]]] = None,
+) -> BulkResult[T, R]:
+    """Call the function for every item in a thread pool.
+
+    Args:
+        func: Function doing an item.
+        items: Items to do.
+        max_concurrency: Max number of items done at once.
+        done: Function returning the result of an item done before,
+          or None if it must be done.
+
+    Raises:
+        ValueError: If max_concurrency is less than 1.
+    """
+    _check_concurrency(max_concurrency)
+
+    results: List[Optional[BulkItemResult[T, R]]] = []
+    todo = []
+    for item in items:
+        result = done(item) if done is not None else None
+        if result is not None:
+            results.append(BulkItemResult(item, result, skipped=True))
+        else:
+            results.append(None)
+            todo.append((len(results) - 1, item))
+
+    if todo:
+        with ThreadPoolExecutor(min(max_concurrency, len(todo))) as executor:
+            # run in the context of the caller, e.g. to respect its deadline
+            futures = [
+                (i, executor.submit(contextvars.copy_context().run, _run, func, item))
+                for i, item in todo
+            ]
+            for i, future in futures:
+                results[i] = future.result()
+
+    return BulkResult([r for r in results if r is not None])
+
+
+async def async_run_bulk(
+    func: Callable[[T], Awaitable[R]],
+    items: Sequence[T],
+    *,
+    max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    done: Optional[Callable[[T], Optional[R]]] = None,
+) -> BulkResult[T, R]:
+    """See run_bulk, items are done by concurrent tasks."""
+    _check_concurrency(max_concurrency)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(item: T) -> BulkItemResult[T, R]:
+        result = done(item) if done is not None else None
+        if result is not None:
+            return BulkItemResult(item, result, skipped=True)
+        async with semaphore:
+            return await _async_run(func, item)
+
+    return BulkResult(list(await asyncio.gather(*(run(item) for item in items))))
+
+
+def iter_bulk(
+    func: Callable[[T], R],
+    items: Sequence[T],
+    *,
+    max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    key: Optional[Callable[[T], Hashable]] = None,
+) -> Iterator[BulkItemResult[T, R]]:
+    """Call the function for every item in a thread pool, see run_bulk.
+
+    Results are yielded as soon as items are done. Items are done when
+    the iteration starts; if it's stopped, items not started yet are
+    cancelled.
+
+    Args:
+        func: Function doing an item.
+        items: Items to do.
+        max_concurrency: Max number of items done at once.
+        key: Function returning the key of an item; items with equal keys
+          are done once, and the result is yielded for each of them.
+
+    Raises:
+        ValueError: If max_concurrency is less than 1.
+    """
+    _check_concurrency(max_concurrency)
+    return _iter_bulk(func, items, max_concurrency, key)
+
+
+def _iter_bulk(
+    func: Callable[[T], R],
+    items: Sequence[T],
+    max_concurrency: int,
+    key: Optional[Callable[[T], Hashable]],
+) -> Iterator[BulkItemResult[T, R]]:
+    groups = _group(items, key)
+    if not groups:
+        return
+    with ThreadPoolExecutor(min(max_concurrency, len(groups))) as executor:
+        futures: Dict["Future[BulkItemResult[T, R]]", List[T]] = {
+            executor.submit(contextvars.copy_context().run, _run, func, group[0]): group
+            for group in groups
+        }
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                for item in futures[future]:
+                    yield replace(result, item=item)
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def async_iter_bulk(
+    func: Callable[[T], Awaitable[R]],
+    items: Sequence[T],
+    *,
+    max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    key: Optional[Callable[[T], Hashable]] = None,
+) -> AsyncIterator[BulkItemResult[T, R]]:
+    """See iter_bulk, items are done by concurrent tasks."""
+    _check_concurrency(max_concurrency)
+    return _async_iter_bulk(func, items, max_concurrency, key)
+
+
+async def _async_iter_bulk(
+    func: Callable[[T], Awaitable[R]],
+    items: Sequence[T],
+    max_concurrency: int,
+    key: Optional[Callable[[T], Hashable]],
+) -> AsyncIterator[BulkItemResult[T, R]]:
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(group: List[T]) -> Tuple[List[T], BulkItemResult[T, R]]:
+        async with semaphore:
+            return group, await _async_run(func, group[0])
+
+    tasks = [asyncio.ensure_future(run(group)) for group in _group(items, key)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            group, result = await next_done
+            for item in group:
+                yield replace(result, item=item)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _check_concurrency(max_concurrency: int) -> None:
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+
+
+def _group(items: Sequence[T], key: Optional[Callable[[T], Hashable]]) -> List[List[T]]:
+    groups: Dict[Hashable, List[T]] = {}
+    for i, item in enumerate(items):
+        groups.setdefault(key(item) if key is not None else i, []).append(item)
+    return list(groups.values())
+
+
+def _run(func: Callable[[T], R], item: T) -> BulkItemResult[T, R]:
+    started = time.perf_counter()
+    try:
+        result: BulkItemResult[T, R] = BulkItemResult(item, func(item))
+    except Exception as e:
+        result = BulkItemResult(item, error=e)
+    result.duration = time.perf_counter() - started
+    return result
+
+
+async def _async_run(
+    func: Callable[[T], Awaitable[R]], item: T
+) -> BulkItemResult[T, R]:
+    started = time.perf_counter()
+    try:
+        result: BulkItemResult[T, R] = BulkItemResult(item, await func(item))
+    except Exception as e:
+        result = BulkItemResult(item, error=e)
+    result.duration = time.perf_counter() - started
+    return result
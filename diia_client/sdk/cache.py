@@ -0,0 +1,272 @@
+import asyncio
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from http import HTTPStatus
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from diia_client.sdk.deadline import reset_deadline
+from diia_client.sdk.http.base_client import get_status_code
+
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+@dataclass
+class CacheConfig:
+    """Settings of the branch and offer cache.
+
+    Entries are fresh for `ttl` seconds; for `stale_ttl` seconds more they
+    are still returned, while reloaded in background. Missing branches are
+    remembered for `negative_ttl` seconds. At most `max_size` entries are
+    kept, the least recently used are evicted first.
+    """
+
+    ttl: float = 60
+    stale_ttl: float = 240
+    negative_ttl: float = 10
+    max_size: int = 1000
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    # stale entries returned while reloaded
+    stale_hits: int = 0
+    # known missing keys
+    negative_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+@dataclass
+class _Entry:
+    value: Any
+    # error of a missing key
+    error: Optional[BaseException]
+    fresh_until: float
+    stale_until: float
+
+
+def is_not_found(error: BaseException) -> bool:
+    """Whether Diia responded 404, also to a call wrapped in DiiaClientException."""
+    return any(
+        isinstance(e, BaseException) and get_status_code(e) == HTTPStatus.NOT_FOUND
+        for e in (error, *error.args)
+    )
+
+
+class TTLCache:
+    """Thread-safe read-through LRU cache with TTL and stale-while-revalidate.
+
+    Values are loaded by the functions passed to get/async_get. Writers
+    must invalidate the keys they change; loads of a key started before
+    its invalidation don't store their (possibly outdated) results.
+    """
+
+    def __init__(
+        self,
+        config: Optional[CacheConfig] = None,
+        *,
+        is_missing: Callable[[BaseException], bool] = is_not_found,
+    ) -> None:
+        self.config = config or CacheConfig()
+        self.is_missing = is_missing
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._stats = CacheStats()
+        # invalidations are numbered; loads remember the number they start at
+        self._generation = 0
+        self._cleared_at = 0
+        # last invalidation of keys being loaded, and counts of their loads
+        self._invalidated_at: Dict[Hashable, int] = {}
+        self._loading: Dict[Hashable, int] = {}
+        self._revalidating: Set[Hashable] = set()
+        self._tasks: Set["asyncio.Future[None]"] = set()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, load: Callable[[], V]) -> V:
+        """Get the value of the key, loading it on a miss.
+
+        Raises:
+            The error of the load, also remembered for a missing key.
+        """
+        entry, revalidate = self._lookup(key)
+        if entry is None:
+            return self._load(key, load)
+        if revalidate:
+            threading.Thread(
+                target=self._revalidate, args=(key, load), daemon=True
+            ).start()
+        return self._unwrap(entry)
+
+    async def async_get(self, key: Hashable, load: Callable[[], Awaitable[V]]) -> V:
+        """See get."""
+        entry, revalidate = self._lookup(key)
+        if entry is None:
+            return await self._async_load(key, load)
+        if revalidate:
+            task = asyncio.ensure_future(self._async_revalidate(key, load))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return self._unwrap(entry)
+
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+                if key in self._loading:
+                    self._invalidated_at[key] = self._generation
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cleared_at = self._generation
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def _lookup(self, key: Hashable) -> Tuple[Optional[_Entry], bool]:
+        """Find a usable entry.
+
+        Returns:
+            The entry (None on a miss) and whether the caller should reload
+            it in background.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.stale_until <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return None, False
+
+            self._entries.move_to_end(key)
+            if entry.error is not None:
+                self._stats.negative_hits += 1
+            elif entry.fresh_until <= now:
+                self._stats.stale_hits += 1
+                if key not in self._revalidating:
+                    self._revalidating.add(key)
+                    return entry, True
+            else:
+                self._stats.hits += 1
+            return entry, False
+
+    def _unwrap(self, entry: _Entry) -> Any:
+        if entry.error is not None:
+            # a copy, as concurrent raises of one exception mix up its traceback
+            raise copy.copy(entry.error)
+        return entry.value
+
+    def _load(self, key: Hashable, load: Callable[[], V]) -> V:
+        generation = self._start_load(key)
+        try:
+            value = load()
+        except Exception as e:
+            self._store_error(key, e, generation)
+            raise
+        else:
+            self._store(key, value, generation)
+            return value
+        finally:
+            self._finish_load(key)
+
+    async def _async_load(self, key: Hashable, load: Callable[[], Awaitable[V]]) -> V:
+        generation = self._start_load(key)
+        try:
+            value = await load()
+        except Exception as e:
+            self._store_error(key, e, generation)
+            raise
+        else:
+            self._store(key, value, generation)
+            return value
+        finally:
+            self._finish_load(key)
+
+    def _start_load(self, key: Hashable) -> int:
+        with self._lock:
+            self._loading[key] = self._loading.get(key, 0) + 1
+            return self._generation
+
+    def _finish_load(self, key: Hashable) -> None:
+        with self._lock:
+            self._loading[key] -= 1
+            if not self._loading[key]:
+                del self._loading[key]
+                self._invalidated_at.pop(key, None)
+
+    def _revalidate(self, key: Hashable, load: Callable[[], Any]) -> None:
+        try:
+            self._load(key, load)
+        except Exception:
+            logger.warning("Cache revalidation error", exc_info=True)
+        finally:
+            with self._lock:
+                self._revalidating.discard(key)
+
+    async def _async_revalidate(
+        self, key: Hashable, load: Callable[[], Awaitable[Any]]
+    ) -> None:
+        # the task inherits the context of the caller, but not its deadline
+        reset_deadline()
+        try:
+            await self._async_load(key, load)
+        except Exception:
+            logger.warning("Cache revalidation error", exc_info=True)
+        finally:
+            with self._lock:
+                self._revalidating.discard(key)
+
+    def _store_error(self, key: Hashable, error: Exception, generation: int) -> None:
+        if not self.is_missing(error):
+            return
+        now = time.monotonic()
+        expires_at = now + self.config.negative_ttl
+        self._put(key, _Entry(None, error, expires_at, expires_at), generation)
+
+    def _store(self, key: Hashable, value: Any, generation: int) -> None:
+        fresh_until = time.monotonic() + self.config.ttl
+        stale_until = fresh_until + self.config.stale_ttl
+        self._put(key, _Entry(value, None, fresh_until, stale_until), generation)
+
+    def _put(self, key: Hashable, entry: _Entry, generation: int) -> None:
+        with self._lock:
+            invalidated_at = self._invalidated_at.get(key, 0)
+            if max(invalidated_at, self._cleared_at) > generation:
+                # invalidated while loading
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.config.max_size:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+
+def branch_cache_key(branch_id: str) -> Hashable:
+    return "branch", branch_id
+
+
+def offers_cache_key(branch_id: str) -> Hashable:
+    """Key of all offers of the branch, as Diia has no endpoint for a single offer."""
+    return "offers", branch_id
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterator, Optional
+
+from diia_client.exceptions import DeadlineExceeded
+from diia_client.sdk.http.base_client import Timeout, TimeoutValue
+
+
+# time.monotonic() value the current calls must complete by
+_expires_at: ContextVar[Optional[float]] = ContextVar(
+    "diia_deadline_expires_at", default=None
+)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """Limit the time of all Diia calls made inside the block.
+
+    Covers session token refresh, retries and backoff delays: timeouts
+    of requests are shortened to the remaining time, no retries are made
+    when the time is up, and DeadlineExceeded is raised by the calls
+    started after that. A nested deadline can only shorten the outer one.
+    Works for threads and asyncio tasks, as the deadline is kept in a
+    context variable.
+
+    Example:
+        with deadline(0.8):
+            link = diia.get_deep_link(...)
+
+    Args:
+        seconds: Time the calls have to complete.
+    """
+    expires_at = time.monotonic() + seconds
+    outer = _expires_at.get()
+    if outer is not None:
+        expires_at = min(expires_at, outer)
+
+    token = _expires_at.set(expires_at)
+    try:
+        yield
+    finally:
+        _expires_at.reset(token)
+
+
+def reset_deadline() -> None:
+    """Remove the deadline from the current context.
+
+    For background tasks, which inherit the context of the code creating them.
+    """
+    _expires_at.set(None)
+
+
+def get_remaining_time() -> Optional[float]:
+    """Seconds left until the current deadline, None without a deadline."""
+    expires_at = _expires_at.get()
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
+
+
+def is_expired() -> bool:
+    remaining = get_remaining_time()
+    return remaining is not None and remaining <= 0
+
+
+def check_deadline() -> None:
+    """Raise DeadlineExceeded if the current deadline has expired."""
+    if is_expired():
+        raise DeadlineExceeded("Deadline exceeded")
+
+
+def clamp_timeout(timeout: TimeoutValue) -> TimeoutValue:
+    """Shorten the timeout to the time left until the current deadline.
+
+    Raises:
+        DeadlineExceeded: If the deadline has expired.
+    """
+    remaining = get_remaining_time()
+    if remaining is None:
+        return timeout
+    check_deadline()
+    if isinstance(timeout, Timeout):
+        return Timeout(
+            connect=min(timeout.connect, remaining), read=min(timeout.read, remaining)
+        )
+    return min(timeout, remaining)
+
+
+@contextmanager
+def acquire_within_deadline(lock: threading.Lock) -> Iterator[None]:
+    """Hold the lock, waiting for it no longer than the current deadline allows."""
+    remaining = get_remaining_time()
+    if remaining is None:
+        lock.acquire()
+    elif not lock.acquire(timeout=max(remaining, 0)):
+        raise DeadlineExceeded("Deadline exceeded")
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+@asynccontextmanager
+async def async_acquire_within_deadline(lock: asyncio.Lock) -> AsyncIterator[None]:
+    """See acquire_within_deadline."""
+    try:
+        await asyncio.wait_for(lock.acquire(), get_remaining_time())
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("Deadline exceeded") from None
+    try:
+        yield
+    finally:
+        lock.release()
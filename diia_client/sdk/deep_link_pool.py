@@ -0,0 +1,369 @@
+"""Pools of deep links minted in advance, off the path of the waiting user.
+
+Each deep link of a pool has its own fresh request id, so links of a
+pool are interchangeable until handed out.
+"""
+import asyncio
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Awaitable, Callable, Deque, Generic, Optional, Tuple, TypeVar
+
+from diia_client.sdk.bulk import BulkResult, async_run_bulk, run_bulk
+from diia_client.sdk.deadline import reset_deadline
+
+
+logger = logging.getLogger(__name__)
+
+L = TypeVar("L")
+
+# recent demand is weighted over about this many seconds
+DEMAND_WINDOW = 60.0
+MAX_RETRY_INTERVAL = 60.0
+
+
+def new_request_id() -> str:
+    return str(uuid.uuid4())
+
+
+@dataclass
+class DeepLinkPoolConfig:
+    """Settings of a deep link pool.
+
+    The pool keeps enough links for `lead_time` seconds of the recent
+    demand, at least `min_size` and at most `max_size`. Links are valid
+    in Diia for `link_ttl` seconds and are handed out while at least
+    `min_remaining_ttl` seconds are left, for the user to open them.
+    Up to `max_concurrency` links are minted at once; after a failure
+    minting is paused for `retry_interval` seconds, doubled on every
+    next failure.
+    """
+
+    min_size: int = 1
+    max_size: int = 20
+    lead_time: float = 30
+    link_ttl: float = 180
+    min_remaining_ttl: float = 60
+    max_concurrency: int = 2
+    retry_interval: float = 1
+
+
+@dataclass
+class DeepLinkPoolStats:
+    # links handed out from the pool
+    hits: int = 0
+    # links minted for the caller as the pool was empty
+    misses: int = 0
+    minted: int = 0
+    # links dropped unused
+    expired: int = 0
+    errors: int = 0
+
+
+class _Demand:
+    """Rate of events with exponentially decaying weights."""
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._count = 0.0
+        self._at = time.monotonic()
+
+    def add(self, now: float) -> None:
+        self._decay(now)
+        self._count += 1
+
+    def rate(self, now: float) -> float:
+        self._decay(now)
+        return self._count / self.window
+
+    def _decay(self, now: float) -> None:
+        self._count *= math.exp(-max(now - self._at, 0) / self.window)
+        self._at = now
+
+
+class _BaseDeepLinkPool(Generic[L]):
+    """State of a pool, its methods are called under the lock of the pool."""
+
+    def __init__(
+        self,
+        config: Optional[DeepLinkPoolConfig],
+        request_id_factory: Callable[[], str],
+    ) -> None:
+        self.config = config or DeepLinkPoolConfig()
+        self.request_id_factory = request_id_factory
+        # links with the time they can be handed out until, oldest first
+        self._links: Deque[Tuple[float, L]] = deque()
+        self._demand = _Demand(DEMAND_WINDOW)
+        self._stats = DeepLinkPoolStats()
+        self._failures = 0
+        self._retry_at = 0.0
+        self._closed = False
+
+    def __len__(self) -> int:
+        """Number of links ready to be handed out, including expired ones."""
+        return len(self._links)
+
+    @property
+    def _usable_ttl(self) -> float:
+        return self.config.link_ttl - self.config.min_remaining_ttl
+
+    def _take(self, now: float) -> Optional[L]:
+        self._demand.add(now)
+        while self._links:
+            usable_until, link = self._links.popleft()
+            if usable_until > now:
+                self._stats.hits += 1
+                return link
+            self._stats.expired += 1
+        self._stats.misses += 1
+        return None
+
+    def _drop_expired(self, now: float) -> None:
+        while self._links and self._links[0][0] <= now:
+            self._links.popleft()
+            self._stats.expired += 1
+
+    def _missing(self, now: float) -> int:
+        if now < self._retry_at:
+            return 0
+        demand = math.ceil(self._demand.rate(now) * self.config.lead_time)
+        target = min(self.config.max_size, max(self.config.min_size, demand))
+        return max(target - len(self._links), 0)
+
+    def _wait_time(self, now: float) -> Optional[float]:
+        """Time until the pool should be checked again, None if on demand only."""
+        times = []
+        if self._links:
+            times.append(self._links[0][0] - now)
+        if now < self._retry_at:
+            times.append(self._retry_at - now)
+        return max(min(times), 0) if times else None
+
+    def _add_minted(self, result: BulkResult[int, Tuple[float, L]], now: float) -> None:
+        if not self._closed:
+            self._links.extend(item.result for item in result.succeeded if item.result)
+        failed = result.failed
+        if not failed:
+            self._failures = 0
+            return
+        self._stats.errors += len(failed)
+        self._failures += 1
+        interval = self.config.retry_interval * 2 ** (self._failures - 1)
+        self._retry_at = now + min(interval, MAX_RETRY_INTERVAL)
+        logger.warning("Deep link minting error", exc_info=failed[0].error)
+
+
+class DeepLinkPool(_BaseDeepLinkPool[L]):
+    """Thread-safe pool of deep links refilled by a background thread.
+
+    Example:
+        pool = diia.auth_deep_link_pool(branch_id=branch_id, offer_id=offer_id)
+        link = pool.get()
+
+    The thread is started by the first `get()` or by `start()` to fill
+    the pool ahead, and is stopped by `close()`.
+    """
+
+    def __init__(
+        self,
+        mint: Callable[[str], L],
+        config: Optional[DeepLinkPoolConfig] = None,
+        *,
+        request_id_factory: Callable[[], str] = new_request_id,
+    ) -> None:
+        """
+        Args:
+            mint: Function getting a deep link from Diia for the request id.
+            config: Settings of the pool.
+            request_id_factory: Function making request ids.
+        """
+        super().__init__(config, request_id_factory)
+        self.mint = mint
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "DeepLinkPool[L]":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def start(self) -> "DeepLinkPool[L]":
+        with self._cond:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(
+                    target=self._run, name="diia-deep-link-pool", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def get(self) -> L:
+        """Hand out a deep link, minted in advance unless the pool is empty.
+
+        Raises:
+            DiiaClientException: If the pool is empty and minting fails.
+        """
+        self.start()
+        with self._cond:
+            link = self._take(time.monotonic())
+            self._cond.notify_all()
+        if link is None:
+            return self._mint_link()[1]
+        return link
+
+    def wait(self, min_links: int, timeout: Optional[float] = None) -> bool:
+        """Wait until at least `min_links` links are ready, e.g. to warm up the pool.
+
+        Returns:
+            Whether the links are ready in time.
+        """
+        self.start()
+        with self._cond:
+            self._cond.wait_for(
+                lambda: len(self._links) >= min_links or self._closed, timeout
+            )
+            return len(self._links) >= min_links
+
+    def close(self) -> None:
+        """Stop refilling and drop the links."""
+        with self._cond:
+            self._closed = True
+            self._links.clear()
+            self._cond.notify_all()
+
+    def stats(self) -> DeepLinkPoolStats:
+        with self._cond:
+            return replace(self._stats)
+
+    def _mint_link(self) -> Tuple[float, L]:
+        started = time.monotonic()
+        link = self.mint(self.request_id_factory())
+        with self._cond:
+            self._stats.minted += 1
+        return started + self._usable_ttl, link
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+                    now = time.monotonic()
+                    self._drop_expired(now)
+                    missing = self._missing(now)
+                    if missing:
+                        break
+                    self._cond.wait(self._wait_time(now))
+
+            result = run_bulk(
+                lambda _: self._mint_link(),
+                range(missing),
+                max_concurrency=self.config.max_concurrency,
+            )
+            with self._cond:
+                self._add_minted(result, time.monotonic())
+                self._cond.notify_all()
+
+
+class AsyncDeepLinkPool(_BaseDeepLinkPool[L]):
+    """See DeepLinkPool, refilled by a background task of the event loop."""
+
+    def __init__(
+        self,
+        mint: Callable[[str], Awaitable[L]],
+        config: Optional[DeepLinkPoolConfig] = None,
+        *,
+        request_id_factory: Callable[[], str] = new_request_id,
+    ) -> None:
+        super().__init__(config, request_id_factory)
+        self.mint = mint
+        # created in the event loop
+        self._wakeup: Optional[asyncio.Event] = None
+        self._minted: Optional[asyncio.Event] = None
+        self._task: Optional["asyncio.Future[None]"] = None
+
+    async def __aenter__(self) -> "AsyncDeepLinkPool[L]":
+        return self.start()
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    def start(self) -> "AsyncDeepLinkPool[L]":
+        if self._task is None and not self._closed:
+            self._wakeup = asyncio.Event()
+            self._minted = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run(self._wakeup, self._minted))
+        return self
+
+    async def get(self) -> L:
+        """See DeepLinkPool.get."""
+        self.start()
+        link = self._take(time.monotonic())
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if link is None:
+            return (await self._mint_link())[1]
+        return link
+
+    async def wait(self, min_links: int, timeout: Optional[float] = None) -> bool:
+        """See DeepLinkPool.wait."""
+        minted = self.start()._minted
+        if minted is not None:
+            try:
+                await asyncio.wait_for(self._wait_links(minted, min_links), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return len(self._links) >= min_links
+
+    async def close(self) -> None:
+        self._closed = True
+        self._links.clear()
+        if self._minted is not None:
+            self._minted.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> DeepLinkPoolStats:
+        return replace(self._stats)
+
+    async def _mint_link(self) -> Tuple[float, L]:
+        started = time.monotonic()
+        link = await self.mint(self.request_id_factory())
+        self._stats.minted += 1
+        return started + self._usable_ttl, link
+
+    async def _wait_links(self, minted: asyncio.Event, min_links: int) -> None:
+        while len(self._links) < min_links and not self._closed:
+            minted.clear()
+            await minted.wait()
+
+    async def _run(self, wakeup: asyncio.Event, minted: asyncio.Event) -> None:
+        # the task inherits the context of the caller, but not its deadline
+        reset_deadline()
+        while not self._closed:
+            now = time.monotonic()
+            self._drop_expired(now)
+            missing = self._missing(now)
+            if not missing:
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), self._wait_time(now))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            result = await async_run_bulk(
+                lambda _: self._mint_link(),
+                range(missing),
+                max_concurrency=self.config.max_concurrency,
+            )
+            self._add_minted(result, time.monotonic())
+            minted.set()
@@ -1,27 +1,55 @@
-from typing import List, Optional, Sequence
+import threading
+import weakref
+from typing import Any, Iterator, List, Mapping, Optional, Sequence
 
 from diia_client.crypto.base_service import AbstractCryptoService
-from diia_client.enums import DiiaIDAction, DocumentType
-from diia_client.sdk.http.base_client import AbstractHTTPCLient
+from diia_client.enums import DiiaIDAction, DocumentType, EndpointFamily
+from diia_client.sdk.bulk import DEFAULT_BULK_CONCURRENCY, BulkItemResult, BulkResult
+from diia_client.sdk.cache import CacheConfig, TTLCache
+from diia_client.sdk.deep_link_pool import DeepLinkPool, DeepLinkPoolConfig, L
+from diia_client.sdk.hash_cache import HashCacheConfig
+from diia_client.sdk.http.base_client import AbstractHTTPCLient, TimeoutValue
 from diia_client.sdk.model import (
+    AnyFile,
     AuthDeepLink,
+    DeepLink,
     DocumentPackage,
+    DocumentRequest,
     EncodedFile,
-    File,
     SignaturePackage,
+    ValidationResult,
 )
+from diia_client.sdk.offer_registry import OfferRegistry
+from diia_client.sdk.pagination import DEFAULT_PREFETCH
+from diia_client.sdk.remote.circuit_breaker import CircuitBreakerConfig
 from diia_client.sdk.remote.diia_api import DiiaApi
 from diia_client.sdk.remote.model import Branch, BranchList, Offer, OfferList
+from diia_client.sdk.remote.rate_limiter import RateLimiter
+from diia_client.sdk.remote.retry import RetryPolicy
 from diia_client.sdk.service.branch_service import BranchService
+from diia_client.sdk.service.bulk_service import BulkService
 from diia_client.sdk.service.document_service import DocumentService
 from diia_client.sdk.service.offer_service import OfferService
 from diia_client.sdk.service.sharing_service import SharingService
 from diia_client.sdk.service.sign_service import SignService
 from diia_client.sdk.service.validation_service import ValidationService
+from diia_client.sdk.signing_campaign import SigningCampaign
+from diia_client.sdk.token_store import AbstractTokenStore
 from diia_client.types import StrDict
 
 
 class Diia:
+    """Diia API client.
+
+    Thread-safe: a single instance is meant to be shared by all threads
+    of the process (e.g. a thread pool of a web server). The session
+    token is obtained by one thread at a time and is renewed in
+    background shortly before it expires.
+
+    Close the instance, or use it as a context manager, to stop
+    the background refresh and the deep link pools it made.
+    """
+
     def __init__(
         self,
         *,
@@ -29,6 +57,15 @@ class Diia:
         diia_host: str,
         http_client: AbstractHTTPCLient,
         crypto_service: AbstractCryptoService,
+        token_store: Optional[AbstractTokenStore] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker_config: Optional[CircuitBreakerConfig] = None,
+        timeouts: Optional[Mapping[EndpointFamily, TimeoutValue]] = None,
+        coalesce_reads: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache_config: Optional[CacheConfig] = None,
+        validation_cache_config: Optional[CacheConfig] = None,
+        hash_cache_config: Optional[HashCacheConfig] = None,
     ) -> None:
         """Main Diia class constructor.
 
@@ -37,20 +74,83 @@ class Diia:
             diia_host: Base URL to Diia REST API.
             http_client: Preconfigured implementation of AbstractHTTPCLient.
             crypto_service: Preconfigured implementation of AbstractCryptoService.
+            token_store: Optional storage to share the session token,
+              e.g. FileTokenStore to share it between worker processes.
+            retry_policy: Retry policy of Diia API requests,
+              by default idempotent requests make up to 3 attempts.
+            circuit_breaker_config: Settings of circuit breakers
+              of Diia API endpoint families.
+            timeouts: Request timeouts of endpoint families, seconds or Timeout
+              with separate connect and read timeouts; DEFAULT_TIMEOUT if not set.
+            coalesce_reads: Whether identical concurrent GET requests
+              share a single call to Diia.
+            rate_limiter: Client-side rate limiter of Diia API requests,
+              may be shared by Diia instances.
+            cache_config: Settings of the branch and offer cache,
+              get_branch and get_offer aren't cached if not set.
+            validation_cache_config: Settings of the cache of barcode
+              validation results, e.g. CacheConfig(ttl=5); `stale_ttl`
+              is ignored. Results aren't cached if not set.
+            hash_cache_config: Settings of the cache of hashes of files
+              to sign, keyed by their content; hashes aren't cached if not set.
 
         """
-        diia_api = DiiaApi(
-            acquirer_token=acquirer_token, diia_host=diia_host, http_client=http_client
+        self._diia_api = diia_api = DiiaApi(
+            acquirer_token=acquirer_token,
+            diia_host=diia_host,
+            http_client=http_client,
+            token_store=token_store,
+            retry_policy=retry_policy,
+            circuit_breaker_config=circuit_breaker_config,
+            timeouts=timeouts,
+            coalesce_reads=coalesce_reads,
+            rate_limiter=rate_limiter,
         )
 
+        # invalidated by changes of both branches and offers
+        self.cache = TTLCache(cache_config) if cache_config is not None else None
+
         self.document_service = DocumentService(crypto_service)
         self.sharing_service = SharingService(diia_api=diia_api)
-        self.branch_service = BranchService(diia_api=diia_api)
-        self.offer_service = OfferService(diia_api=diia_api)
-        self.validation_service = ValidationService(diia_api=diia_api)
+        self.offer_registry = OfferRegistry()
+        self.branch_service = BranchService(
+            diia_api=diia_api, cache=self.cache, registry=self.offer_registry
+        )
+        self.offer_service = OfferService(
+            diia_api=diia_api, cache=self.cache, registry=self.offer_registry
+        )
+        self.bulk_service = BulkService(
+            branch_service=self.branch_service, offer_service=self.offer_service
+        )
+        self.validation_service = ValidationService(
+            diia_api=diia_api, cache_config=validation_cache_config
+        )
         self.sign_service = SignService(
-            diia_api=diia_api, crypto_service=crypto_service
+            diia_api=diia_api,
+            crypto_service=crypto_service,
+            hash_cache_config=hash_cache_config,
         )
+        # pools made by the instance, dropped once closed and collected
+        self._pools: "weakref.WeakSet[DeepLinkPool[Any]]" = weakref.WeakSet()
+        self._pools_lock = threading.Lock()
+
+    def __enter__(self) -> "Diia":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the deep link pools made by the instance, stop background
+        refresh of the session token and save new hashes of the hash cache.
+        The HTTP and crypto services passed to the constructor are left open.
+        """
+        with self._pools_lock:
+            pools = list(self._pools)
+        for pool in pools:
+            pool.close()
+        self._diia_api.session_token_service.close()
+        self.sign_service.close()
 
     def get_branches(
         self, *, skip: Optional[int] = None, limit: Optional[int] = None
@@ -66,6 +166,23 @@ class Diia:
         """
         return self.branch_service.get_branches(skip=skip, limit=limit)
 
+    def iter_branches(
+        self, *, page_size: Optional[int] = None, prefetch: int = DEFAULT_PREFETCH
+    ) -> Iterator[Branch]:
+        """Iterate over all branches, fetching the next pages in background.
+
+        Pages are requested by offset, so branches created or deleted during
+        iteration may be missed or repeated; collect ids before deleting.
+
+        Args:
+            page_size: Initial page size, adapts to the response time of Diia.
+            prefetch: Number of pages fetched ahead of the current one.
+
+        Raises:
+            DiiaClientException
+        """
+        return self.branch_service.iter_branches(page_size=page_size, prefetch=prefetch)
+
     def get_branch(self, branch_id: str) -> Branch:
         """Get branch by id.
 
@@ -146,6 +263,58 @@ class Diia:
         """
         return self.branch_service.update_branch(branch)
 
+    def create_branches_bulk(
+        self,
+        branches: Sequence[Branch],
+        *,
+        skip_existing: bool = True,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> BulkResult[Branch, Branch]:
+        """Create branches concurrently.
+
+        Failed branches don't stop the others; to resume, call it again
+        with the same branches, existing ones are skipped.
+
+        Args:
+            branches: Branches made by make_branch.
+            skip_existing: Whether to skip branches with the names of existing ones,
+              their result is the existing branch.
+            max_concurrency: Max number of requests at once.
+
+        Returns:
+            Per branch results with created branches, in the order of the branches.
+
+        Raises:
+            DiiaClientException: If existing branches can't be fetched.
+        """
+        return self.bulk_service.create_branches_bulk(
+            branches, skip_existing=skip_existing, max_concurrency=max_concurrency
+        )
+
+    def delete_branch_cascade(
+        self, branch_id: str, *, max_concurrency: int = DEFAULT_BULK_CONCURRENCY
+    ) -> BulkResult[str, None]:
+        """Delete all offers of the branch concurrently, then the branch.
+
+        The branch is deleted only if all its offers are; already deleted
+        offers and branch count as deleted, so it can be called again
+        to resume.
+
+        Args:
+            branch_id: Branch ID.
+            max_concurrency: Max number of requests at once.
+
+        Returns:
+            Per offer results followed by the result of the branch; only
+            the skipped result of the branch if it was deleted before.
+
+        Raises:
+            DiiaClientException: If offers of the branch can't be fetched.
+        """
+        return self.bulk_service.delete_branch_cascade(
+            branch_id, max_concurrency=max_concurrency
+        )
+
     def get_offers(
         self, *, branch_id: str, skip: Optional[int] = None, limit: Optional[int] = None
     ) -> OfferList:
@@ -166,6 +335,155 @@ class Diia:
             branch_id=branch_id, skip=skip, limit=limit
         )
 
+    def iter_offers(
+        self,
+        *,
+        branch_id: str,
+        page_size: Optional[int] = None,
+        prefetch: int = DEFAULT_PREFETCH,
+    ) -> Iterator[Offer]:
+        """Iterate over all offers of the branch, fetching the next pages in background.
+
+        At most `prefetch + 1` pages are held in memory, whatever the number
+        of offers. See iter_branches for changes during iteration.
+
+        Args:
+            branch_id: Branch ID.
+            page_size: Initial page size, adapts to the response time of Diia.
+            prefetch: Number of pages fetched ahead of the current one.
+
+        Raises:
+            DiiaClientException
+        """
+        return self.offer_service.iter_offers(
+            branch_id=branch_id, page_size=page_size, prefetch=prefetch
+        )
+
+    def get_offer(self, *, branch_id: str, offer_id: str) -> Offer:
+        """Get offer of the branch by id.
+
+        Diia has no endpoint for a single offer, so offers of the branch are
+        fetched page by page until the offer is found; with `cache_config`
+        all of them are fetched and cached until changed.
+
+        Args:
+            branch_id: Branch ID.
+            offer_id: Offer ID.
+
+        Raises:
+            DiiaClientException
+        """
+        return self.offer_service.get_offer(branch_id=branch_id, offer_id=offer_id)
+
+    def find_offer(
+        self,
+        *,
+        branch_id: str,
+        sharing: Optional[List[DocumentType]] = None,
+        diia_id: Optional[List[DiiaIDAction]] = None,
+    ) -> Optional[Offer]:
+        """Find offer of the branch with the scopes.
+
+        Offers of the branch are fetched once into the offer registry,
+        then kept current by create and delete calls of this client, so
+        lookups are served from memory. Offers changed by others are seen
+        after `offer_service.load_registry(branch_id)`.
+
+        Args:
+            branch_id: Branch ID.
+            sharing: Documents the offer must request.
+            diia_id: Diia ID actions the offer must allow.
+
+        Returns:
+            Offer with the scopes and the fewest other scopes, None if not found.
+
+        Raises:
+            DiiaClientException
+        """
+        return self.offer_service.find_offer(
+            branch_id=branch_id, sharing=sharing, diia_id=diia_id
+        )
+
+    def get_or_create_offer(
+        self,
+        *,
+        branch_id: str,
+        name: str,
+        sharing: Optional[List[DocumentType]] = None,
+        diia_id: Optional[List[DiiaIDAction]] = None,
+        return_link: Optional[str] = None,
+    ) -> Offer:
+        """Find offer of the branch with the scopes, see find_offer, or create it.
+
+        Offers of the branch are fetched again before creating one.
+
+        Args:
+            branch_id: Branch ID.
+            name: Name of the offer to create.
+            sharing: Documents the offer must request.
+            diia_id: Diia ID actions the offer must allow.
+            return_link: Return link of the offer to create.
+
+        Raises:
+            DiiaClientException
+        """
+        return self.offer_service.get_or_create_offer(
+            branch_id=branch_id,
+            name=name,
+            sharing=sharing,
+            diia_id=diia_id,
+            return_link=return_link,
+        )
+
+    def create_offers_bulk(
+        self,
+        *,
+        branch_id: str,
+        offers: Sequence[Offer],
+        skip_existing: bool = True,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> BulkResult[Offer, Offer]:
+        """Create offers on the branch concurrently.
+
+        See create_branches_bulk, existing offers are matched by name too.
+
+        Args:
+            branch_id: Branch ID.
+            offers: Offers made by make_offer.
+            skip_existing: Whether to skip offers with the names of existing ones.
+            max_concurrency: Max number of requests at once.
+
+        Raises:
+            DiiaClientException: If existing offers can't be fetched.
+        """
+        return self.bulk_service.create_offers_bulk(
+            branch_id=branch_id,
+            offers=offers,
+            skip_existing=skip_existing,
+            max_concurrency=max_concurrency,
+        )
+
+    def delete_offers_bulk(
+        self,
+        *,
+        branch_id: str,
+        offer_ids: Sequence[str],
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> BulkResult[str, None]:
+        """Delete offers of the branch concurrently.
+
+        Already deleted offers count as deleted, so it can be called
+        again with the same ids to resume.
+
+        Args:
+            branch_id: Branch ID.
+            offer_ids: Offer IDs.
+            max_concurrency: Max number of requests at once.
+        """
+        return self.bulk_service.delete_offers_bulk(
+            branch_id=branch_id, offer_ids=offer_ids, max_concurrency=max_concurrency
+        )
+
     def create_offer(
         self,
         *,
@@ -237,7 +555,7 @@ class Diia:
         branch_id: str,
         offer_id: str,
         request_id: str,
-        files: List[File],
+        files: Sequence[AnyFile],
     ) -> str:
         """Get deep link for sign files.
 
@@ -246,7 +564,8 @@ class Diia:
             offer_id: Offer ID, offer with `diia_id:hashedFilesSigning` scopes.
             request_id: Unique request id to identify sign action;
               it will be sent in http-header with signatures pack.
-            files: List of files for sign.
+            files: Files for sign: File in memory, PathFile or StreamFile
+              read by chunks.
 
         Returns:
             URL, the deep link that should be opened on mobile device
@@ -263,6 +582,102 @@ class Diia:
             files=files,
         )
 
+    def start_signing_campaign(
+        self,
+        *,
+        branch_id: str,
+        offer_id: str,
+        files: Sequence[AnyFile],
+        request_ids: Sequence[str],
+        campaign_id: Optional[str] = None,
+        forget_when_complete: bool = False,
+    ) -> SigningCampaign:
+        """Start a campaign signing the same files by many signers.
+
+        The files are hashed once; deep links of the signers are got by
+        get_campaign_deep_links. Signature packages decoded by
+        decode_signature_package are recorded in the campaign.
+
+        Campaigns are held in memory of the instance until forgotten, so
+        a long-running service must forget finished campaigns (or set
+        `forget_when_complete`) not to pile them up.
+
+        Args:
+            branch_id: Branch ID.
+            offer_id: Offer ID, offer with `diia_id:hashedFilesSigning` scopes.
+            files: Files for sign, see get_sign_deep_link.
+            request_ids: Unique request ids of the signers.
+            campaign_id: ID of the campaign, a random UUID by default.
+            forget_when_complete: Whether to forget the campaign once
+              the packages of all signers are recorded.
+
+        Returns:
+            The campaign, also available by get_signing_campaign
+              until forgotten.
+
+        Raises:
+            DiiaClientException
+            ValueError: If the campaign id or request ids are in other campaigns.
+        """
+        return self.sign_service.start_signing_campaign(
+            branch_id,
+            offer_id,
+            files,
+            request_ids,
+            campaign_id=campaign_id,
+            forget_when_complete=forget_when_complete,
+        )
+
+    def get_campaign_deep_links(
+        self,
+        campaign: SigningCampaign,
+        *,
+        request_ids: Optional[Sequence[str]] = None,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> Iterator[BulkItemResult[str, str]]:
+        """Get deep links of signers of the campaign concurrently.
+
+        Args:
+            campaign: Campaign started by start_signing_campaign.
+            request_ids: Request ids to get deep links for, e.g. the failed
+              ones; all request ids of the campaign by default.
+            max_concurrency: Max number of requests at once.
+
+        Returns:
+            Iterator over results with request ids as items and deep links
+              as results, in order of completion.
+
+        Raises:
+            ValueError: If request ids aren't in the campaign.
+        """
+        return self.sign_service.get_campaign_deep_links(
+            campaign, request_ids=request_ids, max_concurrency=max_concurrency
+        )
+
+    def get_signing_campaign(self, campaign_id: str) -> Optional[SigningCampaign]:
+        """Get a campaign started by the instance and not forgotten yet.
+
+        Args:
+            campaign_id: ID of the campaign.
+
+        Returns:
+            The campaign or None if it's unknown or forgotten.
+        """
+        return self.sign_service.campaigns.get(campaign_id)
+
+    def forget_signing_campaign(self, campaign_id: str) -> None:
+        """Drop the campaign from memory of the instance.
+
+        Campaigns are kept until forgotten, with all signature packages
+        recorded in them, so forget every campaign once it's done with.
+        Packages of the campaign decoded later aren't recorded; the
+        campaign object itself stays usable. Unknown ids are ignored.
+
+        Args:
+            campaign_id: ID of the campaign.
+        """
+        self.sign_service.campaigns.remove(campaign_id)
+
     def get_auth_deep_link(
         self,
         *,
@@ -294,6 +709,69 @@ class Diia:
             return_link=return_link,
         )
 
+    def deep_link_pool(
+        self,
+        *,
+        branch_id: str,
+        offer_id: str,
+        config: Optional[DeepLinkPoolConfig] = None,
+    ) -> DeepLinkPool[DeepLink]:
+        """Make a pool of document sharing deep links minted in advance.
+
+        The pool hands out deep links with new request ids without
+        requests to Diia, while a background thread keeps it filled
+        according to the demand. Close the pool when it's no longer needed.
+
+        Args:
+            branch_id: Branch ID.
+            offer_id: Offer ID, Offer with sharing scopes.
+            config: Settings of the pool.
+        """
+
+        def mint(request_id: str) -> DeepLink:
+            deep_link = self.get_deep_link(
+                branch_id=branch_id, offer_id=offer_id, request_id=request_id
+            )
+            return DeepLink(deep_link=deep_link, request_id=request_id)
+
+        return self._add_pool(DeepLinkPool(mint, config))
+
+    def auth_deep_link_pool(
+        self,
+        *,
+        branch_id: str,
+        offer_id: str,
+        return_link: Optional[str] = None,
+        config: Optional[DeepLinkPoolConfig] = None,
+    ) -> DeepLinkPool[AuthDeepLink]:
+        """Make a pool of authorization deep links minted in advance.
+
+        See deep_link_pool, hashes of the request ids are computed
+        in advance too.
+
+        Args:
+            branch_id: Branch ID.
+            offer_id: Offer ID, offer with `diia_id:auth` scopes.
+            return_link: Link where the customer should be redirected
+              after authorization
+            config: Settings of the pool.
+        """
+        pool = DeepLinkPool(
+            lambda request_id: self.get_auth_deep_link(
+                branch_id=branch_id,
+                offer_id=offer_id,
+                request_id=request_id,
+                return_link=return_link,
+            ),
+            config,
+        )
+        return self._add_pool(pool)
+
+    def _add_pool(self, pool: DeepLinkPool[L]) -> DeepLinkPool[L]:
+        with self._pools_lock:
+            self._pools.add(pool)
+        return pool
+
     def validate_document_by_barcode(self, *, branch_id: str, barcode: str) -> bool:
         """Validate document by barcode (on the back-side of document).
 
@@ -311,6 +789,27 @@ class Diia:
             branch_id=branch_id, barcode=barcode
         )
 
+    def get_validation_result(
+        self, *, branch_id: str, barcode: str
+    ) -> ValidationResult:
+        """Validate document by barcode, see validate_document_by_barcode.
+
+        With `validation_cache_config` set, a document validated less than
+        the cache TTL ago isn't validated again, and concurrent validations
+        of a document share a request.
+
+        Args:
+            branch_id: Branch ID.
+            barcode: Barcode.
+
+        Returns:
+            Sign of document validity and whether it's cached.
+
+        Raises:
+            DiiaClientException
+        """
+        return self.validation_service.get_validation_result(branch_id, barcode)
+
     def request_document_by_barcode(
         self, *, branch_id: str, barcode: str, request_id: str
     ) -> bool:
@@ -353,6 +852,54 @@ class Diia:
             branch_id=branch_id, qrcode=qrcode, request_id=request_id
         )
 
+    def validate_documents_by_barcode(
+        self,
+        *,
+        branch_id: str,
+        barcodes: Sequence[str],
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> Iterator[BulkItemResult[str, bool]]:
+        """Validate documents by barcodes concurrently.
+
+        Results are yielded as soon as validated, with the time each
+        validation took. A barcode repeated in the batch is validated once.
+
+        Args:
+            branch_id: Branch ID.
+            barcodes: Barcodes.
+            max_concurrency: Max number of requests at once.
+
+        Returns:
+            Iterator over results of the barcodes, in order of completion.
+        """
+        return self.validation_service.validate_documents_by_barcode(
+            branch_id, barcodes, max_concurrency=max_concurrency
+        )
+
+    def request_documents(
+        self,
+        *,
+        branch_id: str,
+        requests: Sequence[DocumentRequest],
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> Iterator[BulkItemResult[DocumentRequest, bool]]:
+        """Initiate document sharing procedures by barcodes and QR codes concurrently.
+
+        See validate_documents_by_barcode. A request repeated in the batch
+        (the same document and request id) is sent once.
+
+        Args:
+            branch_id: Branch ID.
+            requests: Requests of documents.
+            max_concurrency: Max number of requests at once.
+
+        Returns:
+            Iterator over results of the requests, in order of completion.
+        """
+        return self.sharing_service.request_documents(
+            branch_id, requests, max_concurrency=max_concurrency
+        )
+
     def decode_document_package(
         self,
         *,
@@ -393,7 +940,8 @@ class Diia:
             encode_data: Base64 encodeData from Diia request.
 
         Returns:
-            A collection of received signatures.
+            A collection of received signatures; it's also recorded in the signing
+              campaign of its request id, if any.
 
         Raises:
             DiiaClientException
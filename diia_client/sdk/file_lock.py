@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional, Union
+
+
+if sys.platform == "win32":  # pragma: no cover
+    import msvcrt
+else:
+    import fcntl
+
+
+WINDOWS_LOCK_RETRY_INTERVAL = 0.05
+
+
+class FileLock:
+    """Exclusive advisory lock on a file, shared by processes and threads.
+
+    Every acquire opens its own file descriptor, so the lock also
+    serializes threads of the same process.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> None:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if sys.platform == "win32":  # pragma: no cover
+                self._acquire_windows(fd)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    if sys.platform == "win32":  # pragma: no cover
+
+        def _acquire_windows(self, fd: int) -> None:
+            # msvcrt.LK_LOCK gives up after 10 attempts, so keep trying
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                    return
+                except OSError:
+                    time.sleep(WINDOWS_LOCK_RETRY_INTERVAL)
+
+    def release(self) -> None:
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if sys.platform == "win32":  # pragma: no cover
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.release()
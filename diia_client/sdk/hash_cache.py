@@ -0,0 +1,239 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+from diia_client.sdk.file_lock import FileLock
+from diia_client.types import Buffer
+
+
+logger = logging.getLogger(__name__)
+
+_FORMAT_VERSION = 1
+
+# identity and version of a file on disk: path, device, inode, size, mtime
+_FileStat = Tuple[str, int, int, int, int]
+
+
+@dataclass
+class HashCacheConfig:
+    """Settings of the cache of hashes of files to sign.
+
+    At most `max_size` hashes are kept, the least recently used are
+    evicted first. If `path` is set, new hashes are saved to the file
+    at most every `save_interval` seconds and on close, and are loaded
+    from it on start.
+
+    The file maps content of files to the hashes users are asked to
+    sign, so anyone who can write to its directory can make users sign
+    other data: the directory must be private to the application. It's
+    created with 0700 permissions, the files with 0600.
+    """
+
+    max_size: int = 1000
+    path: Optional[Union[str, Path]] = None
+    save_interval: float = 10
+
+
+@dataclass
+class HashCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class Fingerprint:
+    """Incremental fingerprint, see fingerprint."""
+
+    def __init__(self) -> None:
+        self._size = 0
+        self._sha256 = hashlib.sha256()
+
+    def update(self, data: Buffer) -> None:
+        self._sha256.update(data)
+        self._size += memoryview(data).nbytes
+
+    def hexdigest(self) -> str:
+        return f"{self._size}:{self._sha256.hexdigest()}"
+
+
+def fingerprint(chunks: Iterable[Buffer]) -> str:
+    """Content key of data given by chunks: its length and SHA-256.
+
+    SHA-256 is several times faster than GOST 34.311, so a hit saves
+    most of the hashing time.
+    """
+    fingerprint_ = Fingerprint()
+    for chunk in chunks:
+        fingerprint_.update(chunk)
+    return fingerprint_.hexdigest()
+
+
+def stat_file(path: Union[str, "os.PathLike[str]"]) -> Optional[_FileStat]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return os.path.abspath(path), st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class HashCache:
+    """LRU cache of hashes of files, keyed by fingerprints of their content.
+
+    Thread-safe. Processes may share the file of the cache: it's replaced
+    atomically, and every save merges the hashes saved by others under
+    a lock on a `.lock` sidecar file.
+
+    Fingerprints of files on disk are also remembered in memory by their
+    path, size and modification time, so unchanged files aren't read
+    to be looked up.
+    """
+
+    def __init__(self, config: HashCacheConfig) -> None:
+        self._config = config
+        self._path = Path(config.path) if config.path is not None else None
+        self._hashes: "OrderedDict[str, bytes]" = OrderedDict()
+        self._file_keys: "OrderedDict[_FileStat, str]" = OrderedDict()
+        self._stats = HashCacheStats()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._unsaved = False
+        self._saved_at = time.monotonic()
+        if self._path is not None:
+            _check_dir(self._path.parent)
+            self._hashes.update(_last(_read(self._path), config.max_size))
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            hash_ = self._hashes.get(key)
+            if hash_ is None:
+                self._stats.misses += 1
+            else:
+                self._hashes.move_to_end(key)
+                self._stats.hits += 1
+            return hash_
+
+    def set(self, key: str, hash_: bytes) -> None:
+        with self._lock:
+            self._hashes[key] = hash_
+            self._hashes.move_to_end(key)
+            while len(self._hashes) > self._config.max_size:
+                self._hashes.popitem(last=False)
+                self._stats.evictions += 1
+            self._unsaved = True
+            due = time.monotonic() - self._saved_at >= self._config.save_interval
+        if due:
+            self.save()
+
+    def get_file_key(self, stat: _FileStat) -> Optional[str]:
+        """Fingerprint of the file with the stat, if it was seen unchanged."""
+        with self._lock:
+            key = self._file_keys.get(stat)
+            if key is not None:
+                self._file_keys.move_to_end(stat)
+            return key
+
+    def set_file_key(self, stat: _FileStat, key: str) -> None:
+        with self._lock:
+            self._file_keys[stat] = key
+            self._file_keys.move_to_end(stat)
+            while len(self._file_keys) > self._config.max_size:
+                self._file_keys.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hashes.clear()
+            self._file_keys.clear()
+        self._save(merge=False)
+
+    def stats(self) -> HashCacheStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def save(self) -> None:
+        """Save new hashes to the file, merged with the hashes saved by others."""
+        with self._lock:
+            unsaved = self._unsaved
+        if unsaved:
+            self._save(merge=True)
+
+    def close(self) -> None:
+        """Save new hashes, see save."""
+        self.save()
+
+    def _save(self, merge: bool) -> None:
+        if self._path is None:
+            return
+        lock_path = self._path.with_name(self._path.name + ".lock")
+        try:
+            self._path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            # the lock file and the temporary file are created with 0600
+            with self._save_lock, FileLock(lock_path):
+                saved = _read(self._path) if merge else []
+                with self._lock:
+                    # hashes of this process are the most recent
+                    merged = OrderedDict(saved)
+                    for key, hash_ in self._hashes.items():
+                        merged.pop(key, None)
+                        merged[key] = hash_
+                    items = _last(list(merged.items()), self._config.max_size)
+                    self._hashes = OrderedDict(items)
+                    self._unsaved = False
+                    self._saved_at = time.monotonic()
+                _write(self._path, items)
+        except OSError as e:
+            # the cache is still usable in memory
+            logger.warning("Hash cache file %s can't be written: %r", self._path, e)
+
+
+def _check_dir(path: Path) -> None:
+    try:
+        mode = path.stat().st_mode
+    except OSError:
+        return
+    if os.name == "posix" and mode & (stat.S_IWGRP | stat.S_IWOTH):
+        logger.warning("Hash cache directory %s is writable by others", path)
+
+
+def _last(items: List[Tuple[str, bytes]], count: int) -> List[Tuple[str, bytes]]:
+    start = max(len(items) - count, 0)
+    return items[start:]
+
+
+def _read(path: Path) -> List[Tuple[str, bytes]]:
+    """Read hashes of the file in LRU order, the most recent last."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        if data["version"] != _FORMAT_VERSION:
+            return []
+        return [(key, base64.b64decode(value)) for key, value in data["hashes"]]
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        logger.warning("Hash cache file %s can't be read: %r", path, e)
+        return []
+
+
+def _write(path: Path, items: List[Tuple[str, bytes]]) -> None:
+    data = {
+        "version": _FORMAT_VERSION,
+        "hashes": [[key, base64.b64encode(value).decode()] for key, value in items],
+    }
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from dataclasses import dataclass
+from typing import Optional, Tuple, Type, Union
 
 from diia_client.types import DataDict, StrDict
 
@@ -7,14 +8,43 @@ from diia_client.types import DataDict, StrDict
 DEFAULT_TIMEOUT = 15
 
 
+@dataclass(frozen=True)
+class Timeout:
+    """Separate timeouts, in seconds, to connect to Diia and to read the response."""
+
+    connect: float
+    read: float
+
+
+# seconds for both connect and read, or Timeout
+TimeoutValue = Union[float, Timeout]
+
+
+def get_status_code(error: BaseException) -> Optional[int]:
+    """Get HTTP status code of the response an HTTP client error was raised for.
+
+    Works for errors of requests and httpx, that keep the response
+    in `response` attribute, returns None for other errors.
+    """
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
 class AbstractHTTPCLient(ABC):
+    # errors raised when a request fails without a response (e.g. connection
+    # reset or timeout); idempotent requests are retried on them
+    transport_errors: Tuple[Type[BaseException], ...] = ()
+
+    def close(self) -> None:
+        """Release resources (e.g. pooled connections) held by the client."""
+
     @abstractmethod
     def get(
         self,
         url: str,
         params: Optional[DataDict] = None,
         headers: Optional[StrDict] = None,
-        timeout: float = DEFAULT_TIMEOUT,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
     ) -> DataDict:
         ...
 
@@ -25,7 +55,7 @@ class AbstractHTTPCLient(ABC):
         json: DataDict,
         params: Optional[DataDict] = None,
         headers: Optional[StrDict] = None,
-        timeout: float = DEFAULT_TIMEOUT,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
     ) -> DataDict:
         ...
 
@@ -36,7 +66,7 @@ class AbstractHTTPCLient(ABC):
         json: DataDict,
         params: Optional[DataDict] = None,
         headers: Optional[StrDict] = None,
-        timeout: float = DEFAULT_TIMEOUT,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
     ) -> DataDict:
         ...
 
@@ -46,6 +76,57 @@ class AbstractHTTPCLient(ABC):
         url: str,
         params: Optional[DataDict] = None,
         headers: Optional[StrDict] = None,
-        timeout: float = DEFAULT_TIMEOUT,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
+    ) -> None:
+        ...
+
+
+class AbstractAsyncHTTPClient(ABC):
+    # errors raised when a request fails without a response (e.g. connection
+    # reset or timeout); idempotent requests are retried on them
+    transport_errors: Tuple[Type[BaseException], ...] = ()
+
+    async def close(self) -> None:
+        """Release resources (e.g. pooled connections) held by the client."""
+
+    @abstractmethod
+    async def get(
+        self,
+        url: str,
+        params: Optional[DataDict] = None,
+        headers: Optional[StrDict] = None,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
+    ) -> DataDict:
+        ...
+
+    @abstractmethod
+    async def post(
+        self,
+        url: str,
+        json: DataDict,
+        params: Optional[DataDict] = None,
+        headers: Optional[StrDict] = None,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
+    ) -> DataDict:
+        ...
+
+    @abstractmethod
+    async def put(
+        self,
+        url: str,
+        json: DataDict,
+        params: Optional[DataDict] = None,
+        headers: Optional[StrDict] = None,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
+    ) -> DataDict:
+        ...
+
+    @abstractmethod
+    async def delete(
+        self,
+        url: str,
+        params: Optional[DataDict] = None,
+        headers: Optional[StrDict] = None,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
     ) -> None:
         ...
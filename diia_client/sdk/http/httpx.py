@@ -0,0 +1,155 @@
+from typing import Any, Optional
+
+import httpx
+
+from diia_client import codec
+from diia_client.sdk.http.base_client import (
+    DEFAULT_TIMEOUT,
+    AbstractAsyncHTTPClient,
+    Timeout,
+    TimeoutValue,
+)
+from diia_client.types import DataDict, StrDict
+
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+
+
+class HttpxAsyncHTTPClient(AbstractAsyncHTTPClient):
+    """AbstractAsyncHTTPClient implementation based on httpx lib.
+
+    All requests go through a single pooled `httpx.AsyncClient`, so one event
+    loop can keep many Diia calls in flight over kept-alive connections.
+    The client must be used from the event loop it was first used in.
+    """
+
+    transport_errors = (
+        httpx.TimeoutException,
+        httpx.NetworkError,
+        httpx.RemoteProtocolError,
+    )
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        """HttpxAsyncHTTPClient constructor.
+
+        Args:
+            max_connections: Max number of concurrent connections.
+            max_keepalive_connections: Max number of idle connections kept alive.
+            client: Optional preconfigured client (proxies, certificates etc.);
+              the pool limits are ignored in that case.
+        """
+        self._client = client or httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            )
+        )
+
+    async def __aenter__(self) -> "HttpxAsyncHTTPClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        await self._client.aclose()
+
+    def _prepare_timeout(self, timeout: TimeoutValue) -> httpx.Timeout:
+        if isinstance(timeout, Timeout):
+            return httpx.Timeout(timeout.read, connect=timeout.connect)
+        return httpx.Timeout(timeout)
+
+    def _prepare_json_headers(self, headers: Optional[StrDict]) -> StrDict:
+        # the body is serialized by the SDK codec instead of httpx
+        return {**(headers or {}), "Content-Type": "application/json"}
+
+    def _raise_for_status(self, r: httpx.Response) -> None:
+        if 400 <= r.status_code < 500:
+            try:
+                body = codec.loads(r.content)
+            except Exception:
+                # e.g. 401 from a gateway, keep the status code for the caller
+                body = r.text
+            msg = (
+                f"{r.status_code} Client Error: {r.reason_phrase} for url: {r.url}, "
+                f"json: {body}"
+            )
+            raise httpx.HTTPStatusError(msg, request=r.request, response=r)
+
+        elif 500 <= r.status_code < 600:
+            r.raise_for_status()
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[DataDict] = None,
+        headers: Optional[StrDict] = None,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
+    ) -> DataDict:
+        r = await self._client.get(
+            url=url,
+            params=params,
+            headers=headers,
+            timeout=self._prepare_timeout(timeout),
+        )
+        self._raise_for_status(r)
+        return codec.loads(r.content)
+
+    async def post(
+        self,
+        url: str,
+        json: DataDict,
+        params: Optional[DataDict] = None,
+        headers: Optional[StrDict] = None,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
+    ) -> DataDict:
+        r = await self._client.post(
+            url=url,
+            params=params,
+            headers=self._prepare_json_headers(headers),
+            content=codec.dumps(json),
+            timeout=self._prepare_timeout(timeout),
+        )
+        self._raise_for_status(r)
+        return codec.loads(r.content)
+
+    async def put(
+        self,
+        url: str,
+        json: DataDict,
+        params: Optional[DataDict] = None,
+        headers: Optional[StrDict] = None,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
+    ) -> DataDict:
+        r = await self._client.put(
+            url=url,
+            params=params,
+            headers=self._prepare_json_headers(headers),
+            content=codec.dumps(json),
+            timeout=self._prepare_timeout(timeout),
+        )
+        self._raise_for_status(r)
+        return codec.loads(r.content)
+
+    async def delete(
+        self,
+        url: str,
+        params: Optional[DataDict] = None,
+        headers: Optional[StrDict] = None,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
+    ) -> None:
+        r = await self._client.delete(
+            url=url,
+            params=params,
+            headers=headers,
+            timeout=self._prepare_timeout(timeout),
+        )
+        self._raise_for_status(r)
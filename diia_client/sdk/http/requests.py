@@ -1,17 +1,141 @@
-from typing import Optional
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from diia_client.sdk.http.base_client import DEFAULT_TIMEOUT, AbstractHTTPCLient
+from diia_client import codec
+from diia_client.sdk.http.base_client import (
+    DEFAULT_TIMEOUT,
+    AbstractHTTPCLient,
+    Timeout,
+    TimeoutValue,
+)
 from diia_client.types import DataDict, StrDict
 
 
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+
+@dataclass
+class PoolStats:
+    host: str
+    num_connections: int
+    num_requests: int
+    idle_connections: int
+
+
 class RequestsHTTPClient(AbstractHTTPCLient):
-    """AbstractHTTPCLient implementation based on requests lib."""
+    """AbstractHTTPCLient implementation based on requests lib.
+
+    All requests go through a single `requests.Session`, so connections
+    (and their TLS sessions) to the Diia host are kept alive and reused
+    instead of being opened for every call. `requests.Session` itself
+    isn't documented as thread-safe; the client only reads its settings
+    and per-call headers, while connections are taken from the urllib3
+    pool, which is thread-safe. So the client may be shared by threads
+    as long as the session isn't reconfigured while in use.
+    """
+
+    transport_errors = (requests.ConnectionError, requests.Timeout)
+
+    def __init__(
+        self,
+        *,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        """RequestsHTTPClient constructor.
+
+        Args:
+            pool_connections: Number of per-host connection pools to cache.
+            pool_maxsize: Max number of kept-alive connections per host;
+              set it to the number of threads that use the client concurrently.
+            pool_block: Wait for a free connection when the pool is exhausted
+              instead of opening a throwaway one.
+            session: Optional preconfigured session (proxies, certificates,
+              adapters etc.), used as is: the pool settings above apply only
+              to the session made by the client, so mount an HTTPAdapter
+              with them on your session.
+        """
+        if session is not None:
+            self._session = session
+            return
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self._session = requests.Session()
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def __enter__(self) -> "RequestsHTTPClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self._session.close()
+
+    def pool_stats(self) -> List[PoolStats]:
+        """Get usage statistics of per-host connection pools."""
+        stats = []
+        for pool in self._iter_pools():
+            stats.append(
+                PoolStats(
+                    host=f"{pool.scheme}://{pool.host}:{pool.port}",
+                    num_connections=pool.num_connections,
+                    num_requests=pool.num_requests,
+                    idle_connections=self._count_idle_connections(pool),
+                )
+            )
+        return stats
+
+    def _iter_pools(self) -> Iterator[Any]:
+        adapters = {id(a): a for a in self._session.adapters.values()}.values()
+        for adapter in adapters:
+            pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+            if pools is None:
+                continue
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    yield pool
+
+    def _count_idle_connections(self, pool: Any) -> int:
+        # closed pool has no queue; empty slots of the queue are None
+        if pool.pool is None:
+            return 0
+        return sum(1 for conn in list(pool.pool.queue) if conn is not None)
+
+    def _prepare_timeout(
+        self, timeout: TimeoutValue
+    ) -> Union[float, Tuple[float, float]]:
+        if isinstance(timeout, Timeout):
+            return timeout.connect, timeout.read
+        return timeout
+
+    def _prepare_json_headers(self, headers: Optional[StrDict]) -> StrDict:
+        # the body is serialized by the SDK codec instead of requests
+        return {**(headers or {}), "Content-Type": "application/json"}
 
     def _raise_for_status(self, r: requests.Response) -> None:
         if 400 <= r.status_code < 500:
-            msg = f"{r.status_code} Client Error: {r.reason} for url: {r.url}, json: {r.json()}"
+            try:
+                body = codec.loads(r.content)
+            except Exception:
+                # e.g. 401 from a gateway, keep the status code for the caller
+                body = r.text
+            msg = (
+                f"{r.status_code} Client Error: {r.reason} for url: {r.url}, "
+                f"json: {body}"
+            )
             raise requests.HTTPError(msg, response=r)
 
         elif 500 <= r.status_code < 600:
@@ -22,11 +146,16 @@ class RequestsHTTPClient(AbstractHTTPCLient):
         url: str,
         params: Optional[DataDict] = None,
         headers: Optional[StrDict] = None,
-        timeout: float = DEFAULT_TIMEOUT,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
     ) -> DataDict:
-        r = requests.get(url=url, params=params, headers=headers, timeout=timeout)
+        r = self._session.get(
+            url=url,
+            params=params,
+            headers=headers,
+            timeout=self._prepare_timeout(timeout),
+        )
         self._raise_for_status(r)
-        return r.json()
+        return codec.loads(r.content)
 
     def post(
         self,
@@ -34,13 +163,17 @@ class RequestsHTTPClient(AbstractHTTPCLient):
         json: DataDict,
         params: Optional[DataDict] = None,
         headers: Optional[StrDict] = None,
-        timeout: float = DEFAULT_TIMEOUT,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
     ) -> DataDict:
-        r = requests.post(
-            url=url, params=params, headers=headers, json=json, timeout=timeout
+        r = self._session.post(
+            url=url,
+            params=params,
+            headers=self._prepare_json_headers(headers),
+            data=codec.dumps(json),
+            timeout=self._prepare_timeout(timeout),
         )
         self._raise_for_status(r)
-        return r.json()
+        return codec.loads(r.content)
 
     def put(
         self,
@@ -48,20 +181,29 @@ class RequestsHTTPClient(AbstractHTTPCLient):
         json: DataDict,
         params: Optional[DataDict] = None,
         headers: Optional[StrDict] = None,
-        timeout: float = DEFAULT_TIMEOUT,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
     ) -> DataDict:
-        r = requests.put(
-            url=url, params=params, headers=headers, json=json, timeout=timeout
+        r = self._session.put(
+            url=url,
+            params=params,
+            headers=self._prepare_json_headers(headers),
+            data=codec.dumps(json),
+            timeout=self._prepare_timeout(timeout),
         )
         self._raise_for_status(r)
-        return r.json()
+        return codec.loads(r.content)
 
     def delete(
         self,
         url: str,
         params: Optional[DataDict] = None,
         headers: Optional[StrDict] = None,
-        timeout: float = DEFAULT_TIMEOUT,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
     ) -> None:
-        r = requests.delete(url=url, params=params, headers=headers, timeout=timeout)
+        r = self._session.delete(
+            url=url,
+            params=params,
+            headers=headers,
+            timeout=self._prepare_timeout(timeout),
+        )
         self._raise_for_status(r)
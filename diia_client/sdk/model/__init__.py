@@ -8,9 +8,11 @@ from diia_client.sdk.model.birth_certificate import (
     Parents,
 )
 from diia_client.sdk.model.decoded_file import DecodedFile
+from diia_client.sdk.model.deep_link import DeepLink
 from diia_client.sdk.model.document_package import DocumentPackage
+from diia_client.sdk.model.document_request import DocumentRequest
 from diia_client.sdk.model.encoded_file import EncodedFile
-from diia_client.sdk.model.file import File
+from diia_client.sdk.model.file import AnyFile, File, PathFile, StreamFile
 from diia_client.sdk.model.foreign_passport import ForeignPassport
 from diia_client.sdk.model.hashed_file import HashedFile
 from diia_client.sdk.model.internal_passport import InternalPassport
@@ -22,19 +24,23 @@ from diia_client.sdk.model.reference_internally_displaced_person import (
 )
 from diia_client.sdk.model.signatures_package import Signature, SignaturePackage
 from diia_client.sdk.model.taxpayer_card import TaxpayerCard
+from diia_client.sdk.model.validation_result import ValidationResult
 
 
 __all__ = [
     "Act",
     "Address",
+    "AnyFile",
     "AuthDeepLink",
     "BirthCertificate",
     "Child",
     "Data",
     "DecodedFile",
+    "DeepLink",
     "DocIdentity",
     "Document",
     "DocumentPackage",
+    "DocumentRequest",
     "EncodedFile",
     "File",
     "ForeignPassport",
@@ -43,8 +49,11 @@ __all__ = [
     "Metadata",
     "Parent",
     "Parents",
+    "PathFile",
     "ReferenceInternallyDisplacedPerson",
     "Signature",
     "SignaturePackage",
+    "StreamFile",
     "TaxpayerCard",
+    "ValidationResult",
 ]
@@ -0,0 +1,7 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class DeepLink:
+    deep_link: str
+    request_id: str
@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+
+@dataclass
+class DocumentRequest:
+    """Request of a document identified by either barcode or QR code."""
+
+    request_id: str
+    barcode: Optional[str] = None
+    qrcode: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if (self.barcode is None) == (self.qrcode is None):
+            raise ValueError("Either barcode or qrcode is required")
+
+    @property
+    def key(self) -> Hashable:
+        """Requests with equal keys are the same request, sent to Diia once."""
+        if self.barcode:
+            return "barcode", self.barcode, self.request_id
+        return "qrcode", self.qrcode, self.request_id
@@ -1,7 +1,57 @@
+import os
 from dataclasses import dataclass
+from typing import BinaryIO, Iterator, Union
+
+from diia_client.types import Buffer
+
+
+# files are read by chunks of this size, to keep the memory flat
+CHUNK_SIZE = 1 << 20
 
 
 @dataclass
 class File:
+    """File in memory; data may be bytes or any buffer, e.g. an mmap."""
+
+    filename: str
+    data: Buffer
+
+    def iter_chunks(self) -> Iterator[Buffer]:
+        yield self.data
+
+
+@dataclass
+class PathFile:
+    """File read from the path by chunks."""
+
+    filename: str
+    path: Union[str, "os.PathLike[str]"]
+
+    def iter_chunks(self) -> Iterator[Buffer]:
+        with open(self.path, "rb") as stream:
+            yield from _read_chunks(stream)
+
+
+@dataclass
+class StreamFile:
+    """File read by chunks from a binary file object, from its position.
+
+    The file object isn't closed.
+    """
+
     filename: str
-    data: bytes
+    stream: BinaryIO
+
+    def iter_chunks(self) -> Iterator[Buffer]:
+        return _read_chunks(self.stream)
+
+
+AnyFile = Union[File, PathFile, StreamFile]
+
+
+def _read_chunks(stream: BinaryIO) -> Iterator[Buffer]:
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
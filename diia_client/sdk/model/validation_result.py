@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ValidationResult:
+    is_valid: bool
+    # validated by an earlier call, not more than the cache TTL ago
+    from_cache: bool
@@ -0,0 +1,134 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+from diia_client.enums import DiiaIDAction, DocumentType
+from diia_client.sdk.remote.model import Offer
+
+
+Scope = Union[DocumentType, DiiaIDAction]
+
+_SCOPE_BITS: Dict[Scope, int] = {
+    scope: 1 << i for i, scope in enumerate([*DocumentType, *DiiaIDAction])
+}
+
+
+def scope_mask(
+    sharing: Optional[Iterable[DocumentType]] = None,
+    diia_id: Optional[Iterable[DiiaIDAction]] = None,
+) -> int:
+    """Bitset of the scopes."""
+    scopes: List[Scope] = [*(sharing or ()), *(diia_id or ())]
+    mask = 0
+    for scope in scopes:
+        mask |= _SCOPE_BITS[scope]
+    return mask
+
+
+def offer_mask(offer: Offer) -> int:
+    return scope_mask(offer.scopes.sharing, offer.scopes.diia_id)
+
+
+def _index(offers: Iterable[Offer]) -> Dict[int, Offer]:
+    """Map every subset of scopes to the offer having it with the fewest
+    other scopes.
+    """
+    best: Dict[int, Offer] = {}
+    best_size: Dict[int, int] = {}
+    masks: Dict[int, Offer] = {}
+    for offer in sorted(offers, key=lambda o: o.name):
+        masks.setdefault(offer_mask(offer), offer)
+
+    for mask, offer in masks.items():
+        size = bin(mask).count("1")
+        # all submasks of the mask, including 0
+        submask = mask
+        while True:
+            if size < best_size.get(submask, size + 1):
+                best[submask] = offer
+                best_size[submask] = size
+            if submask == 0:
+                break
+            submask = (submask - 1) & mask
+    return best
+
+
+class _BranchOffers:
+    def __init__(self, offers: Iterable[Offer]) -> None:
+        self.offers = {o.id: o for o in offers}
+        self.by_scopes = _index(self.offers.values())
+
+
+class OfferRegistry:
+    """In-memory index of offers by branch and scopes.
+
+    A lookup is a dict access: all subsets of the scopes of every offer
+    are precomputed when offers of a branch change. Loaded by offer
+    services from Diia and kept current by their create and delete calls.
+    """
+
+    def __init__(self) -> None:
+        # replaced as a whole on changes, so lookups don't take the lock
+        self._branches: Dict[str, _BranchOffers] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def has_branch(self, branch_id: str) -> bool:
+        return branch_id in self._branches
+
+    def find(
+        self,
+        branch_id: str,
+        *,
+        sharing: Optional[Iterable[DocumentType]] = None,
+        diia_id: Optional[Iterable[DiiaIDAction]] = None,
+    ) -> Optional[Offer]:
+        """Find the offer of a loaded branch having the scopes.
+
+        Of several such offers the one with the fewest other scopes is
+        returned, so users aren't asked for documents that aren't needed.
+        """
+        branch = self._branches.get(branch_id)
+        if branch is None:
+            return None
+        offer = branch.by_scopes.get(scope_mask(sharing, diia_id))
+        return offer.copy(deep=True) if offer is not None else None
+
+    def generation(self) -> int:
+        """Generation to pass to set_offers, taken before fetching the offers."""
+        return self._generation
+
+    def set_offers(
+        self, branch_id: str, offers: Sequence[Offer], generation: Optional[int] = None
+    ) -> None:
+        """Index fetched offers of the branch.
+
+        Offers fetched before a change made by add, remove or forget
+        (`generation` is outdated) are dropped.
+        """
+        branch = _BranchOffers(o.copy(deep=True) for o in offers)
+        with self._lock:
+            if generation is None or generation == self._generation:
+                self._branches[branch_id] = branch
+
+    def add(self, branch_id: str, offer: Offer) -> None:
+        """Add a created offer to a loaded branch."""
+        with self._lock:
+            self._generation += 1
+            branch = self._branches.get(branch_id)
+            if branch is not None:
+                offers = [*branch.offers.values(), offer.copy(deep=True)]
+                self._branches[branch_id] = _BranchOffers(offers)
+
+    def remove(self, branch_id: str, offer_id: str) -> None:
+        with self._lock:
+            self._generation += 1
+            branch = self._branches.get(branch_id)
+            if branch is not None and offer_id in branch.offers:
+                offers = [o for o in branch.offers.values() if o.id != offer_id]
+                self._branches[branch_id] = _BranchOffers(offers)
+
+    def forget(self, branch_id: str) -> None:
+        """Drop the branch, e.g. deleted or changed unknown way, to be loaded again."""
+        with self._lock:
+            self._generation += 1
+            self._branches.pop(branch_id, None)
@@ -0,0 +1,174 @@
+"""Iteration over paginated Diia lists (branches, offers).
+
+Pages are requested by `skip`/`limit`: the first page gives `total`, the
+following pages are planned from it and fetched `prefetch` pages ahead
+while the current one is consumed, so at most `prefetch + 1` pages are
+held in memory. Page size adapts to the time Diia takes to return a page.
+"""
+import asyncio
+import contextvars
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+
+T = TypeVar("T")
+
+# total and items of a page
+Page = Tuple[int, List[T]]
+
+DEFAULT_PAGE_SIZE = 100
+MIN_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 500
+DEFAULT_PREFETCH = 2
+TARGET_PAGE_DURATION = 1.0
+
+
+class PageSizer:
+    """Adapts page size so that a page takes about `target_duration` seconds.
+
+    The size doubles after fast pages and halves after slow ones; when Diia
+    returns less items than requested, the size is capped by that number.
+    """
+
+    def __init__(
+        self,
+        size: int = DEFAULT_PAGE_SIZE,
+        *,
+        min_size: int = MIN_PAGE_SIZE,
+        max_size: int = MAX_PAGE_SIZE,
+        target_duration: float = TARGET_PAGE_DURATION,
+    ) -> None:
+        self.size = size
+        self.min_size = min(min_size, size)
+        self.max_size = max(max_size, size)
+        self.target_duration = target_duration
+
+    def record(self, duration: float) -> None:
+        if duration < self.target_duration / 2:
+            self.size = min(self.max_size, self.size * 2)
+        elif duration > self.target_duration:
+            self.size = max(self.min_size, self.size // 2)
+
+    def cap(self, size: int) -> None:
+        self.max_size = self.size = max(1, size)
+        self.min_size = min(self.min_size, self.max_size)
+
+
+def _plan_gap(
+    skip: int, limit: int, total: int, count: int
+) -> Optional[Tuple[int, int]]:
+    """Range of a page left unfetched when Diia returned only `count` items."""
+    end = skip + count
+    if count == 0 or count >= limit or end >= total:
+        return None
+    return end, skip + limit - end
+
+
+def iter_pages(
+    fetch: Callable[[int, int], Page[T]],
+    *,
+    page_size: Optional[int] = None,
+    prefetch: int = DEFAULT_PREFETCH,
+) -> Iterator[T]:
+    """Iterate over items of all pages, fetching pages in a thread pool.
+
+    Args:
+        fetch: Function getting a page by skip and limit.
+        page_size: Initial page size.
+        prefetch: Number of pages fetched ahead, at least 1.
+    """
+    sizer = PageSizer(page_size or DEFAULT_PAGE_SIZE)
+    prefetch = max(1, prefetch)
+
+    def timed_fetch(skip: int, limit: int) -> Tuple[Page[T], float]:
+        started = time.monotonic()
+        page = fetch(skip, limit)
+        return page, time.monotonic() - started
+
+    with ThreadPoolExecutor(prefetch) as executor:
+        pending: Deque[Tuple[int, int, "Future[Tuple[Page[T], float]]"]] = deque()
+
+        def submit(skip: int, limit: int, first: bool = False) -> None:
+            # run in the context of the caller, e.g. to respect its deadline
+            context = contextvars.copy_context()
+            future = executor.submit(context.run, timed_fetch, skip, limit)
+            if first:
+                pending.appendleft((skip, limit, future))
+            else:
+                pending.append((skip, limit, future))
+
+        submit(0, sizer.size)
+        next_skip = sizer.size
+        try:
+            while pending:
+                skip, limit, future = pending.popleft()
+                (total, items), duration = future.result()
+                sizer.record(duration)
+                gap = _plan_gap(skip, limit, total, len(items))
+                if gap is not None:
+                    sizer.cap(len(items))
+                    submit(*gap, first=True)
+                while len(pending) < prefetch and next_skip < total:
+                    submit(next_skip, sizer.size)
+                    next_skip += sizer.size
+                yield from items
+        finally:
+            for _, _, future in pending:
+                future.cancel()
+
+
+async def async_iter_pages(
+    fetch: Callable[[int, int], Awaitable[Page[T]]],
+    *,
+    page_size: Optional[int] = None,
+    prefetch: int = DEFAULT_PREFETCH,
+) -> AsyncIterator[T]:
+    """See iter_pages, pages are fetched by concurrent tasks."""
+    sizer = PageSizer(page_size or DEFAULT_PAGE_SIZE)
+    prefetch = max(1, prefetch)
+
+    async def timed_fetch(skip: int, limit: int) -> Tuple[Page[T], float]:
+        started = time.monotonic()
+        page = await fetch(skip, limit)
+        return page, time.monotonic() - started
+
+    pending: Deque[Tuple[int, int, "asyncio.Future[Tuple[Page[T], float]]"]] = deque()
+
+    def submit(skip: int, limit: int, first: bool = False) -> None:
+        task = asyncio.ensure_future(timed_fetch(skip, limit))
+        if first:
+            pending.appendleft((skip, limit, task))
+        else:
+            pending.append((skip, limit, task))
+
+    submit(0, sizer.size)
+    next_skip = sizer.size
+    try:
+        while pending:
+            skip, limit, task = pending.popleft()
+            (total, items), duration = await task
+            sizer.record(duration)
+            gap = _plan_gap(skip, limit, total, len(items))
+            if gap is not None:
+                sizer.cap(len(items))
+                submit(*gap, first=True)
+            while len(pending) < prefetch and next_skip < total:
+                submit(next_skip, sizer.size)
+                next_skip += sizer.size
+            for item in items:
+                yield item
+    finally:
+        for _, _, task in pending:
+            task.cancel()
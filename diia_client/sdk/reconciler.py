@@ -0,0 +1,346 @@
+"""Reconciliation of branches and offers with a desired state, e.g. from config.
+
+Branches are identified by name, offers by name within their branch.
+"""
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+
+from diia_client.enums import ChangeAction
+from diia_client.exceptions import DiiaClientException
+from diia_client.models import BaseModel
+from diia_client.sdk.bulk import (
+    DEFAULT_BULK_CONCURRENCY,
+    BulkItemResult,
+    BulkResult,
+    run_bulk,
+)
+from diia_client.sdk.diia import Diia
+from diia_client.sdk.remote.model import Branch, Offer
+
+
+class DesiredBranch(Branch):
+    """Branch with the offers it should have."""
+
+    offers: List[Offer] = []
+
+
+class DesiredState(BaseModel):
+    """Desired branches of the acquirer, e.g. `DesiredState.parse_obj(config)`."""
+
+    branches: List[DesiredBranch] = []
+
+
+Diff = Dict[str, Tuple[Any, Any]]
+
+
+@dataclass
+class Change:
+    action: ChangeAction
+    branch_name: str
+    # empty for a branch created by the plan
+    branch_id: str = ""
+    offer_name: Optional[str] = None
+    offer_id: str = ""
+    desired: Optional[Union[Branch, Offer]] = None
+    # changed fields: old and new values
+    diff: Diff = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        symbol = _SYMBOLS[self.action]
+        if self.offer_name is None:
+            line = f'{symbol} branch "{self.branch_name}"'
+        else:
+            line = f'{symbol} offer "{self.offer_name}" of branch "{self.branch_name}"'
+        if self.action == ChangeAction.DELETE_BRANCH:
+            line += " with its offers"
+        return "\n".join(
+            [line]
+            + [
+                f"    {name}: {old!r} -> {new!r}"
+                for name, (old, new) in self.diff.items()
+            ]
+        )
+
+
+_SYMBOLS = {
+    ChangeAction.CREATE_BRANCH: "+",
+    ChangeAction.UPDATE_BRANCH: "~",
+    ChangeAction.DELETE_BRANCH: "-",
+    ChangeAction.CREATE_OFFER: "+",
+    ChangeAction.REPLACE_OFFER: "-/+",
+    ChangeAction.DELETE_OFFER: "-",
+}
+
+
+@dataclass
+class Plan:
+    changes: List[Change]
+
+    @property
+    def empty(self) -> bool:
+        return not self.changes
+
+    def format(self) -> str:
+        """Dry-run diff of the plan."""
+        if self.empty:
+            return "No changes"
+        return "\n".join(str(change) for change in self.changes)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _plain(v) for key, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        # order of scopes doesn't matter
+        return sorted(_plain(v) for v in value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _diff(
+    current: Mapping[str, Any], desired: Mapping[str, Any], prefix: str = ""
+) -> Diff:
+    diff: Diff = {}
+    for key in sorted({*current, *desired}):
+        old, new = current.get(key), desired.get(key)
+        name = f"{prefix}{key}"
+        if isinstance(old, dict) and isinstance(new, dict):
+            diff.update(_diff(old, new, f"{name}."))
+        elif old != new and not (old in (None, []) and new in (None, [])):
+            diff[name] = (old, new)
+    return diff
+
+
+def _branch_fields(branch: Branch) -> Dict[str, Any]:
+    return _plain(branch.dict(exclude={"id", "offers"}))
+
+
+def _offer_fields(offer: Offer) -> Dict[str, Any]:
+    return _plain(offer.dict(exclude={"id"}))
+
+
+def make_plan(
+    desired: DesiredState,
+    branches: Sequence[Branch],
+    offers: Mapping[str, Sequence[Offer]],
+    *,
+    prune: bool = True,
+) -> Plan:
+    """Plan changes turning the current state into the desired one.
+
+    Args:
+        desired: Desired state.
+        branches: Current branches.
+        offers: Current offers of the branches by branch id,
+          required for the branches of the desired state.
+        prune: Whether to delete branches and offers missing in the desired state.
+    """
+    current_branches = {b.name: b for b in branches}
+    changes = []
+    for desired_branch in desired.branches:
+        name = desired_branch.name
+        branch = Branch(**desired_branch.dict(exclude={"offers"}))
+        current = current_branches.get(name)
+        if current is None:
+            changes.append(Change(ChangeAction.CREATE_BRANCH, name, desired=branch))
+            changes.extend(
+                Change(ChangeAction.CREATE_OFFER, name, offer_name=o.name, desired=o)
+                for o in desired_branch.offers
+            )
+            continue
+
+        branch.id = current.id
+        diff = _diff(_branch_fields(current), _branch_fields(branch))
+        if diff:
+            changes.append(
+                Change(
+                    ChangeAction.UPDATE_BRANCH,
+                    name,
+                    branch_id=current.id,
+                    desired=branch,
+                    diff=diff,
+                )
+            )
+        changes.extend(
+            _plan_offers(desired_branch, current, offers[current.id], prune=prune)
+        )
+
+    if prune:
+        names = {b.name for b in desired.branches}
+        changes.extend(
+            Change(ChangeAction.DELETE_BRANCH, b.name, branch_id=b.id)
+            for b in branches
+            if b.name not in names
+        )
+    return Plan(changes)
+
+
+def _plan_offers(
+    desired_branch: DesiredBranch,
+    branch: Branch,
+    offers: Sequence[Offer],
+    *,
+    prune: bool,
+) -> List[Change]:
+    current_offers = {o.name: o for o in offers}
+    changes = []
+    for offer in desired_branch.offers:
+        current = current_offers.get(offer.name)
+        if current is None:
+            changes.append(
+                Change(
+                    ChangeAction.CREATE_OFFER,
+                    branch.name,
+                    branch_id=branch.id,
+                    offer_name=offer.name,
+                    desired=offer,
+                )
+            )
+            continue
+        diff = _diff(_offer_fields(current), _offer_fields(offer))
+        if diff:
+            changes.append(
+                Change(
+                    ChangeAction.REPLACE_OFFER,
+                    branch.name,
+                    branch_id=branch.id,
+                    offer_name=offer.name,
+                    offer_id=current.id,
+                    desired=offer,
+                    diff=diff,
+                )
+            )
+
+    if prune:
+        names = {o.name for o in desired_branch.offers}
+        changes.extend(
+            Change(
+                ChangeAction.DELETE_OFFER,
+                branch.name,
+                branch_id=branch.id,
+                offer_name=o.name,
+                offer_id=o.id,
+            )
+            for o in offers
+            if o.name not in names
+        )
+    return changes
+
+
+class Reconciler:
+    """Brings branches and offers of the acquirer to a desired state.
+
+    Example:
+        reconciler = Reconciler(diia)
+        plan = reconciler.plan(DesiredState.parse_obj(config))
+        print(plan.format())
+        result = reconciler.apply(plan)
+
+    Replaced offers get new ids, so deep links must be requested with them.
+    """
+
+    def __init__(
+        self, diia: Diia, *, max_concurrency: int = DEFAULT_BULK_CONCURRENCY
+    ) -> None:
+        self.diia = diia
+        self.max_concurrency = max_concurrency
+
+    def plan(self, desired: DesiredState, *, prune: bool = True) -> Plan:
+        """Fetch the current state and plan changes, nothing is changed.
+
+        Raises:
+            DiiaClientException: If the current state can't be fetched.
+        """
+        branches = list(self.diia.iter_branches())
+        names = {b.name for b in desired.branches}
+        fetched = run_bulk(
+            lambda b: list(self.diia.iter_offers(branch_id=b.id)),
+            [b for b in branches if b.name in names],
+            max_concurrency=self.max_concurrency,
+        )
+        for item in fetched.failed:
+            raise DiiaClientException("Get offers error", item.error)
+        offers = {item.item.id: item.result or [] for item in fetched.items}
+        return make_plan(desired, branches, offers, prune=prune)
+
+    def apply(self, plan: Plan) -> BulkResult[Change, str]:
+        """Apply the plan concurrently.
+
+        Branches are created and updated first, then offers are changed,
+        then branches are deleted. A failed change doesn't stop others
+        (except offers of a branch that failed to be created); to resume,
+        plan and apply again.
+
+        Returns:
+            Per change results with ids of changed branches and offers.
+        """
+        results: Dict[int, BulkItemResult[Change, str]] = {}
+        branch_ids: Dict[str, str] = {}
+
+        def run_phase(
+            actions: Sequence[ChangeAction], func: Callable[[Change], str]
+        ) -> None:
+            indexes = [i for i, c in enumerate(plan.changes) if c.action in actions]
+            phase = run_bulk(
+                func,
+                [plan.changes[i] for i in indexes],
+                max_concurrency=self.max_concurrency,
+            )
+            results.update(zip(indexes, phase.items))
+
+        def change_branch(change: Change) -> str:
+            branch = cast(Branch, change.desired).copy(deep=True)
+            if change.action == ChangeAction.CREATE_BRANCH:
+                branch = self.diia.branch_service.add_branch(branch)
+            else:
+                branch = self.diia.update_branch(branch)
+            branch_ids[change.branch_name] = branch.id
+            return branch.id
+
+        def change_offer(change: Change) -> str:
+            branch_id = change.branch_id or branch_ids.get(change.branch_name)
+            if not branch_id:
+                raise DiiaClientException("Branch not created", change.branch_name)
+            if change.action != ChangeAction.CREATE_OFFER:
+                self.diia.delete_offer(branch_id=branch_id, offer_id=change.offer_id)
+            if change.action == ChangeAction.DELETE_OFFER:
+                return change.offer_id
+            offer = self.diia.offer_service.add_offer(
+                branch_id=branch_id, offer=cast(Offer, change.desired).copy(deep=True)
+            )
+            return offer.id
+
+        def delete_branch(change: Change) -> str:
+            result = self.diia.delete_branch_cascade(
+                change.branch_id, max_concurrency=self.max_concurrency
+            )
+            for item in result.failed:
+                raise DiiaClientException("Delete branch error", item.error)
+            return change.branch_id
+
+        run_phase(
+            [ChangeAction.CREATE_BRANCH, ChangeAction.UPDATE_BRANCH], change_branch
+        )
+        run_phase(
+            [
+                ChangeAction.CREATE_OFFER,
+                ChangeAction.REPLACE_OFFER,
+                ChangeAction.DELETE_OFFER,
+            ],
+            change_offer,
+        )
+        run_phase([ChangeAction.DELETE_BRANCH], delete_branch)
+        return BulkResult([results[i] for i in range(len(plan.changes))])
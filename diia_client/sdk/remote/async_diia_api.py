@@ -0,0 +1,348 @@
+import asyncio
+import time
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, List, Mapping, Optional
+
+from diia_client.enums import EndpointFamily
+from diia_client.exceptions import DiiaClientException
+from diia_client.sdk.deadline import check_deadline, clamp_timeout
+from diia_client.sdk.http.base_client import (
+    AbstractAsyncHTTPClient,
+    TimeoutValue,
+    get_status_code,
+)
+from diia_client.sdk.model import HashedFile
+from diia_client.sdk.remote.circuit_breaker import CircuitBreakerConfig
+from diia_client.sdk.remote.diia_api import BaseDiiaApi, T
+from diia_client.sdk.remote.model import Branch, BranchList, Offer, OfferList
+from diia_client.sdk.remote.rate_limiter import RateLimiter
+from diia_client.sdk.remote.retry import RetryPolicy
+from diia_client.sdk.remote.single_flight import AsyncSingleFlight
+from diia_client.sdk.service.session_token_service import AsyncSessionTokenService
+from diia_client.sdk.token_store import AbstractTokenStore
+
+
+class AsyncDiiaApi(BaseDiiaApi):
+    """Asyncio counterpart of DiiaApi.
+
+    Requests and responses are the same as in DiiaApi,
+    see its methods for the request examples.
+    """
+
+    def __init__(
+        self,
+        *,
+        acquirer_token: str,
+        diia_host: str,
+        http_client: AbstractAsyncHTTPClient,
+        token_store: Optional[AbstractTokenStore] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker_config: Optional[CircuitBreakerConfig] = None,
+        timeouts: Optional[Mapping[EndpointFamily, TimeoutValue]] = None,
+        coalesce_reads: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        super().__init__(
+            diia_host=diia_host,
+            retry_policy=retry_policy,
+            circuit_breaker_config=circuit_breaker_config,
+            timeouts=timeouts,
+            coalesce_reads=coalesce_reads,
+            rate_limiter=rate_limiter,
+        )
+        self.session_token_service = AsyncSessionTokenService(
+            acquirer_token,
+            diia_host,
+            http_client,
+            token_store=token_store,
+            circuit_breaker=self.circuit_breakers[EndpointFamily.AUTH],
+            timeout=self.timeouts[EndpointFamily.AUTH],
+        )
+        self.http_client = http_client
+        self._single_flight = AsyncSingleFlight()
+
+    async def _call(
+        self,
+        method: Callable[..., Awaitable[T]],
+        *,
+        url: str,
+        family: EndpointFamily,
+        idempotent: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> T:
+        """See DiiaApi._call."""
+        http_method = method.__name__.upper()
+        key = self._get_coalescing_key(http_method, url, kwargs)
+        if key is None:
+            return await self._call_with_retries(
+                method, url=url, family=family, idempotent=idempotent, **kwargs
+            )
+        return await self._single_flight.do(
+            key,
+            lambda: self._call_with_retries(
+                method, url=url, family=family, idempotent=idempotent, **kwargs
+            ),
+        )
+
+    async def _call_with_retries(
+        self,
+        method: Callable[..., Awaitable[T]],
+        *,
+        url: str,
+        family: EndpointFamily,
+        idempotent: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> T:
+        """See DiiaApi._call_with_retries."""
+        http_method = method.__name__.upper()
+        idempotent = self._is_idempotent(http_method, idempotent)
+        circuit_breaker = self.circuit_breakers[family]
+        transport_errors = self.http_client.transport_errors
+        timeout = self.timeouts[family]
+        attempt = 0
+        while True:
+            attempt += 1
+            check_deadline()
+            if self.rate_limiter is not None:
+                await self.rate_limiter.async_acquire(family)
+            started = time.monotonic()
+            try:
+                with circuit_breaker.guard(transport_errors):
+                    result = await self._send(
+                        method, url=url, timeout=timeout, **kwargs
+                    )
+            except Exception as e:
+                delay = self.retry_policy.on_failure(
+                    e,
+                    method=http_method,
+                    url=url,
+                    attempt=attempt,
+                    duration=time.monotonic() - started,
+                    idempotent=idempotent,
+                    transport_errors=transport_errors,
+                )
+                if delay is None or not self._can_retry_after(delay):
+                    raise
+                await asyncio.sleep(delay)
+            else:
+                self.retry_policy.on_success(
+                    method=http_method,
+                    url=url,
+                    attempt=attempt,
+                    duration=time.monotonic() - started,
+                )
+                return result
+
+    async def _send(
+        self,
+        method: Callable[..., Awaitable[T]],
+        *,
+        timeout: TimeoutValue,
+        accept: str = "application/json",
+        **kwargs: Any,
+    ) -> T:
+        """See DiiaApi._send."""
+        token = await self.session_token_service.get_session_token()
+        try:
+            return await method(
+                headers=self._prepare_auth_headers(token, accept=accept),
+                timeout=clamp_timeout(timeout),
+                **kwargs,
+            )
+        except Exception as e:
+            if get_status_code(e) != HTTPStatus.UNAUTHORIZED:
+                raise
+
+        token = await self.session_token_service.invalidate(token)
+        return await method(
+            headers=self._prepare_auth_headers(token, accept=accept),
+            timeout=clamp_timeout(timeout),
+            **kwargs,
+        )
+
+    async def create_branch(self, branch: Branch) -> str:
+        url = f"{self.diia_host}/api/v2/acquirers/branch"
+        try:
+            result = await self._call(
+                self.http_client.post,
+                url=url,
+                family=EndpointFamily.BRANCHES,
+                json=branch.dict(by_alias=True),
+            )
+            return result["_id"]
+        except Exception as e:
+            raise DiiaClientException("Branch creation error", e) from None
+
+    async def get_branch_by_id(self, branch_id: str) -> Branch:
+        url = f"{self.diia_host}/api/v2/acquirers/branch/{branch_id}"
+        try:
+            result = await self._call(
+                self.http_client.get, url=url, family=EndpointFamily.BRANCHES
+            )
+            return Branch(**result)
+        except Exception as e:
+            raise DiiaClientException("Get branch error", e) from None
+
+    async def delete_branch_by_id(self, branch_id: str) -> None:
+        url = f"{self.diia_host}/api/v2/acquirers/branch/{branch_id}"
+        try:
+            await self._call(
+                self.http_client.delete,
+                url=url,
+                family=EndpointFamily.BRANCHES,
+                accept="*/*",
+            )
+        except Exception as e:
+            raise DiiaClientException("Delete branch error", e) from None
+
+    async def get_branches(
+        self, *, skip: Optional[int] = None, limit: Optional[int] = None
+    ) -> BranchList:
+        url = f"{self.diia_host}/api/v2/acquirers/branches"
+        params = self._prepare_params(skip=skip, limit=limit)
+
+        try:
+            result = await self._call(
+                self.http_client.get,
+                url=url,
+                family=EndpointFamily.BRANCHES,
+                params=params,
+            )
+            return BranchList(**result)
+        except Exception as e:
+            raise DiiaClientException("Get branches error", e) from None
+
+    async def update_branch(self, branch: Branch) -> Branch:
+        url = f"{self.diia_host}/api/v2/acquirers/branch/{branch.id}"
+        try:
+            result = await self._call(
+                self.http_client.put,
+                url=url,
+                family=EndpointFamily.BRANCHES,
+                json=branch.dict(by_alias=True),
+            )
+            branch.id = result["_id"]
+            return branch
+        except Exception as e:
+            raise DiiaClientException("Branch updation error", e) from None
+
+    async def create_offer(self, *, branch_id: str, offer: Offer) -> str:
+        url = f"{self.diia_host}/api/v1/acquirers/branch/{branch_id}/offer"
+        try:
+            result = await self._call(
+                self.http_client.post,
+                url=url,
+                family=EndpointFamily.OFFERS,
+                json=offer.dict(by_alias=True, exclude_none=True),
+            )
+            return result["_id"]
+        except Exception as e:
+            raise DiiaClientException("Offer creation error", e) from None
+
+    async def get_offers(
+        self, *, branch_id: str, skip: Optional[int] = None, limit: Optional[int] = None
+    ) -> OfferList:
+        url = f"{self.diia_host}/api/v1/acquirers/branch/{branch_id}/offers"
+        params = self._prepare_params(skip=skip, limit=limit)
+
+        try:
+            result = await self._call(
+                self.http_client.get,
+                url=url,
+                family=EndpointFamily.OFFERS,
+                params=params,
+            )
+            return OfferList(**result)
+        except Exception as e:
+            raise DiiaClientException("Get offers error", e) from None
+
+    async def delete_offer(self, *, branch_id: str, offer_id: str) -> None:
+        url = f"{self.diia_host}/api/v1/acquirers/branch/{branch_id}/offer/{offer_id}"
+        try:
+            await self._call(
+                self.http_client.delete,
+                url=url,
+                family=EndpointFamily.OFFERS,
+                accept="*/*",
+            )
+        except Exception as e:
+            raise DiiaClientException("Delete offer error", e) from None
+
+    async def validate_document_by_barcode(
+        self, *, branch_id: str, barcode: str
+    ) -> bool:
+        url = f"{self.diia_host}/api/v1/acquirers/document-identification"
+        try:
+            data = {"branchId": branch_id, "barcode": barcode}
+            result = await self._call(
+                self.http_client.post,
+                url=url,
+                family=EndpointFamily.DOCUMENT_IDENTIFICATION,
+                json=data,
+            )
+            return result["success"]
+        except Exception as e:
+            raise DiiaClientException("Document validation error", e) from None
+
+    async def request_document_by_barcode(
+        self, *, branch_id: str, barcode: str, request_id: str
+    ) -> bool:
+        url = f"{self.diia_host}/api/v1/acquirers/document-request"
+        try:
+            data = {"branchId": branch_id, "barcode": barcode, "requestId": request_id}
+            result = await self._call(
+                self.http_client.post,
+                url=url,
+                family=EndpointFamily.DOCUMENT_REQUEST,
+                json=data,
+            )
+            return result["success"]
+        except Exception as e:
+            raise DiiaClientException("Document request error", e) from None
+
+    async def request_document_by_qrcode(
+        self, *, branch_id: str, qrcode: str, request_id: str
+    ) -> bool:
+        url = f"{self.diia_host}/api/v1/acquirers/document-request"
+        try:
+            data = {"branchId": branch_id, "qrcode": qrcode, "requestId": request_id}
+            result = await self._call(
+                self.http_client.post,
+                url=url,
+                family=EndpointFamily.DOCUMENT_REQUEST,
+                json=data,
+            )
+            return result["success"]
+        except Exception as e:
+            raise DiiaClientException("Document request error", e) from None
+
+    async def get_deep_link(
+        self,
+        *,
+        branch_id: str,
+        offer_id: str,
+        request_id: str,
+        return_link: Optional[str] = None,
+        hashed_files: Optional[List[HashedFile]] = None,
+    ) -> str:
+        url = (
+            f"{self.diia_host}/api/v2/acquirers/branch/{branch_id}"
+            "/offer-request/dynamic"
+        )
+        try:
+            data = self._prepare_deep_link_data(
+                offer_id=offer_id,
+                request_id=request_id,
+                return_link=return_link,
+                hashed_files=hashed_files,
+            )
+            result = await self._call(
+                self.http_client.post,
+                url=url,
+                family=EndpointFamily.OFFER_REQUEST,
+                json=data,
+                idempotent=True,
+            )
+            return result["deeplink"]
+        except Exception as e:
+            raise DiiaClientException("DeepLink request error", e) from None
@@ -0,0 +1,187 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Callable, Deque, Dict, Iterator, Optional, Tuple, Type
+
+from diia_client.enums import CircuitState, EndpointFamily
+from diia_client.exceptions import CircuitOpenError
+from diia_client.sdk.deadline import is_expired
+from diia_client.sdk.http.base_client import get_status_code
+
+
+logger = logging.getLogger(__name__)
+
+StateChangeHook = Callable[[EndpointFamily, CircuitState, CircuitState], None]
+
+
+@dataclass
+class CircuitBreakerConfig:
+    """Settings of circuit breakers, one breaker is created per endpoint family.
+
+    The breaker opens when, among the last `window_size` calls (but not
+    less than `minimum_calls`), the share of failed calls reaches
+    `failure_rate_threshold` or the share of calls slower than
+    `slow_call_duration` seconds reaches `slow_call_rate_threshold`.
+    Calls fail fast with CircuitOpenError for `open_duration` seconds,
+    then `half_open_calls` trial calls decide whether to close it again.
+    """
+
+    failure_rate_threshold: float = 0.5
+    slow_call_rate_threshold: float = 1.0
+    slow_call_duration: float = 5
+    window_size: int = 20
+    minimum_calls: int = 10
+    open_duration: float = 30
+    half_open_calls: int = 3
+    # alerting hook, called with the family, old and new state
+    on_state_change: Optional[StateChangeHook] = None
+
+
+def is_failure(
+    error: BaseException, transport_errors: Tuple[Type[BaseException], ...] = ()
+) -> Optional[bool]:
+    """Classify an error for the circuit breaker.
+
+    Returns:
+        True for errors that show Diia is unhealthy (transport errors, 5xx),
+        False for errors caused by the request (4xx),
+        None for errors unrelated to Diia health (e.g. cancellation).
+    """
+    if isinstance(error, CircuitOpenError):
+        return None
+    status_code = get_status_code(error)
+    if status_code is not None:
+        return status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+    if isinstance(error, transport_errors):
+        # timeout shortened by the deadline of the caller isn't Diia's fault
+        return None if is_expired() else True
+    return None
+
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker of a single endpoint family."""
+
+    def __init__(
+        self, family: EndpointFamily, config: Optional[CircuitBreakerConfig] = None
+    ) -> None:
+        self.family = family
+        self.config = config or CircuitBreakerConfig()
+        self.state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        # (failed, slow) outcomes of the recent calls
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=self.config.window_size)
+        self._half_open_permits = 0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Get permission for a call.
+
+        Raises:
+            CircuitOpenError: If the breaker is open or the trial calls
+              of the half-open breaker are already in flight.
+        """
+        change = None
+        try:
+            with self._lock:
+                if self.state == CircuitState.OPEN:
+                    opened_for = time.monotonic() - self._opened_at
+                    if opened_for < self.config.open_duration:
+                        raise CircuitOpenError(
+                            f"Circuit breaker of {self.family.value} endpoints is open"
+                        )
+                    change = self._transition(CircuitState.HALF_OPEN)
+
+                if self.state == CircuitState.HALF_OPEN:
+                    if self._half_open_permits >= self.config.half_open_calls:
+                        raise CircuitOpenError(
+                            f"Circuit breaker of {self.family.value} endpoints "
+                            "is half-open"
+                        )
+                    self._half_open_permits += 1
+        finally:
+            self._notify(change)
+
+    def after_call(self, duration: float, failed: Optional[bool]) -> None:
+        """Record the outcome of a permitted call, `failed=None` doesn't count."""
+        change = None
+        with self._lock:
+            if failed is None:
+                if self.state == CircuitState.HALF_OPEN:
+                    self._half_open_permits -= 1
+                return
+
+            slow = duration >= self.config.slow_call_duration
+            self._outcomes.append((failed, slow))
+            if self.state == CircuitState.HALF_OPEN:
+                if len(self._outcomes) >= self.config.half_open_calls:
+                    change = self._transition(
+                        CircuitState.OPEN
+                        if self._is_unhealthy()
+                        else CircuitState.CLOSED
+                    )
+            elif self.state == CircuitState.CLOSED:
+                if len(self._outcomes) >= self.config.minimum_calls:
+                    if self._is_unhealthy():
+                        change = self._transition(CircuitState.OPEN)
+        self._notify(change)
+
+    @contextmanager
+    def guard(
+        self, transport_errors: Tuple[Type[BaseException], ...] = ()
+    ) -> Iterator[None]:
+        """Wrap a call: check permission and record its outcome."""
+        self.before_call()
+        started = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            self.after_call(
+                time.monotonic() - started, failed=is_failure(e, transport_errors)
+            )
+            raise
+        self.after_call(time.monotonic() - started, failed=False)
+
+    def _is_unhealthy(self) -> bool:
+        calls = len(self._outcomes)
+        failed = sum(1 for f, _ in self._outcomes if f)
+        slow = sum(1 for _, s in self._outcomes if s)
+        return (
+            failed / calls >= self.config.failure_rate_threshold
+            or slow / calls >= self.config.slow_call_rate_threshold
+        )
+
+    def _transition(self, state: CircuitState) -> Tuple[CircuitState, CircuitState]:
+        # must be called with self._lock held
+        old_state, self.state = self.state, state
+        self._outcomes.clear()
+        self._half_open_permits = 0
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        return old_state, state
+
+    def _notify(self, change: Optional[Tuple[CircuitState, CircuitState]]) -> None:
+        # called without the lock, so the hook may use the breaker
+        if change is None:
+            return
+        old_state, state = change
+        logger.warning(
+            "Circuit breaker of %s endpoints: %s -> %s",
+            self.family.value,
+            old_state.value,
+            state.value,
+        )
+        if self.config.on_state_change is not None:
+            try:
+                self.config.on_state_change(self.family, old_state, state)
+            except Exception:
+                logger.exception("on_state_change hook error")
+
+
+def make_circuit_breakers(
+    config: Optional[CircuitBreakerConfig] = None,
+) -> Dict[EndpointFamily, CircuitBreaker]:
+    return {family: CircuitBreaker(family, config) for family in EndpointFamily}
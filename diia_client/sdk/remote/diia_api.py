@@ -1,22 +1,76 @@
-from typing import List, Optional
+import time
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, TypeVar
 
+from diia_client.enums import EndpointFamily
 from diia_client.exceptions import DiiaClientException
-from diia_client.sdk.http.base_client import AbstractHTTPCLient
+from diia_client.sdk.deadline import check_deadline, clamp_timeout, get_remaining_time
+from diia_client.sdk.http.base_client import (
+    DEFAULT_TIMEOUT,
+    AbstractHTTPCLient,
+    TimeoutValue,
+    get_status_code,
+)
 from diia_client.sdk.model import HashedFile
+from diia_client.sdk.remote.circuit_breaker import (
+    CircuitBreakerConfig,
+    make_circuit_breakers,
+)
 from diia_client.sdk.remote.model import Branch, BranchList, Offer, OfferList
+from diia_client.sdk.remote.rate_limiter import RateLimiter
+from diia_client.sdk.remote.retry import IDEMPOTENT_METHODS, RetryPolicy
+from diia_client.sdk.remote.single_flight import SingleFlight
 from diia_client.sdk.service.session_token_service import SessionTokenService
+from diia_client.sdk.token_store import AbstractTokenStore
 from diia_client.types import DataDict, StrDict
 
 
-class DiiaApi:
+T = TypeVar("T")
+
+DEFAULT_TIMEOUTS: Dict[EndpointFamily, TimeoutValue] = {
+    family: DEFAULT_TIMEOUT for family in EndpointFamily
+}
+
+
+class BaseDiiaApi:
     def __init__(
-        self, *, acquirer_token: str, diia_host: str, http_client: AbstractHTTPCLient
+        self,
+        *,
+        diia_host: str,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker_config: Optional[CircuitBreakerConfig] = None,
+        timeouts: Optional[Mapping[EndpointFamily, TimeoutValue]] = None,
+        coalesce_reads: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
     ):
-        self.session_token_service = SessionTokenService(
-            acquirer_token, diia_host, http_client
-        )
         self.diia_host = diia_host
-        self.http_client = http_client
+        self.coalesce_reads = coalesce_reads
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breakers = make_circuit_breakers(circuit_breaker_config)
+        self.timeouts: Dict[EndpointFamily, TimeoutValue] = {
+            **DEFAULT_TIMEOUTS,
+            **(timeouts or {}),
+        }
+
+    def _is_idempotent(self, http_method: str, idempotent: Optional[bool]) -> bool:
+        if idempotent is not None:
+            return idempotent
+        return http_method in IDEMPOTENT_METHODS
+
+    def _get_coalescing_key(
+        self, http_method: str, url: str, kwargs: Mapping[str, Any]
+    ) -> Optional[Hashable]:
+        """Key of a read request whose concurrent duplicates share a single call."""
+        if not self.coalesce_reads or http_method != "GET":
+            return None
+        params = kwargs.get("params") or {}
+        return url, tuple(sorted(params.items())), kwargs.get("accept")
+
+    def _can_retry_after(self, delay: float) -> bool:
+        """Whether a retry after the delay starts before the current deadline."""
+        remaining = get_remaining_time()
+        return remaining is None or delay < remaining
 
     def _prepare_params(
         self, *, skip: Optional[int] = None, limit: Optional[int] = None
@@ -28,10 +82,190 @@ class DiiaApi:
             params["limit"] = limit
         return params
 
-    def _prepare_headers(self, accept: str = "application/json") -> StrDict:
-        token = self.session_token_service.get_session_token()
+    def _prepare_auth_headers(
+        self, token: str, accept: str = "application/json"
+    ) -> StrDict:
         return {"Accept": accept, "Authorization": f"Bearer {token}"}
 
+    def _prepare_deep_link_data(
+        self,
+        *,
+        offer_id: str,
+        request_id: str,
+        return_link: Optional[str] = None,
+        hashed_files: Optional[List[HashedFile]] = None,
+    ) -> DataDict:
+        data: DataDict = {"offerId": offer_id, "requestId": request_id}
+
+        # auth
+        if return_link is not None:
+            data["returnLink"] = return_link
+
+        # sign hashes
+        if hashed_files is not None:
+            data["data"] = {
+                "hashedFilesSigning": {
+                    "hashedFiles": [
+                        {
+                            "fileName": f.filename,
+                            "fileHash": f.filehash,
+                        }
+                        for f in hashed_files
+                    ]
+                }
+            }
+        return data
+
+
+class DiiaApi(BaseDiiaApi):
+    def __init__(
+        self,
+        *,
+        acquirer_token: str,
+        diia_host: str,
+        http_client: AbstractHTTPCLient,
+        token_store: Optional[AbstractTokenStore] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker_config: Optional[CircuitBreakerConfig] = None,
+        timeouts: Optional[Mapping[EndpointFamily, TimeoutValue]] = None,
+        coalesce_reads: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        super().__init__(
+            diia_host=diia_host,
+            retry_policy=retry_policy,
+            circuit_breaker_config=circuit_breaker_config,
+            timeouts=timeouts,
+            coalesce_reads=coalesce_reads,
+            rate_limiter=rate_limiter,
+        )
+        self.session_token_service = SessionTokenService(
+            acquirer_token,
+            diia_host,
+            http_client,
+            token_store=token_store,
+            circuit_breaker=self.circuit_breakers[EndpointFamily.AUTH],
+            timeout=self.timeouts[EndpointFamily.AUTH],
+        )
+        self.http_client = http_client
+        self._single_flight = SingleFlight()
+
+    def _call(
+        self,
+        method: Callable[..., T],
+        *,
+        url: str,
+        family: EndpointFamily,
+        idempotent: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> T:
+        """Make an authorized request, retrying it according to the retry policy.
+
+        Every attempt is subject to the rate limiter, is guarded by the circuit
+        breaker of the endpoint family and uses its timeout, shortened to the
+        current deadline if any.
+        Identical GET requests made concurrently share a single call
+        (including its retries) and its result.
+
+        Args:
+            method: Method of the HTTP client to call.
+            url: Request URL.
+            family: Family of the endpoint.
+            idempotent: Whether the request is safe to repeat,
+              by default only GET, PUT and DELETE requests are.
+            kwargs: Other arguments of the method and `accept` header value.
+        """
+        http_method = method.__name__.upper()
+        key = self._get_coalescing_key(http_method, url, kwargs)
+        if key is None:
+            return self._call_with_retries(
+                method, url=url, family=family, idempotent=idempotent, **kwargs
+            )
+        return self._single_flight.do(
+            key,
+            lambda: self._call_with_retries(
+                method, url=url, family=family, idempotent=idempotent, **kwargs
+            ),
+        )
+
+    def _call_with_retries(
+        self,
+        method: Callable[..., T],
+        *,
+        url: str,
+        family: EndpointFamily,
+        idempotent: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> T:
+        """Make the request, retrying it according to the retry policy."""
+        http_method = method.__name__.upper()
+        idempotent = self._is_idempotent(http_method, idempotent)
+        circuit_breaker = self.circuit_breakers[family]
+        transport_errors = self.http_client.transport_errors
+        timeout = self.timeouts[family]
+        attempt = 0
+        while True:
+            attempt += 1
+            check_deadline()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(family)
+            started = time.monotonic()
+            try:
+                with circuit_breaker.guard(transport_errors):
+                    result = self._send(method, url=url, timeout=timeout, **kwargs)
+            except Exception as e:
+                delay = self.retry_policy.on_failure(
+                    e,
+                    method=http_method,
+                    url=url,
+                    attempt=attempt,
+                    duration=time.monotonic() - started,
+                    idempotent=idempotent,
+                    transport_errors=transport_errors,
+                )
+                if delay is None or not self._can_retry_after(delay):
+                    raise
+                time.sleep(delay)
+            else:
+                self.retry_policy.on_success(
+                    method=http_method,
+                    url=url,
+                    attempt=attempt,
+                    duration=time.monotonic() - started,
+                )
+                return result
+
+    def _send(
+        self,
+        method: Callable[..., T],
+        *,
+        timeout: TimeoutValue,
+        accept: str = "application/json",
+        **kwargs: Any,
+    ) -> T:
+        """Make an authorized request.
+
+        When Diia rejects the session token (e.g. revoked before expiry),
+        the token is replaced and the request is replayed once.
+        """
+        token = self.session_token_service.get_session_token()
+        try:
+            return method(
+                headers=self._prepare_auth_headers(token, accept=accept),
+                timeout=clamp_timeout(timeout),
+                **kwargs,
+            )
+        except Exception as e:
+            if get_status_code(e) != HTTPStatus.UNAUTHORIZED:
+                raise
+
+        token = self.session_token_service.invalidate(token)
+        return method(
+            headers=self._prepare_auth_headers(token, accept=accept),
+            timeout=clamp_timeout(timeout),
+            **kwargs,
+        )
+
     """
     curl -X POST "{diia_host}/api/v2/acquirers/branch" \
     -H "accept: application/json" \
@@ -51,10 +285,11 @@ class DiiaApi:
     def create_branch(self, branch: Branch) -> str:
         url = f"{self.diia_host}/api/v2/acquirers/branch"
         try:
-            result = self.http_client.post(
+            result = self._call(
+                self.http_client.post,
                 url=url,
+                family=EndpointFamily.BRANCHES,
                 json=branch.dict(by_alias=True),
-                headers=self._prepare_headers(),
             )
             return result["_id"]
         except Exception as e:
@@ -69,7 +304,9 @@ class DiiaApi:
     def get_branch_by_id(self, branch_id: str) -> Branch:
         url = f"{self.diia_host}/api/v2/acquirers/branch/{branch_id}"
         try:
-            result = self.http_client.get(url=url, headers=self._prepare_headers())
+            result = self._call(
+                self.http_client.get, url=url, family=EndpointFamily.BRANCHES
+            )
             return Branch(**result)
         except Exception as e:
             raise DiiaClientException("Get branch error", e) from None
@@ -84,8 +321,11 @@ class DiiaApi:
     def delete_branch_by_id(self, branch_id: str) -> None:
         url = f"{self.diia_host}/api/v2/acquirers/branch/{branch_id}"
         try:
-            self.http_client.delete(
-                url=url, headers=self._prepare_headers(accept="*/*")
+            self._call(
+                self.http_client.delete,
+                url=url,
+                family=EndpointFamily.BRANCHES,
+                accept="*/*",
             )
         except Exception as e:
             raise DiiaClientException("Delete branch error", e) from None
@@ -103,8 +343,11 @@ class DiiaApi:
         params = self._prepare_params(skip=skip, limit=limit)
 
         try:
-            result = self.http_client.get(
-                url=url, params=params, headers=self._prepare_headers()
+            result = self._call(
+                self.http_client.get,
+                url=url,
+                family=EndpointFamily.BRANCHES,
+                params=params,
             )
             return BranchList(**result)
         except Exception as e:
@@ -129,10 +372,11 @@ class DiiaApi:
     def update_branch(self, branch: Branch) -> Branch:
         url = f"{self.diia_host}/api/v2/acquirers/branch/{branch.id}"
         try:
-            result = self.http_client.put(
+            result = self._call(
+                self.http_client.put,
                 url=url,
+                family=EndpointFamily.BRANCHES,
                 json=branch.dict(by_alias=True),
-                headers=self._prepare_headers(),
             )
             branch.id = result["_id"]
             return branch
@@ -150,10 +394,11 @@ class DiiaApi:
     def create_offer(self, *, branch_id: str, offer: Offer) -> str:
         url = f"{self.diia_host}/api/v1/acquirers/branch/{branch_id}/offer"
         try:
-            result = self.http_client.post(
+            result = self._call(
+                self.http_client.post,
                 url=url,
+                family=EndpointFamily.OFFERS,
                 json=offer.dict(by_alias=True, exclude_none=True),
-                headers=self._prepare_headers(),
             )
             return result["_id"]
         except Exception as e:
@@ -173,8 +418,11 @@ class DiiaApi:
         params = self._prepare_params(skip=skip, limit=limit)
 
         try:
-            result = self.http_client.get(
-                url=url, params=params, headers=self._prepare_headers()
+            result = self._call(
+                self.http_client.get,
+                url=url,
+                family=EndpointFamily.OFFERS,
+                params=params,
             )
             return OfferList(**result)
         except Exception as e:
@@ -190,8 +438,11 @@ class DiiaApi:
     def delete_offer(self, *, branch_id: str, offer_id: str) -> None:
         url = f"{self.diia_host}/api/v1/acquirers/branch/{branch_id}/offer/{offer_id}"
         try:
-            self.http_client.delete(
-                url=url, headers=self._prepare_headers(accept="*/*")
+            self._call(
+                self.http_client.delete,
+                url=url,
+                family=EndpointFamily.OFFERS,
+                accept="*/*",
             )
         except Exception as e:
             raise DiiaClientException("Delete offer error", e) from None
@@ -208,10 +459,11 @@ class DiiaApi:
         url = f"{self.diia_host}/api/v1/acquirers/document-identification"
         try:
             data = {"branchId": branch_id, "barcode": barcode}
-            result = self.http_client.post(
+            result = self._call(
+                self.http_client.post,
                 url=url,
+                family=EndpointFamily.DOCUMENT_IDENTIFICATION,
                 json=data,
-                headers=self._prepare_headers(),
             )
             return result["success"]
         except Exception as e:
@@ -232,10 +484,11 @@ class DiiaApi:
         url = f"{self.diia_host}/api/v1/acquirers/document-request"
         try:
             data = {"branchId": branch_id, "barcode": barcode, "requestId": request_id}
-            result = self.http_client.post(
+            result = self._call(
+                self.http_client.post,
                 url=url,
+                family=EndpointFamily.DOCUMENT_REQUEST,
                 json=data,
-                headers=self._prepare_headers(),
             )
             return result["success"]
         except Exception as e:
@@ -256,10 +509,11 @@ class DiiaApi:
         url = f"{self.diia_host}/api/v1/acquirers/document-request"
         try:
             data = {"branchId": branch_id, "qrcode": qrcode, "requestId": request_id}
-            result = self.http_client.post(
+            result = self._call(
+                self.http_client.post,
                 url=url,
+                family=EndpointFamily.DOCUMENT_REQUEST,
                 json=data,
-                headers=self._prepare_headers(),
             )
             return result["success"]
         except Exception as e:
@@ -284,30 +538,19 @@ class DiiaApi:
     ) -> str:
         url = f"{self.diia_host}/api/v2/acquirers/branch/{branch_id}/offer-request/dynamic"
         try:
-            data: DataDict = {"offerId": offer_id, "requestId": request_id}
-
-            # auth
-            if return_link is not None:
-                data["returnLink"] = return_link
-
-            # sign hashes
-            if hashed_files is not None:
-                data["data"] = {
-                    "hashedFilesSigning": {
-                        "hashedFiles": [
-                            {
-                                "fileName": f.filename,
-                                "fileHash": f.filehash,
-                            }
-                            for f in hashed_files
-                        ]
-                    }
-                }
-
-            result = self.http_client.post(
+            data = self._prepare_deep_link_data(
+                offer_id=offer_id,
+                request_id=request_id,
+                return_link=return_link,
+                hashed_files=hashed_files,
+            )
+            # Diia returns the same deep link for the same requestId
+            result = self._call(
+                self.http_client.post,
                 url=url,
+                family=EndpointFamily.OFFER_REQUEST,
                 json=data,
-                headers=self._prepare_headers(),
+                idempotent=True,
             )
             return result["deeplink"]
         except Exception as e:
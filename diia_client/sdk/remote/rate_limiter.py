@@ -0,0 +1,210 @@
+import asyncio
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple, Union
+
+from diia_client.enums import EndpointFamily
+from diia_client.exceptions import RateLimitExceeded
+from diia_client.sdk.deadline import get_remaining_time
+from diia_client.sdk.file_lock import FileLock
+
+
+@dataclass
+class RateLimit:
+    """Quota of an endpoint family: `rate` requests per second on average
+    with bursts of up to `burst` requests (`rate`, but at least 1, if not set).
+    """
+
+    rate: float
+    burst: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if self.rate <= 0:
+            raise ValueError(f"Rate must be positive, got {self.rate}")
+
+    @property
+    def capacity(self) -> float:
+        if self.burst is not None:
+            return self.burst
+        return max(1.0, self.rate)
+
+
+def _take(
+    limit: RateLimit,
+    tokens: float,
+    updated: float,
+    now: float,
+    max_wait: Optional[float],
+) -> Tuple[float, Optional[float]]:
+    """Take a token from a bucket with the given state.
+
+    A request may reserve a token that will only be available in future
+    (tokens go negative), so waiting requests are served in order.
+
+    Returns:
+        New number of tokens and seconds to wait before the request,
+        or None if a token isn't available within `max_wait` seconds.
+    """
+    tokens = min(limit.capacity, tokens + (now - updated) * limit.rate)
+    delay = max(0.0, (1 - tokens) / limit.rate)
+    if max_wait is not None and delay > max_wait:
+        return tokens, None
+    return tokens - 1, delay
+
+
+class AbstractTokenBucket(ABC):
+    # whether reserve may block on I/O (e.g. file locks or network),
+    # so asyncio callers run it in an executor
+    blocking = False
+
+    @abstractmethod
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """Reserve a token for a request.
+
+        Args:
+            max_wait: Max seconds to wait for the token, unlimited if None.
+
+        Returns:
+            Seconds to wait before making the request, or None (and nothing
+            is reserved) if the token isn't available within `max_wait`.
+        """
+
+
+class TokenBucket(AbstractTokenBucket):
+    """Process-local token bucket, shared by threads and coroutines."""
+
+    def __init__(self, limit: RateLimit) -> None:
+        self.limit = limit
+        self._tokens = limit.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        with self._lock:
+            now = time.monotonic()
+            tokens, delay = _take(
+                self.limit, self._tokens, self._updated, now, max_wait
+            )
+            if delay is not None:
+                self._tokens, self._updated = tokens, now
+            return delay
+
+
+class FileTokenBucket(AbstractTokenBucket):
+    """Token bucket in a local file, shared by all processes of the host.
+
+    Lets N workers of gunicorn/uvicorn respect one quota. The state is
+    read and updated under a lock on a `.lock` sidecar file; a missing or
+    damaged file is treated as a full bucket.
+    """
+
+    blocking = True
+
+    def __init__(self, path: Union[str, Path], limit: RateLimit) -> None:
+        self.path = Path(path)
+        self.limit = limit
+        self._lock_path = self.path.with_name(self.path.name + ".lock")
+
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        with FileLock(self._lock_path):
+            # wall clock, as monotonic clocks of processes may differ
+            now = time.time()
+            state = self._read()
+            if state is None:
+                state = self.limit.capacity, now
+            tokens, delay = _take(self.limit, state[0], state[1], now, max_wait)
+            if delay is not None:
+                self._write(tokens, now)
+            return delay
+
+    def _read(self) -> Optional[Tuple[float, float]]:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            return float(data["tokens"]), float(data["updated"])
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+    def _write(self, tokens: float, updated: float) -> None:
+        with open(self.path, "w") as f:
+            json.dump({"tokens": tokens, "updated": updated}, f)
+
+
+class RateLimiter:
+    """Client-side rate limiter of Diia API requests per endpoint family.
+
+    Requests of families without a limit are not limited. When the quota
+    is used up, requests wait for capacity if `block` is set (but no longer
+    than `max_wait` seconds or the current deadline), otherwise or when
+    the wait would be longer, they fail fast with RateLimitExceeded.
+
+    Buckets are process-local unless `shared_dir` is set, in which case
+    they are kept in files of the directory and shared by all processes
+    using it, e.g. workers of a web server.
+    """
+
+    def __init__(
+        self,
+        limits: Mapping[EndpointFamily, RateLimit],
+        *,
+        block: bool = True,
+        max_wait: Optional[float] = None,
+        shared_dir: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.block = block
+        self.max_wait = max_wait
+        self.buckets: Dict[EndpointFamily, AbstractTokenBucket] = {}
+        for family, limit in limits.items():
+            if shared_dir is None:
+                self.buckets[family] = TokenBucket(limit)
+            else:
+                path = Path(shared_dir) / f"diia-rate-limit-{family.value}.json"
+                self.buckets[family] = FileTokenBucket(path, limit)
+
+    def acquire(self, family: EndpointFamily) -> None:
+        """Block until a request of the family is allowed.
+
+        Raises:
+            RateLimitExceeded: If the request isn't allowed within the wait limits.
+        """
+        bucket = self.buckets.get(family)
+        if bucket is None:
+            return
+        delay = self._check(family, bucket.reserve(self._get_max_wait()))
+        if delay:
+            time.sleep(delay)
+
+    async def async_acquire(self, family: EndpointFamily) -> None:
+        """See acquire.
+
+        Blocking buckets (e.g. FileTokenBucket) are reserved in
+        the default executor, off the event loop.
+        """
+        bucket = self.buckets.get(family)
+        if bucket is None:
+            return
+        # the deadline is kept in the context, that executor threads don't see
+        max_wait = self._get_max_wait()
+        if bucket.blocking:
+            loop = asyncio.get_running_loop()
+            reserved = await loop.run_in_executor(None, bucket.reserve, max_wait)
+        else:
+            reserved = bucket.reserve(max_wait)
+        delay = self._check(family, reserved)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def _check(self, family: EndpointFamily, delay: Optional[float]) -> float:
+        if delay is None:
+            raise RateLimitExceeded(f"Rate limit of {family.value} endpoints exceeded")
+        return delay
+
+    def _get_max_wait(self) -> Optional[float]:
+        if not self.block:
+            return 0
+        waits = [w for w in (self.max_wait, get_remaining_time()) if w is not None]
+        return min(waits) if waits else None
@@ -0,0 +1,189 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Callable, FrozenSet, Optional, Tuple, Type
+
+from diia_client.sdk.http.base_client import get_status_code
+
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset(
+    {
+        HTTPStatus.TOO_MANY_REQUESTS,
+        HTTPStatus.BAD_GATEWAY,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+        HTTPStatus.GATEWAY_TIMEOUT,
+    }
+)
+
+
+class RetryBudget:
+    """Limits retries to a fraction of requests, shared by all calls.
+
+    Token bucket in the manner of gRPC retry throttling: a retryable
+    failure takes a token, a success returns `token_ratio` of a token,
+    and retries are allowed while the bucket is more than half full.
+    So during an outage retries stop after a few failures instead of
+    multiplying the load on Diia, and resume as requests succeed again.
+    """
+
+    def __init__(self, max_tokens: float = 10, token_ratio: float = 0.1) -> None:
+        self.max_tokens = max_tokens
+        self.token_ratio = token_ratio
+        self.tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.token_ratio)
+
+    def on_failure(self) -> bool:
+        """Take a token for a retryable failure, return whether retry is allowed."""
+        with self._lock:
+            self.tokens = max(0, self.tokens - 1)
+            return self.tokens > self.max_tokens / 2
+
+
+@dataclass
+class RetryAttempt:
+    """Outcome of a single attempt of a request, passed to `on_attempt` hook."""
+
+    method: str
+    url: str
+    attempt: int
+    duration: float
+    error: Optional[BaseException] = None
+    status_code: Optional[int] = None
+    # seconds to wait before the next attempt, None when there won't be one
+    delay: Optional[float] = None
+
+
+@dataclass
+class RetryPolicy:
+    """Retry policy of Diia API calls.
+
+    Idempotent requests (GET, PUT, DELETE and deep link requests that
+    carry `requestId`) are retried on transport errors and on
+    `retry_statuses`, other requests only on 429 Too Many Requests,
+    as it guarantees the request wasn't processed.
+
+    Delays grow exponentially with full jitter; a `Retry-After` header
+    of the response is honoured unless it exceeds `max_retry_after`,
+    in which case the error is raised at once.
+    """
+
+    max_attempts: int = 3
+    backoff_base: float = 0.2
+    backoff_max: float = 5
+    max_retry_after: float = 30
+    retry_statuses: FrozenSet[int] = RETRY_STATUSES
+    budget: Optional[RetryBudget] = field(default_factory=RetryBudget)
+    # metrics hook, called after every attempt
+    on_attempt: Optional[Callable[[RetryAttempt], None]] = None
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter delay after the attempt with the given (1-based) number."""
+        ceiling = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def is_retryable(
+        self,
+        error: BaseException,
+        *,
+        idempotent: bool,
+        transport_errors: Tuple[Type[BaseException], ...] = (),
+    ) -> bool:
+        status_code = get_status_code(error)
+        if not idempotent:
+            return status_code == HTTPStatus.TOO_MANY_REQUESTS
+        if status_code is not None:
+            return status_code in self.retry_statuses
+        return isinstance(error, transport_errors)
+
+    def on_success(
+        self, *, method: str, url: str, attempt: int, duration: float
+    ) -> None:
+        if self.budget is not None:
+            self.budget.on_success()
+        self._report(
+            RetryAttempt(method=method, url=url, attempt=attempt, duration=duration)
+        )
+
+    def on_failure(
+        self,
+        error: BaseException,
+        *,
+        method: str,
+        url: str,
+        attempt: int,
+        duration: float,
+        idempotent: bool,
+        transport_errors: Tuple[Type[BaseException], ...] = (),
+    ) -> Optional[float]:
+        """Decide whether the failed attempt should be retried.
+
+        Returns:
+            Seconds to wait before the next attempt or None to give up.
+        """
+        delay = None
+        if self.is_retryable(
+            error, idempotent=idempotent, transport_errors=transport_errors
+        ):
+            allowed = self.budget is None or self.budget.on_failure()
+            if allowed and attempt < self.max_attempts:
+                delay = self._get_delay(error, attempt)
+
+        self._report(
+            RetryAttempt(
+                method=method,
+                url=url,
+                attempt=attempt,
+                duration=duration,
+                error=error,
+                status_code=get_status_code(error),
+                delay=delay,
+            )
+        )
+        return delay
+
+    def _get_delay(self, error: BaseException, attempt: int) -> Optional[float]:
+        delay = self.backoff(attempt)
+        retry_after = get_retry_after(error)
+        if retry_after is None:
+            return delay
+        if retry_after > self.max_retry_after:
+            return None
+        return max(delay, retry_after)
+
+    def _report(self, attempt: RetryAttempt) -> None:
+        if self.on_attempt is None:
+            return
+        try:
+            self.on_attempt(attempt)
+        except Exception:
+            logger.exception("on_attempt hook error")
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """Get seconds to wait from `Retry-After` header of the error response."""
+    response = getattr(error, "response", None)
+    value = getattr(response, "headers", {}).get("Retry-After")
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from diia_client.exceptions import DeadlineExceeded
+from diia_client.sdk.deadline import get_remaining_time
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into a single call.
+
+    The first caller (leader) makes the call, callers arriving while it's
+    in flight wait for it and get the same result or exception. Results
+    are not kept after the call completes, so there is no staleness.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, "Future[Any]"] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if future is None:
+                future = self._calls[key] = Future()
+
+        if not is_leader:
+            try:
+                return future.result(timeout=get_remaining_time())
+            except FutureTimeoutError:
+                raise DeadlineExceeded("Deadline exceeded") from None
+
+        try:
+            result = func()
+        except BaseException as e:
+            self._forget(key)
+            future.set_exception(e)
+            raise
+        self._forget(key)
+        future.set_result(result)
+        return result
+
+    def _forget(self, key: Hashable) -> None:
+        # forget the call before publishing its result, so callers coming
+        # after the result is ready make a new call
+        with self._lock:
+            del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """Asyncio counterpart of SingleFlight.
+
+    The call runs in its own task, so cancellation of the leader doesn't
+    affect other callers waiting for the result.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        task = self._tasks.get(key)
+        if task is None:
+
+            async def run() -> T:
+                try:
+                    return await func()
+                finally:
+                    del self._tasks[key]
+
+            task = self._tasks[key] = asyncio.ensure_future(run())
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), get_remaining_time())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Deadline exceeded") from None
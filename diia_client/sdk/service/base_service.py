@@ -1,6 +1,12 @@
+from diia_client.sdk.remote.async_diia_api import AsyncDiiaApi
 from diia_client.sdk.remote.diia_api import DiiaApi
 
 
 class BaseService:
     def __init__(self, *, diia_api: DiiaApi):
         self.diia_api = diia_api
+
+
+class AsyncBaseService:
+    def __init__(self, *, diia_api: AsyncDiiaApi):
+        self.diia_api = diia_api
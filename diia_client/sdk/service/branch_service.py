@@ -1,21 +1,109 @@
-from typing import List, Optional, Sequence
+from typing import AsyncIterator, Iterator, List, Optional, Sequence
 
 from diia_client.enums import DiiaIDAction, DocumentType
+from diia_client.sdk.cache import TTLCache, branch_cache_key, offers_cache_key
+from diia_client.sdk.offer_registry import OfferRegistry
+from diia_client.sdk.pagination import (
+    DEFAULT_PREFETCH,
+    Page,
+    async_iter_pages,
+    iter_pages,
+)
+from diia_client.sdk.remote.async_diia_api import AsyncDiiaApi
+from diia_client.sdk.remote.diia_api import DiiaApi
 from diia_client.sdk.remote.model import Branch, BranchList, BranchScopes
-from diia_client.sdk.service.base_service import BaseService
+from diia_client.sdk.service.base_service import AsyncBaseService, BaseService
+
+
+def make_branch(
+    name: str,
+    email: str,
+    region: str,
+    district: str,
+    location: str,
+    street: str,
+    house: str,
+    sharing: Optional[List[DocumentType]] = None,
+    document_identification: Optional[List[DocumentType]] = None,
+    diia_id: Optional[List[DiiaIDAction]] = None,
+    custom_full_name: Optional[str] = None,
+    custom_full_address: Optional[str] = None,
+    identification: Optional[List[str]] = None,
+    delivery_types: Sequence[str] = ("api",),
+    offer_request_type: str = "dynamic",
+) -> Branch:
+    scopes = BranchScopes(
+        sharing=sharing,
+        identification=identification,
+        document_identification=document_identification,
+        diia_id=diia_id,
+    )
+    return Branch(
+        name=name,
+        email=email,
+        region=region,
+        district=district,
+        location=location,
+        street=street,
+        house=house,
+        custom_full_name=custom_full_name,
+        custom_full_address=custom_full_address,
+        scopes=scopes,
+        delivery_types=list(delivery_types),
+        offer_request_type=offer_request_type,
+    )
 
 
 class BranchService(BaseService):
+    def __init__(
+        self,
+        *,
+        diia_api: DiiaApi,
+        cache: Optional[TTLCache] = None,
+        registry: Optional[OfferRegistry] = None,
+    ):
+        super().__init__(diia_api=diia_api)
+        self.cache = cache
+        # offer registry to drop deleted branches from
+        self.registry = registry
+
     def get_branches(
         self, *, skip: Optional[int] = None, limit: Optional[int] = None
     ) -> BranchList:
         return self.diia_api.get_branches(skip=skip, limit=limit)
 
+    def iter_branches(
+        self, *, page_size: Optional[int] = None, prefetch: int = DEFAULT_PREFETCH
+    ) -> Iterator[Branch]:
+        def fetch(skip: int, limit: int) -> Page[Branch]:
+            branches = self.diia_api.get_branches(skip=skip, limit=limit)
+            return branches.total, branches.branches
+
+        return iter_pages(fetch, page_size=page_size, prefetch=prefetch)
+
     def get_branch(self, branch_id: str) -> Branch:
-        return self.diia_api.get_branch_by_id(branch_id)
+        if self.cache is None:
+            return self.diia_api.get_branch_by_id(branch_id)
+        branch = self.cache.get(
+            branch_cache_key(branch_id),
+            lambda: self.diia_api.get_branch_by_id(branch_id),
+        )
+        # cached branch must not be changed by the caller
+        return branch.copy(deep=True)
 
     def delete_branch(self, branch_id: str) -> None:
-        return self.diia_api.delete_branch_by_id(branch_id)
+        try:
+            return self.diia_api.delete_branch_by_id(branch_id)
+        finally:
+            self._invalidate(branch_id)
+            if self.registry is not None:
+                self.registry.forget(branch_id)
+
+    def _invalidate(self, branch_id: str) -> None:
+        if self.cache is not None and branch_id:
+            self.cache.invalidate(
+                branch_cache_key(branch_id), offers_cache_key(branch_id)
+            )
 
     def create_branch(
         self,
@@ -35,13 +123,107 @@ class BranchService(BaseService):
         delivery_types: Sequence[str] = ("api",),
         offer_request_type: str = "dynamic",
     ) -> Branch:
-        scopes = BranchScopes(
+        branch = make_branch(
+            name=name,
+            email=email,
+            region=region,
+            district=district,
+            location=location,
+            street=street,
+            house=house,
             sharing=sharing,
-            identification=identification,
             document_identification=document_identification,
             diia_id=diia_id,
+            custom_full_name=custom_full_name,
+            custom_full_address=custom_full_address,
+            identification=identification,
+            delivery_types=delivery_types,
+            offer_request_type=offer_request_type,
+        )
+        return self.add_branch(branch)
+
+    def add_branch(self, branch: Branch) -> Branch:
+        """Create the branch made by make_branch, sets its id."""
+        branch.id = self.diia_api.create_branch(branch)
+        self._invalidate(branch.id)
+        return branch
+
+    def update_branch(self, request: Branch) -> Branch:
+        try:
+            return self.diia_api.update_branch(request)
+        finally:
+            self._invalidate(request.id)
+
+
+class AsyncBranchService(AsyncBaseService):
+    def __init__(
+        self,
+        *,
+        diia_api: AsyncDiiaApi,
+        cache: Optional[TTLCache] = None,
+        registry: Optional[OfferRegistry] = None,
+    ):
+        super().__init__(diia_api=diia_api)
+        self.cache = cache
+        # offer registry to drop deleted branches from
+        self.registry = registry
+
+    async def get_branches(
+        self, *, skip: Optional[int] = None, limit: Optional[int] = None
+    ) -> BranchList:
+        return await self.diia_api.get_branches(skip=skip, limit=limit)
+
+    def iter_branches(
+        self, *, page_size: Optional[int] = None, prefetch: int = DEFAULT_PREFETCH
+    ) -> AsyncIterator[Branch]:
+        async def fetch(skip: int, limit: int) -> Page[Branch]:
+            branches = await self.diia_api.get_branches(skip=skip, limit=limit)
+            return branches.total, branches.branches
+
+        return async_iter_pages(fetch, page_size=page_size, prefetch=prefetch)
+
+    async def get_branch(self, branch_id: str) -> Branch:
+        if self.cache is None:
+            return await self.diia_api.get_branch_by_id(branch_id)
+        branch = await self.cache.async_get(
+            branch_cache_key(branch_id),
+            lambda: self.diia_api.get_branch_by_id(branch_id),
         )
-        branch = Branch(
+        return branch.copy(deep=True)
+
+    async def delete_branch(self, branch_id: str) -> None:
+        try:
+            return await self.diia_api.delete_branch_by_id(branch_id)
+        finally:
+            self._invalidate(branch_id)
+            if self.registry is not None:
+                self.registry.forget(branch_id)
+
+    def _invalidate(self, branch_id: str) -> None:
+        if self.cache is not None and branch_id:
+            self.cache.invalidate(
+                branch_cache_key(branch_id), offers_cache_key(branch_id)
+            )
+
+    async def create_branch(
+        self,
+        name: str,
+        email: str,
+        region: str,
+        district: str,
+        location: str,
+        street: str,
+        house: str,
+        sharing: Optional[List[DocumentType]] = None,
+        document_identification: Optional[List[DocumentType]] = None,
+        diia_id: Optional[List[DiiaIDAction]] = None,
+        custom_full_name: Optional[str] = None,
+        custom_full_address: Optional[str] = None,
+        identification: Optional[List[str]] = None,
+        delivery_types: Sequence[str] = ("api",),
+        offer_request_type: str = "dynamic",
+    ) -> Branch:
+        branch = make_branch(
             name=name,
             email=email,
             region=region,
@@ -49,14 +231,25 @@ class BranchService(BaseService):
             location=location,
             street=street,
             house=house,
+            sharing=sharing,
+            document_identification=document_identification,
+            diia_id=diia_id,
             custom_full_name=custom_full_name,
             custom_full_address=custom_full_address,
-            scopes=scopes,
-            delivery_types=list(delivery_types),
+            identification=identification,
+            delivery_types=delivery_types,
             offer_request_type=offer_request_type,
         )
-        branch.id = self.diia_api.create_branch(branch)
+        return await self.add_branch(branch)
+
+    async def add_branch(self, branch: Branch) -> Branch:
+        """Create the branch made by make_branch, sets its id."""
+        branch.id = await self.diia_api.create_branch(branch)
+        self._invalidate(branch.id)
         return branch
 
-    def update_branch(self, request: Branch) -> Branch:
-        return self.diia_api.update_branch(request)
+    async def update_branch(self, request: Branch) -> Branch:
+        try:
+            return await self.diia_api.update_branch(request)
+        finally:
+            self._invalidate(request.id)
@@ -0,0 +1,213 @@
+from typing import Dict, Sequence
+
+from diia_client.exceptions import DiiaClientException
+from diia_client.sdk.bulk import (
+    DEFAULT_BULK_CONCURRENCY,
+    BulkItemResult,
+    BulkResult,
+    async_run_bulk,
+    run_bulk,
+)
+from diia_client.sdk.cache import is_not_found
+from diia_client.sdk.remote.model import Branch, Offer
+from diia_client.sdk.service.branch_service import AsyncBranchService, BranchService
+from diia_client.sdk.service.offer_service import AsyncOfferService, OfferService
+
+
+class BulkService:
+    """Bulk operations on branches and offers, see Diia for the details."""
+
+    def __init__(
+        self, *, branch_service: BranchService, offer_service: OfferService
+    ) -> None:
+        self.branch_service = branch_service
+        self.offer_service = offer_service
+
+    def create_branches_bulk(
+        self,
+        branches: Sequence[Branch],
+        *,
+        skip_existing: bool = True,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> BulkResult[Branch, Branch]:
+        existing: Dict[str, Branch] = {}
+        if skip_existing:
+            existing = {b.name: b for b in self.branch_service.iter_branches()}
+
+        return run_bulk(
+            lambda branch: self.branch_service.add_branch(branch.copy(deep=True)),
+            branches,
+            max_concurrency=max_concurrency,
+            done=lambda branch: existing.get(branch.name),
+        )
+
+    def create_offers_bulk(
+        self,
+        *,
+        branch_id: str,
+        offers: Sequence[Offer],
+        skip_existing: bool = True,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> BulkResult[Offer, Offer]:
+        existing: Dict[str, Offer] = {}
+        if skip_existing:
+            existing = {
+                o.name: o for o in self.offer_service.iter_offers(branch_id=branch_id)
+            }
+
+        return run_bulk(
+            lambda offer: self.offer_service.add_offer(
+                branch_id=branch_id, offer=offer.copy(deep=True)
+            ),
+            offers,
+            max_concurrency=max_concurrency,
+            done=lambda offer: existing.get(offer.name),
+        )
+
+    def delete_offers_bulk(
+        self,
+        *,
+        branch_id: str,
+        offer_ids: Sequence[str],
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> BulkResult[str, None]:
+        def delete(offer_id: str) -> None:
+            try:
+                self.offer_service.delete_offer(branch_id=branch_id, offer_id=offer_id)
+            except DiiaClientException as e:
+                # deleted before
+                if not is_not_found(e):
+                    raise
+
+        return run_bulk(delete, offer_ids, max_concurrency=max_concurrency)
+
+    def delete_branch_cascade(
+        self, branch_id: str, *, max_concurrency: int = DEFAULT_BULK_CONCURRENCY
+    ) -> BulkResult[str, None]:
+        try:
+            offer_ids = [
+                o.id for o in self.offer_service.iter_offers(branch_id=branch_id)
+            ]
+        except DiiaClientException as e:
+            if not is_not_found(e):
+                raise
+            # deleted by an interrupted run
+            return BulkResult([BulkItemResult(branch_id, skipped=True)])
+        result = self.delete_offers_bulk(
+            branch_id=branch_id, offer_ids=offer_ids, max_concurrency=max_concurrency
+        )
+        result.items.append(self._delete_branch_item(branch_id, result))
+        return result
+
+    def _delete_branch_item(
+        self, branch_id: str, offers_result: BulkResult[str, None]
+    ) -> BulkItemResult[str, None]:
+        if not offers_result.ok:
+            error = DiiaClientException("Branch has undeleted offers", branch_id)
+            return BulkItemResult(branch_id, error=error)
+        try:
+            self.branch_service.delete_branch(branch_id)
+        except DiiaClientException as e:
+            if not is_not_found(e):
+                return BulkItemResult(branch_id, error=e)
+        return BulkItemResult(branch_id)
+
+
+class AsyncBulkService:
+    """See BulkService."""
+
+    def __init__(
+        self, *, branch_service: AsyncBranchService, offer_service: AsyncOfferService
+    ) -> None:
+        self.branch_service = branch_service
+        self.offer_service = offer_service
+
+    async def create_branches_bulk(
+        self,
+        branches: Sequence[Branch],
+        *,
+        skip_existing: bool = True,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> BulkResult[Branch, Branch]:
+        existing: Dict[str, Branch] = {}
+        if skip_existing:
+            existing = {b.name: b async for b in self.branch_service.iter_branches()}
+
+        return await async_run_bulk(
+            lambda branch: self.branch_service.add_branch(branch.copy(deep=True)),
+            branches,
+            max_concurrency=max_concurrency,
+            done=lambda branch: existing.get(branch.name),
+        )
+
+    async def create_offers_bulk(
+        self,
+        *,
+        branch_id: str,
+        offers: Sequence[Offer],
+        skip_existing: bool = True,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> BulkResult[Offer, Offer]:
+        existing: Dict[str, Offer] = {}
+        if skip_existing:
+            existing = {
+                o.name: o
+                async for o in self.offer_service.iter_offers(branch_id=branch_id)
+            }
+
+        return await async_run_bulk(
+            lambda offer: self.offer_service.add_offer(
+                branch_id=branch_id, offer=offer.copy(deep=True)
+            ),
+            offers,
+            max_concurrency=max_concurrency,
+            done=lambda offer: existing.get(offer.name),
+        )
+
+    async def delete_offers_bulk(
+        self,
+        *,
+        branch_id: str,
+        offer_ids: Sequence[str],
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> BulkResult[str, None]:
+        async def delete(offer_id: str) -> None:
+            try:
+                await self.offer_service.delete_offer(
+                    branch_id=branch_id, offer_id=offer_id
+                )
+            except DiiaClientException as e:
+                if not is_not_found(e):
+                    raise
+
+        return await async_run_bulk(delete, offer_ids, max_concurrency=max_concurrency)
+
+    async def delete_branch_cascade(
+        self, branch_id: str, *, max_concurrency: int = DEFAULT_BULK_CONCURRENCY
+    ) -> BulkResult[str, None]:
+        try:
+            offer_ids = [
+                o.id async for o in self.offer_service.iter_offers(branch_id=branch_id)
+            ]
+        except DiiaClientException as e:
+            if not is_not_found(e):
+                raise
+            return BulkResult([BulkItemResult(branch_id, skipped=True)])
+        result = await self.delete_offers_bulk(
+            branch_id=branch_id, offer_ids=offer_ids, max_concurrency=max_concurrency
+        )
+        result.items.append(await self._delete_branch_item(branch_id, result))
+        return result
+
+    async def _delete_branch_item(
+        self, branch_id: str, offers_result: BulkResult[str, None]
+    ) -> BulkItemResult[str, None]:
+        if not offers_result.ok:
+            error = DiiaClientException("Branch has undeleted offers", branch_id)
+            return BulkItemResult(branch_id, error=error)
+        try:
+            await self.branch_service.delete_branch(branch_id)
+        except DiiaClientException as e:
+            if not is_not_found(e):
+                return BulkItemResult(branch_id, error=e)
+        return BulkItemResult(branch_id)
@@ -1,8 +1,7 @@
-import base64
 import copy
-import json
 from typing import List
 
+from diia_client import codec
 from diia_client.constants import REQUEST_ID_HEADER
 from diia_client.crypto.base_service import AbstractCryptoService
 from diia_client.enums import DocumentType
@@ -44,16 +43,19 @@ class DocumentService:
     ) -> DocumentPackage:
         request_id = get_headers_value(headers, REQUEST_ID_HEADER)
 
-        decoded_files = []
-        for file in encoded_files:
-            body = self.crypto_service.decrypt(encrypted_data=file.data)
-            filename = file.filename.rstrip(".p7s.p7e")
-            decoded_files.append(
-                DecodedFile(filename=filename, data=base64.b64decode(body))
+        # files and metadata are decrypted in parallel if the service can
+        *bodies, meta_bytes = self.crypto_service.decrypt_many(
+            [file.data for file in encoded_files] + [encoded_json_data]
+        )
+        decoded_files = [
+            DecodedFile(
+                filename=file.filename.rstrip(".p7s.p7e"),
+                data=body,
             )
+            for file, body in zip(encoded_files, bodies)
+        ]
 
-        meta_b64 = self.crypto_service.decrypt(encoded_json_data)
-        meta = json.loads(base64.b64decode(meta_b64))
+        meta = codec.loads(meta_bytes)
         metadata = Metadata(**normalize_meta(meta))
 
         return DocumentPackage(
@@ -1,16 +1,144 @@
-from typing import List, Optional
+import asyncio
+import threading
+from typing import (
+    AsyncGenerator,
+    AsyncIterator,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    cast,
+)
 
 from diia_client.enums import DiiaIDAction, DocumentType
+from diia_client.exceptions import DiiaClientException
+from diia_client.sdk.cache import TTLCache, offers_cache_key
+from diia_client.sdk.offer_registry import OfferRegistry
+from diia_client.sdk.pagination import (
+    DEFAULT_PREFETCH,
+    Page,
+    async_iter_pages,
+    iter_pages,
+)
+from diia_client.sdk.remote.async_diia_api import AsyncDiiaApi
+from diia_client.sdk.remote.diia_api import DiiaApi
 from diia_client.sdk.remote.model import Offer, OfferList, OfferScopes
-from diia_client.sdk.service.base_service import BaseService
+from diia_client.sdk.service.base_service import AsyncBaseService, BaseService
+
+
+def make_offer(
+    name: str,
+    sharing: Optional[List[DocumentType]] = None,
+    diia_id: Optional[List[DiiaIDAction]] = None,
+    return_link: Optional[str] = None,
+) -> Offer:
+    scopes = OfferScopes(sharing=sharing, diia_id=diia_id)
+    return Offer(name=name, return_link=return_link, scopes=scopes)
+
+
+def _find_offer(offers: Dict[str, Offer], offer_id: str) -> Offer:
+    offer = offers.get(offer_id)
+    if offer is None:
+        raise DiiaClientException("Offer not found", offer_id)
+    # cached offer must not be changed by the caller
+    return offer.copy(deep=True)
 
 
 class OfferService(BaseService):
+    def __init__(
+        self,
+        *,
+        diia_api: DiiaApi,
+        cache: Optional[TTLCache] = None,
+        registry: Optional[OfferRegistry] = None,
+    ):
+        super().__init__(diia_api=diia_api)
+        self.cache = cache
+        self.registry = registry if registry is not None else OfferRegistry()
+        # offers are created by one call at a time per branch
+        self._create_locks: Dict[str, threading.Lock] = {}
+        self._create_locks_lock = threading.Lock()
+
     def get_offers(
         self, *, branch_id: str, skip: Optional[int] = None, limit: Optional[int] = None
     ) -> OfferList:
         return self.diia_api.get_offers(branch_id=branch_id, skip=skip, limit=limit)
 
+    def iter_offers(
+        self,
+        *,
+        branch_id: str,
+        page_size: Optional[int] = None,
+        prefetch: int = DEFAULT_PREFETCH,
+    ) -> Iterator[Offer]:
+        def fetch(skip: int, limit: int) -> Page[Offer]:
+            offers = self.diia_api.get_offers(
+                branch_id=branch_id, skip=skip, limit=limit
+            )
+            return offers.total, offers.offers
+
+        return iter_pages(fetch, page_size=page_size, prefetch=prefetch)
+
+    def get_offer(self, *, branch_id: str, offer_id: str) -> Offer:
+        def load() -> Dict[str, Offer]:
+            return {o.id: o for o in self.iter_offers(branch_id=branch_id)}
+
+        if self.cache is None:
+            # pages are fetched one by one until the offer is found
+            offers = self.iter_offers(branch_id=branch_id, prefetch=1)
+            try:
+                for offer in offers:
+                    if offer.id == offer_id:
+                        return offer
+            finally:
+                cast(Generator[Offer, None, None], offers).close()
+            raise DiiaClientException("Offer not found", offer_id)
+        return _find_offer(self.cache.get(offers_cache_key(branch_id), load), offer_id)
+
+    def find_offer(
+        self,
+        *,
+        branch_id: str,
+        sharing: Optional[List[DocumentType]] = None,
+        diia_id: Optional[List[DiiaIDAction]] = None,
+    ) -> Optional[Offer]:
+        if not self.registry.has_branch(branch_id):
+            self.load_registry(branch_id)
+        return self.registry.find(branch_id, sharing=sharing, diia_id=diia_id)
+
+    def get_or_create_offer(
+        self,
+        *,
+        branch_id: str,
+        name: str,
+        sharing: Optional[List[DocumentType]] = None,
+        diia_id: Optional[List[DiiaIDAction]] = None,
+        return_link: Optional[str] = None,
+    ) -> Offer:
+        offer = self.find_offer(branch_id=branch_id, sharing=sharing, diia_id=diia_id)
+        if offer is not None:
+            return offer
+        with self._get_create_lock(branch_id):
+            # could be created by another process, or by a concurrent call
+            self.load_registry(branch_id)
+            offer = self.registry.find(branch_id, sharing=sharing, diia_id=diia_id)
+            if offer is None:
+                offer = self.create_offer(
+                    branch_id=branch_id,
+                    name=name,
+                    sharing=sharing,
+                    diia_id=diia_id,
+                    return_link=return_link,
+                )
+            return offer
+
+    def load_registry(self, branch_id: str) -> None:
+        """Fetch offers of the branch into the registry."""
+        generation = self.registry.generation()
+        offers = list(self.iter_offers(branch_id=branch_id))
+        self.registry.set_offers(branch_id, offers, generation)
+
     def create_offer(
         self,
         *,
@@ -20,10 +148,180 @@ class OfferService(BaseService):
         diia_id: Optional[List[DiiaIDAction]] = None,
         return_link: Optional[str] = None,
     ) -> Offer:
-        scopes = OfferScopes(sharing=sharing, diia_id=diia_id)
-        offer = Offer(name=name, return_link=return_link, scopes=scopes)
-        offer.id = self.diia_api.create_offer(branch_id=branch_id, offer=offer)
+        offer = make_offer(
+            name=name, sharing=sharing, diia_id=diia_id, return_link=return_link
+        )
+        return self.add_offer(branch_id=branch_id, offer=offer)
+
+    def add_offer(self, *, branch_id: str, offer: Offer) -> Offer:
+        """Create the offer made by make_offer, sets its id."""
+        try:
+            offer.id = self.diia_api.create_offer(branch_id=branch_id, offer=offer)
+        except Exception:
+            # the offer could be created anyway
+            self.registry.forget(branch_id)
+            raise
+        finally:
+            self._invalidate(branch_id)
+        self.registry.add(branch_id, offer)
         return offer
 
     def delete_offer(self, *, branch_id: str, offer_id: str) -> None:
-        return self.diia_api.delete_offer(branch_id=branch_id, offer_id=offer_id)
+        try:
+            self.diia_api.delete_offer(branch_id=branch_id, offer_id=offer_id)
+        except Exception:
+            self.registry.forget(branch_id)
+            raise
+        finally:
+            self._invalidate(branch_id)
+        self.registry.remove(branch_id, offer_id)
+
+    def _get_create_lock(self, branch_id: str) -> threading.Lock:
+        with self._create_locks_lock:
+            return self._create_locks.setdefault(branch_id, threading.Lock())
+
+    def _invalidate(self, branch_id: str) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(offers_cache_key(branch_id))
+
+
+class AsyncOfferService(AsyncBaseService):
+    def __init__(
+        self,
+        *,
+        diia_api: AsyncDiiaApi,
+        cache: Optional[TTLCache] = None,
+        registry: Optional[OfferRegistry] = None,
+    ):
+        super().__init__(diia_api=diia_api)
+        self.cache = cache
+        self.registry = registry if registry is not None else OfferRegistry()
+        # created in the event loop, see OfferService
+        self._create_locks: Dict[str, asyncio.Lock] = {}
+
+    async def get_offers(
+        self, *, branch_id: str, skip: Optional[int] = None, limit: Optional[int] = None
+    ) -> OfferList:
+        return await self.diia_api.get_offers(
+            branch_id=branch_id, skip=skip, limit=limit
+        )
+
+    def iter_offers(
+        self,
+        *,
+        branch_id: str,
+        page_size: Optional[int] = None,
+        prefetch: int = DEFAULT_PREFETCH,
+    ) -> AsyncIterator[Offer]:
+        async def fetch(skip: int, limit: int) -> Page[Offer]:
+            offers = await self.diia_api.get_offers(
+                branch_id=branch_id, skip=skip, limit=limit
+            )
+            return offers.total, offers.offers
+
+        return async_iter_pages(fetch, page_size=page_size, prefetch=prefetch)
+
+    async def get_offer(self, *, branch_id: str, offer_id: str) -> Offer:
+        async def load() -> Dict[str, Offer]:
+            return {o.id: o async for o in self.iter_offers(branch_id=branch_id)}
+
+        if self.cache is None:
+            offers = self.iter_offers(branch_id=branch_id, prefetch=1)
+            try:
+                async for offer in offers:
+                    if offer.id == offer_id:
+                        return offer
+            finally:
+                # cancels the page fetched ahead
+                await cast(AsyncGenerator[Offer, None], offers).aclose()
+            raise DiiaClientException("Offer not found", offer_id)
+        cached = await self.cache.async_get(offers_cache_key(branch_id), load)
+        return _find_offer(cached, offer_id)
+
+    async def find_offer(
+        self,
+        *,
+        branch_id: str,
+        sharing: Optional[List[DocumentType]] = None,
+        diia_id: Optional[List[DiiaIDAction]] = None,
+    ) -> Optional[Offer]:
+        if not self.registry.has_branch(branch_id):
+            await self.load_registry(branch_id)
+        return self.registry.find(branch_id, sharing=sharing, diia_id=diia_id)
+
+    async def get_or_create_offer(
+        self,
+        *,
+        branch_id: str,
+        name: str,
+        sharing: Optional[List[DocumentType]] = None,
+        diia_id: Optional[List[DiiaIDAction]] = None,
+        return_link: Optional[str] = None,
+    ) -> Offer:
+        offer = await self.find_offer(
+            branch_id=branch_id, sharing=sharing, diia_id=diia_id
+        )
+        if offer is not None:
+            return offer
+        lock = self._create_locks.get(branch_id)
+        if lock is None:
+            lock = self._create_locks[branch_id] = asyncio.Lock()
+        async with lock:
+            await self.load_registry(branch_id)
+            offer = self.registry.find(branch_id, sharing=sharing, diia_id=diia_id)
+            if offer is None:
+                offer = await self.create_offer(
+                    branch_id=branch_id,
+                    name=name,
+                    sharing=sharing,
+                    diia_id=diia_id,
+                    return_link=return_link,
+                )
+            return offer
+
+    async def load_registry(self, branch_id: str) -> None:
+        generation = self.registry.generation()
+        offers = [o async for o in self.iter_offers(branch_id=branch_id)]
+        self.registry.set_offers(branch_id, offers, generation)
+
+    async def create_offer(
+        self,
+        *,
+        branch_id: str,
+        name: str,
+        sharing: Optional[List[DocumentType]] = None,
+        diia_id: Optional[List[DiiaIDAction]] = None,
+        return_link: Optional[str] = None,
+    ) -> Offer:
+        offer = make_offer(
+            name=name, sharing=sharing, diia_id=diia_id, return_link=return_link
+        )
+        return await self.add_offer(branch_id=branch_id, offer=offer)
+
+    async def add_offer(self, *, branch_id: str, offer: Offer) -> Offer:
+        """Create the offer made by make_offer, sets its id."""
+        try:
+            offer.id = await self.diia_api.create_offer(
+                branch_id=branch_id, offer=offer
+            )
+        except Exception:
+            self.registry.forget(branch_id)
+            raise
+        finally:
+            self._invalidate(branch_id)
+        self.registry.add(branch_id, offer)
+        return offer
+
+    async def delete_offer(self, *, branch_id: str, offer_id: str) -> None:
+        try:
+            await self.diia_api.delete_offer(branch_id=branch_id, offer_id=offer_id)
+        except Exception:
+            self.registry.forget(branch_id)
+            raise
+        finally:
+            self._invalidate(branch_id)
+        self.registry.remove(branch_id, offer_id)
+
+    def _invalidate(self, branch_id: str) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(offers_cache_key(branch_id))
@@ -1,45 +1,402 @@
+import asyncio
+import hashlib
+import logging
+import threading
 import time
+from typing import Optional
 
+from diia_client.enums import EndpointFamily
 from diia_client.exceptions import DiiaClientException
-from diia_client.sdk.http.base_client import AbstractHTTPCLient
+from diia_client.sdk.deadline import (
+    acquire_within_deadline,
+    async_acquire_within_deadline,
+    clamp_timeout,
+    reset_deadline,
+)
+from diia_client.sdk.http.base_client import (
+    DEFAULT_TIMEOUT,
+    AbstractAsyncHTTPClient,
+    AbstractHTTPCLient,
+    TimeoutValue,
+)
+from diia_client.sdk.remote.circuit_breaker import CircuitBreaker
+from diia_client.sdk.token_store import (
+    AbstractTokenStore,
+    MemoryTokenStore,
+    SessionToken,
+)
+from diia_client.types import StrDict
 
 
+logger = logging.getLogger(__name__)
+
 SESSION_TOKEN_TIME_TO_LIVE = 2 * 3600 - 5
+# the token is refreshed in background this number of seconds before expiry
+SESSION_TOKEN_REFRESH_MARGIN = 5 * 60
+# delay between attempts when background refresh fails
+SESSION_TOKEN_REFRESH_RETRY_INTERVAL = 15
+# a token rejected by Diia is not replaced if it was obtained this number
+# of seconds ago or later, so a misbehaving endpoint can't cause an auth storm
+SESSION_TOKEN_INVALIDATION_COOLDOWN = 5
 
 
-class SessionTokenService:
+class BaseSessionTokenService:
     def __init__(
-        self, acquirer_token: str, diia_host: str, http_client: AbstractHTTPCLient
+        self,
+        acquirer_token: str,
+        diia_host: str,
+        refresh_margin: float = SESSION_TOKEN_REFRESH_MARGIN,
+        background_refresh: bool = True,
+        token_store: Optional[AbstractTokenStore] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
     ):
         self.acquirer_token = acquirer_token
         self.diia_host = diia_host
-        self.http_client = http_client
-        self.session_token_obtain_time = 0
+        self.refresh_margin = refresh_margin
+        self.background_refresh = background_refresh
+        self.token_store = token_store or MemoryTokenStore()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(EndpointFamily.AUTH)
+        self.timeout = timeout
+        self.session_token_obtain_time = 0.0
         self.session_token = ""
 
-    def get_session_token(self) -> str:
-        now = int(time.time())
+        # don't expose the acquirer token in a shared storage
+        self._store_key = hashlib.sha256(
+            f"{diia_host}:{acquirer_token}".encode()
+        ).hexdigest()
 
-        if (now - self.session_token_obtain_time) >= SESSION_TOKEN_TIME_TO_LIVE:
-            self.session_token = self.obtain_session_token()
-            self.session_token_obtain_time = now
-        return self.session_token
+    def _is_expired(self, now: float) -> bool:
+        return (now - self.session_token_obtain_time) >= SESSION_TOKEN_TIME_TO_LIVE
+
+    def _seconds_to_refresh(self, now: float) -> float:
+        expires_at = self.session_token_obtain_time + SESSION_TOKEN_TIME_TO_LIVE
+        return max(0, expires_at - self.refresh_margin - now)
+
+    def _is_invalidated(self, stale_token: str, now: float) -> bool:
+        return (
+            self.session_token == stale_token
+            and now - self.session_token_obtain_time
+            >= SESSION_TOKEN_INVALIDATION_COOLDOWN
+        )
+
+    def _usable(self, token: Optional[SessionToken]) -> Optional[SessionToken]:
+        """Return a stored token if it's newer than ours and doesn't need refresh."""
+        if token is None or token.obtain_time <= self.session_token_obtain_time:
+            return None
+        margin = self.refresh_margin if self.background_refresh else 0
+        if time.time() >= token.obtain_time + SESSION_TOKEN_TIME_TO_LIVE - margin:
+            return None
+        return token
+
+    def _use(self, token: SessionToken) -> None:
+        self.session_token = token.token
+        self.session_token_obtain_time = token.obtain_time
+
+    def _next_refresh_delay(self, now: float, failed: bool) -> Optional[float]:
+        """Delay before the next background refresh, None when it's pointless."""
+        if not self.background_refresh:
+            return None
+        if not failed:
+            return self._seconds_to_refresh(now)
+        # retry while the old token is still valid, after that
+        # callers obtain a new token by themselves
+        if self._is_expired(now + SESSION_TOKEN_REFRESH_RETRY_INTERVAL):
+            return None
+        return SESSION_TOKEN_REFRESH_RETRY_INTERVAL
 
     """
     curl -X GET "https://{diia_host}/api/v1/auth/acquirer/{acquirer_token}"
     -H  "accept: application/json" -H "Authorization: Basic {auth_acquirer_token}"
     """
 
+    def _prepare_url(self) -> str:
+        return f"{self.diia_host}/api/v1/auth/acquirer/{self.acquirer_token}"
+
+    def _prepare_headers(self) -> StrDict:
+        return {
+            "Accept": "application/json",
+            "Authorization": f"Bearer {self.acquirer_token}",
+        }
+
+
+class SessionTokenService(BaseSessionTokenService):
+    """Session token holder.
+
+    Thread-safe: a single instance (and so a single Diia instance)
+    may be shared by any number of threads. Only one thread obtains
+    a new token at a time, the others wait for its result. When
+    `background_refresh` is on, the token is renewed by a daemon
+    timer `refresh_margin` seconds before expiry, and callers keep
+    getting the old token, which is still valid, in the meantime.
+
+    With a shared `token_store` (e.g. FileTokenStore) all processes use
+    one token: a process picks up a valid token from the store without
+    a network call, and only one process at a time obtains a new one.
+    """
+
+    def __init__(
+        self,
+        acquirer_token: str,
+        diia_host: str,
+        http_client: AbstractHTTPCLient,
+        refresh_margin: float = SESSION_TOKEN_REFRESH_MARGIN,
+        background_refresh: bool = True,
+        token_store: Optional[AbstractTokenStore] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
+    ):
+        super().__init__(
+            acquirer_token,
+            diia_host,
+            refresh_margin=refresh_margin,
+            background_refresh=background_refresh,
+            token_store=token_store,
+            circuit_breaker=circuit_breaker,
+            timeout=timeout,
+        )
+        self.http_client = http_client
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def get_session_token(self) -> str:
+        if not self._is_expired(time.time()):
+            return self.session_token
+
+        with acquire_within_deadline(self._lock):
+            if self._is_expired(time.time()):
+                self._refresh()
+        return self.session_token
+
+    def invalidate(self, stale_token: str) -> str:
+        """Replace the token rejected by Diia with a new one.
+
+        All callers that got the same stale token share a single refresh.
+
+        Args:
+            stale_token: The token the failed request was sent with.
+
+        Returns:
+            The token to retry the request with.
+
+        Raises:
+            DiiaClientException: If a new token can't be obtained.
+        """
+        with acquire_within_deadline(self._lock):
+            if self._is_invalidated(stale_token, time.time()):
+                self._refresh()
+        return self.session_token
+
+    def close(self) -> None:
+        """Stop background refresh."""
+        with self._lock:
+            self.background_refresh = False
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _refresh(self) -> None:
+        # must be called with self._lock held
+        try:
+            self._use(self._load_or_obtain())
+        except DiiaClientException:
+            self._schedule_refresh(self._next_refresh_delay(time.time(), failed=True))
+            raise
+        self._schedule_refresh(self._next_refresh_delay(time.time(), failed=False))
+
+    def _load_or_obtain(self) -> SessionToken:
+        # another process may have already obtained a new token
+        stored = self._usable(self.token_store.get(self._store_key))
+        if stored is not None:
+            return stored
+
+        with self.token_store.lock(self._store_key):
+            stored = self._usable(self.token_store.get(self._store_key))
+            if stored is not None:
+                return stored
+
+            token = SessionToken(
+                token=self.obtain_session_token(), obtain_time=time.time()
+            )
+            self.token_store.set(self._store_key, token)
+            return token
+
+    def _schedule_refresh(self, delay: Optional[float]) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if delay is None:
+            return
+        self._timer = threading.Timer(delay, self._refresh_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if not self.background_refresh:
+                return
+            try:
+                self._refresh()
+            except DiiaClientException:
+                logger.warning("Background session token refresh failed", exc_info=True)
+
     def obtain_session_token(self) -> str:
-        url = f"{self.diia_host}/api/v1/auth/acquirer/{self.acquirer_token}"
+        timeout = clamp_timeout(self.timeout)
+        try:
+            with self.circuit_breaker.guard(self.http_client.transport_errors):
+                result = self.http_client.get(
+                    url=self._prepare_url(),
+                    headers=self._prepare_headers(),
+                    timeout=timeout,
+                )
+            return result["token"]
+        except Exception as e:
+            raise DiiaClientException("Authentication error", e)
+
+
+class AsyncSessionTokenService(BaseSessionTokenService):
+    """Asyncio counterpart of SessionTokenService.
+
+    Only one coroutine obtains a new token at a time, and the
+    background refresh runs as a task of the event loop.
+    """
+
+    def __init__(
+        self,
+        acquirer_token: str,
+        diia_host: str,
+        http_client: AbstractAsyncHTTPClient,
+        refresh_margin: float = SESSION_TOKEN_REFRESH_MARGIN,
+        background_refresh: bool = True,
+        token_store: Optional[AbstractTokenStore] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
+    ):
+        super().__init__(
+            acquirer_token,
+            diia_host,
+            refresh_margin=refresh_margin,
+            background_refresh=background_refresh,
+            token_store=token_store,
+            circuit_breaker=circuit_breaker,
+            timeout=timeout,
+        )
+        self.http_client = http_client
+        self._lock: Optional[asyncio.Lock] = None
+        self._refresh_task: Optional["asyncio.Task[None]"] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        # the lock is created lazily to bind it to the running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def get_session_token(self) -> str:
+        if not self._is_expired(time.time()):
+            return self.session_token
+
+        async with async_acquire_within_deadline(self._get_lock()):
+            if self._is_expired(time.time()):
+                await self._refresh()
+        return self.session_token
+
+    async def invalidate(self, stale_token: str) -> str:
+        """See SessionTokenService.invalidate."""
+        async with async_acquire_within_deadline(self._get_lock()):
+            if self._is_invalidated(stale_token, time.time()):
+                await self._refresh()
+        return self.session_token
+
+    async def close(self) -> None:
+        """Stop background refresh."""
+        self.background_refresh = False
+        self._cancel_refresh_task()
+
+    def _cancel_refresh_task(self) -> None:
+        task = self._refresh_task
+        self._refresh_task = None
+        # never cancel itself: _refresh is also called from the task
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    async def _refresh(self) -> None:
+        # must be called with the lock held
+        try:
+            self._use(await self._load_or_obtain())
+        except DiiaClientException:
+            self._schedule_refresh(self._next_refresh_delay(time.time(), failed=True))
+            raise
+        self._schedule_refresh(self._next_refresh_delay(time.time(), failed=False))
+
+    async def _load_or_obtain(self) -> SessionToken:
+        # token store may block (file locks, network), keep it off the event loop
+        loop = asyncio.get_running_loop()
+        store = self.token_store
+
+        stored = self._usable(
+            await loop.run_in_executor(None, store.get, self._store_key)
+        )
+        if stored is not None:
+            return stored
+
+        acquired = loop.run_in_executor(None, store.acquire_lock, self._store_key)
         try:
-            result = self.http_client.get(
-                url=url,
-                headers={
-                    "Accept": "application/json",
-                    "Authorization": f"Bearer {self.acquirer_token}",
-                },
+            # the thread can't be interrupted, so the lock it takes on
+            # cancellation of the caller is released once it's taken
+            await asyncio.shield(acquired)
+        except asyncio.CancelledError:
+            acquired.add_done_callback(self._release_abandoned_lock)
+            raise
+        try:
+            stored = self._usable(
+                await loop.run_in_executor(None, store.get, self._store_key)
+            )
+            if stored is not None:
+                return stored
+
+            token = SessionToken(
+                token=await self.obtain_session_token(), obtain_time=time.time()
             )
+            await loop.run_in_executor(None, store.set, self._store_key, token)
+            return token
+        finally:
+            await asyncio.shield(
+                loop.run_in_executor(None, store.release_lock, self._store_key)
+            )
+
+    def _release_abandoned_lock(self, acquired: "asyncio.Future[None]") -> None:
+        if acquired.cancelled() or acquired.exception() is not None:
+            return
+        loop = asyncio.get_event_loop()
+        loop.run_in_executor(None, self.token_store.release_lock, self._store_key)
+
+    def _schedule_refresh(self, delay: Optional[float]) -> None:
+        self._cancel_refresh_task()
+        if delay is None:
+            return
+        self._refresh_task = asyncio.ensure_future(self._refresh_later(delay))
+
+    async def _refresh_later(self, delay: float) -> None:
+        # the task may be created by a call made under a deadline
+        reset_deadline()
+        await asyncio.sleep(delay)
+        async with self._get_lock():
+            if not self.background_refresh:
+                return
+            try:
+                await self._refresh()
+            except DiiaClientException:
+                logger.warning("Background session token refresh failed", exc_info=True)
+
+    async def obtain_session_token(self) -> str:
+        timeout = clamp_timeout(self.timeout)
+        try:
+            with self.circuit_breaker.guard(self.http_client.transport_errors):
+                result = await self.http_client.get(
+                    url=self._prepare_url(),
+                    headers=self._prepare_headers(),
+                    timeout=timeout,
+                )
             return result["token"]
         except Exception as e:
             raise DiiaClientException("Authentication error", e)
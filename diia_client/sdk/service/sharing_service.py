@@ -1,4 +1,13 @@
-from diia_client.sdk.service.base_service import BaseService
+from typing import AsyncIterator, Iterator, Sequence
+
+from diia_client.sdk.bulk import (
+    DEFAULT_BULK_CONCURRENCY,
+    BulkItemResult,
+    async_iter_bulk,
+    iter_bulk,
+)
+from diia_client.sdk.model import DocumentRequest
+from diia_client.sdk.service.base_service import AsyncBaseService, BaseService
 
 
 class SharingService(BaseService):
@@ -24,3 +33,76 @@ class SharingService(BaseService):
             qrcode=qrcode,
             request_id=request_id,
         )
+
+    def request_documents(
+        self,
+        branch_id: str,
+        requests: Sequence[DocumentRequest],
+        *,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> Iterator[BulkItemResult[DocumentRequest, bool]]:
+        return iter_bulk(
+            lambda request: self.request_document(branch_id, request),
+            requests,
+            max_concurrency=max_concurrency,
+            key=lambda request: request.key,
+        )
+
+    def request_document(self, branch_id: str, request: DocumentRequest) -> bool:
+        if request.barcode is not None:
+            return self.request_document_by_barcode(
+                branch_id, request.barcode, request.request_id
+            )
+        return self.request_document_by_qrcode(
+            branch_id, str(request.qrcode), request.request_id
+        )
+
+
+class AsyncSharingService(AsyncBaseService):
+    async def get_deep_link(
+        self, branch_id: str, offer_id: str, request_id: str
+    ) -> str:
+        return await self.diia_api.get_deep_link(
+            branch_id=branch_id, offer_id=offer_id, request_id=request_id
+        )
+
+    async def request_document_by_barcode(
+        self, branch_id: str, barcode: str, request_id: str
+    ) -> bool:
+        return await self.diia_api.request_document_by_barcode(
+            branch_id=branch_id,
+            barcode=barcode,
+            request_id=request_id,
+        )
+
+    async def request_document_by_qrcode(
+        self, branch_id: str, qrcode: str, request_id: str
+    ) -> bool:
+        return await self.diia_api.request_document_by_qrcode(
+            branch_id=branch_id,
+            qrcode=qrcode,
+            request_id=request_id,
+        )
+
+    def request_documents(
+        self,
+        branch_id: str,
+        requests: Sequence[DocumentRequest],
+        *,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> AsyncIterator[BulkItemResult[DocumentRequest, bool]]:
+        return async_iter_bulk(
+            lambda request: self.request_document(branch_id, request),
+            requests,
+            max_concurrency=max_concurrency,
+            key=lambda request: request.key,
+        )
+
+    async def request_document(self, branch_id: str, request: DocumentRequest) -> bool:
+        if request.barcode is not None:
+            return await self.request_document_by_barcode(
+                branch_id, request.barcode, request.request_id
+            )
+        return await self.request_document_by_qrcode(
+            branch_id, str(request.qrcode), request.request_id
+        )
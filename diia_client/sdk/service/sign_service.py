@@ -1,29 +1,54 @@
+import asyncio
 import base64
-import json
 import os
-from typing import List, Optional
+import uuid
+from typing import AsyncIterator, Iterator, List, Optional, Sequence, Tuple
 
+from diia_client import codec
 from diia_client.constants import DIIA_ID_ACTION_HEADER, REQUEST_ID_HEADER
 from diia_client.crypto.base_service import AbstractCryptoService
 from diia_client.enums import DiiaIDAction
+from diia_client.sdk.bulk import (
+    DEFAULT_BULK_CONCURRENCY,
+    BulkItemResult,
+    async_iter_bulk,
+    iter_bulk,
+)
+from diia_client.sdk.hash_cache import (
+    Fingerprint,
+    HashCache,
+    HashCacheConfig,
+    fingerprint,
+    stat_file,
+)
 from diia_client.sdk.model import (
+    AnyFile,
     AuthDeepLink,
     File,
     HashedFile,
+    PathFile,
     Signature,
     SignaturePackage,
 )
+from diia_client.sdk.remote.async_diia_api import AsyncDiiaApi
 from diia_client.sdk.remote.diia_api import DiiaApi
+from diia_client.sdk.signing_campaign import SigningCampaign, SigningCampaignRegistry
 from diia_client.types import StrDict
 from diia_client.utils import get_headers_value_required
 
 
-class SignService:
+class BaseSignService:
     def __init__(
-        self, *, diia_api: DiiaApi, crypto_service: AbstractCryptoService
+        self,
+        *,
+        crypto_service: AbstractCryptoService,
+        hash_cache_config: Optional[HashCacheConfig] = None,
     ) -> None:
-        self.diia_api = diia_api
         self.crypto_service = crypto_service
+        self.hash_cache = (
+            HashCache(hash_cache_config) if hash_cache_config is not None else None
+        )
+        self.campaigns = SigningCampaignRegistry()
 
     def _build_signature_filename(self, filename: str) -> str:
         # replace last file extension to .p7s
@@ -31,22 +56,180 @@ class SignService:
         base = os.path.splitext(os.path.basename(filename))[0]
         return f"{base}.p7s"
 
+    def _hash_files(self, files: Sequence[AnyFile]) -> List[HashedFile]:
+        keys = [self._get_cache_key(file) for file in files]
+        cached = [self._get_cached_hash(key) for key in keys]
+        hashes = list(cached)
+
+        # files in memory are hashed in parallel if the crypto service can,
+        # others are streamed by chunks
+        in_memory = [
+            (i, file)
+            for i, file in enumerate(files)
+            if hashes[i] is None and isinstance(file, File)
+        ]
+        calculated = self.crypto_service.calc_hashes(
+            [file.data for _, file in in_memory]
+        )
+        for (i, _), calculated_hash in zip(in_memory, calculated):
+            hashes[i] = calculated_hash
+
+        hashed_files = []
+        for file, key, cached_hash, hash_ in zip(files, keys, cached, hashes):
+            if hash_ is None:
+                hash_, key = self._hash_file(file)
+            if cached_hash is None and key is not None and self.hash_cache is not None:
+                self.hash_cache.set(key, hash_)
+            hashed_files.append(
+                HashedFile(
+                    filename=file.filename,
+                    filehash=base64.b64encode(hash_).decode(),
+                )
+            )
+        return hashed_files
+
+    def _get_cache_key(self, file: AnyFile) -> Optional[str]:
+        """Fingerprint of the file if it's known without reading the file."""
+        if self.hash_cache is None:
+            return None
+        if isinstance(file, File):
+            return fingerprint(file.iter_chunks())
+        if isinstance(file, PathFile):
+            stat = stat_file(file.path)
+            return self.hash_cache.get_file_key(stat) if stat is not None else None
+        return None
+
+    def _hash_file(self, file: AnyFile) -> Tuple[bytes, Optional[str]]:
+        """Hash the file by chunks, fingerprinting it in the same pass for the cache."""
+        if self.hash_cache is None:
+            return self.crypto_service.hash_chunks(file.iter_chunks()), None
+        # taken before reading: if the file changes meanwhile, the stat won't match
+        stat = stat_file(file.path) if isinstance(file, PathFile) else None
+        fingerprint_ = Fingerprint()
+        with self.crypto_service.new_hash() as hash_:
+            for chunk in file.iter_chunks():
+                hash_.update(chunk)
+                fingerprint_.update(chunk)
+            digest = hash_.digest()
+        key = fingerprint_.hexdigest()
+        if stat is not None:
+            self.hash_cache.set_file_key(stat, key)
+        return digest, key
+
+    def close(self) -> None:
+        """Save new hashes of the hash cache."""
+        if self.hash_cache is not None:
+            self.hash_cache.close()
+
+    def _get_cached_hash(self, key: Optional[str]) -> Optional[bytes]:
+        if key is None or self.hash_cache is None:
+            return None
+        return self.hash_cache.get(key)
+
+    def _hash_request_id(self, request_id: str) -> str:
+        return base64.b64encode(
+            self.crypto_service.calc_hash_bytes(request_id.encode())
+        ).decode()
+
+    def decode_signature_package(
+        self, headers: StrDict, encode_data: str
+    ) -> SignaturePackage:
+
+        request_id = get_headers_value_required(headers, REQUEST_ID_HEADER)
+
+        diia_id_action = DiiaIDAction(
+            get_headers_value_required(headers, DIIA_ID_ACTION_HEADER)
+        )
+
+        request_data_bytes = base64.b64decode(encode_data)
+        request_data = codec.loads(request_data_bytes)
+
+        if diia_id_action == DiiaIDAction.HASHED_FILES_SIGNING:
+            signatures = [
+                Signature(
+                    filename=self._build_signature_filename(s["name"]),
+                    signature=s["signature"],
+                )
+                for s in request_data["signedItems"]
+            ]
+        else:
+            signatures = [
+                # set filename to auth.p7s, because request_data["requestId"]
+                # is crypto-hash and not url/filesystem-safe
+                # request_data["requestId"] == request_id from headers
+                Signature(
+                    filename="auth.p7s",
+                    signature=request_data["signature"],
+                )
+            ]
+
+        package = SignaturePackage(
+            request_id=request_id,
+            diia_id_action=diia_id_action,
+            signatures=signatures,
+        )
+        campaign = self.campaigns.find(request_id)
+        if campaign is not None:
+            campaign.record(package)
+            if campaign.forget_when_complete and campaign.is_complete():
+                self.campaigns.remove(campaign.campaign_id)
+        return package
+
+    def _make_campaign(
+        self,
+        branch_id: str,
+        offer_id: str,
+        hashed_files: List[HashedFile],
+        request_ids: Sequence[str],
+        campaign_id: Optional[str],
+        forget_when_complete: bool,
+    ) -> SigningCampaign:
+        campaign = SigningCampaign(
+            campaign_id=campaign_id or str(uuid.uuid4()),
+            branch_id=branch_id,
+            offer_id=offer_id,
+            hashed_files=hashed_files,
+            request_ids=request_ids,
+            forget_when_complete=forget_when_complete,
+        )
+        self.campaigns.add(campaign)
+        return campaign
+
+    def _get_campaign_request_ids(
+        self, campaign: SigningCampaign, request_ids: Optional[Sequence[str]]
+    ) -> Sequence[str]:
+        if request_ids is None:
+            return campaign.request_ids
+        unknown = set(request_ids).difference(campaign.request_ids)
+        if unknown:
+            raise ValueError(
+                f"Request ids aren't in campaign {campaign.campaign_id}: "
+                f"{sorted(unknown)}"
+            )
+        return request_ids
+
+
+class SignService(BaseSignService):
+    def __init__(
+        self,
+        *,
+        diia_api: DiiaApi,
+        crypto_service: AbstractCryptoService,
+        hash_cache_config: Optional[HashCacheConfig] = None,
+    ) -> None:
+        super().__init__(
+            crypto_service=crypto_service, hash_cache_config=hash_cache_config
+        )
+        self.diia_api = diia_api
+
     def get_sign_deep_link(
         self,
         branch_id: str,
         offer_id: str,
         request_id: str,
-        files: List[File],
+        files: Sequence[AnyFile],
     ) -> str:
-        hashed_files = [
-            HashedFile(
-                filename=file.filename,
-                filehash=self.crypto_service.calc_hash(
-                    base64.b64encode(file.data).decode()
-                ),
-            )
-            for file in files
-        ]
+        hashed_files = self._hash_files(files)
 
         return self.diia_api.get_deep_link(
             branch_id=branch_id,
@@ -55,6 +238,44 @@ class SignService:
             hashed_files=hashed_files,
         )
 
+    def start_signing_campaign(
+        self,
+        branch_id: str,
+        offer_id: str,
+        files: Sequence[AnyFile],
+        request_ids: Sequence[str],
+        *,
+        campaign_id: Optional[str] = None,
+        forget_when_complete: bool = False,
+    ) -> SigningCampaign:
+        return self._make_campaign(
+            branch_id,
+            offer_id,
+            self._hash_files(files),
+            request_ids,
+            campaign_id,
+            forget_when_complete,
+        )
+
+    def get_campaign_deep_links(
+        self,
+        campaign: SigningCampaign,
+        *,
+        request_ids: Optional[Sequence[str]] = None,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> Iterator[BulkItemResult[str, str]]:
+        return iter_bulk(
+            lambda request_id: self.diia_api.get_deep_link(
+                branch_id=campaign.branch_id,
+                offer_id=campaign.offer_id,
+                request_id=request_id,
+                hashed_files=campaign.hashed_files,
+            ),
+            self._get_campaign_request_ids(campaign, request_ids),
+            max_concurrency=max_concurrency,
+            key=lambda request_id: request_id,
+        )
+
     def get_auth_deep_link(
         self,
         branch_id: str,
@@ -63,9 +284,7 @@ class SignService:
         return_link: Optional[str] = None,
     ) -> AuthDeepLink:
 
-        request_id_hash = self.crypto_service.calc_hash(
-            base64.b64encode(request_id.encode()).decode()
-        )
+        request_id_hash = self._hash_request_id(request_id)
 
         deep_link = self.diia_api.get_deep_link(
             branch_id=branch_id,
@@ -80,40 +299,97 @@ class SignService:
             request_id_hash=request_id_hash,
         )
 
-    def decode_signature_package(
-        self, headers: StrDict, encode_data: str
-    ) -> SignaturePackage:
 
-        request_id = get_headers_value_required(headers, REQUEST_ID_HEADER)
+class AsyncSignService(BaseSignService):
+    def __init__(
+        self,
+        *,
+        diia_api: AsyncDiiaApi,
+        crypto_service: AbstractCryptoService,
+        hash_cache_config: Optional[HashCacheConfig] = None,
+    ) -> None:
+        super().__init__(
+            crypto_service=crypto_service, hash_cache_config=hash_cache_config
+        )
+        self.diia_api = diia_api
 
-        diia_id_action = DiiaIDAction(
-            get_headers_value_required(headers, DIIA_ID_ACTION_HEADER)
+    async def get_sign_deep_link(
+        self,
+        branch_id: str,
+        offer_id: str,
+        request_id: str,
+        files: Sequence[AnyFile],
+    ) -> str:
+        # hashing of big files is CPU-bound, keep it off the event loop
+        loop = asyncio.get_running_loop()
+        hashed_files = await loop.run_in_executor(None, self._hash_files, files)
+
+        return await self.diia_api.get_deep_link(
+            branch_id=branch_id,
+            offer_id=offer_id,
+            request_id=request_id,
+            hashed_files=hashed_files,
         )
 
-        request_data_bytes = base64.b64decode(encode_data)
-        request_data = json.loads(request_data_bytes.decode())
+    async def start_signing_campaign(
+        self,
+        branch_id: str,
+        offer_id: str,
+        files: Sequence[AnyFile],
+        request_ids: Sequence[str],
+        *,
+        campaign_id: Optional[str] = None,
+        forget_when_complete: bool = False,
+    ) -> SigningCampaign:
+        loop = asyncio.get_running_loop()
+        hashed_files = await loop.run_in_executor(None, self._hash_files, files)
+        return self._make_campaign(
+            branch_id,
+            offer_id,
+            hashed_files,
+            request_ids,
+            campaign_id,
+            forget_when_complete,
+        )
 
-        if diia_id_action == DiiaIDAction.HASHED_FILES_SIGNING:
-            signatures = [
-                Signature(
-                    filename=self._build_signature_filename(s["name"]),
-                    signature=s["signature"],
-                )
-                for s in request_data["signedItems"]
-            ]
-        else:
-            signatures = [
-                # set filename to auth.p7s, because request_data["requestId"]
-                # is crypto-hash and not url/filesystem-safe
-                # request_data["requestId"] == request_id from headers
-                Signature(
-                    filename="auth.p7s",
-                    signature=request_data["signature"],
-                )
-            ]
+    def get_campaign_deep_links(
+        self,
+        campaign: SigningCampaign,
+        *,
+        request_ids: Optional[Sequence[str]] = None,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> AsyncIterator[BulkItemResult[str, str]]:
+        return async_iter_bulk(
+            lambda request_id: self.diia_api.get_deep_link(
+                branch_id=campaign.branch_id,
+                offer_id=campaign.offer_id,
+                request_id=request_id,
+                hashed_files=campaign.hashed_files,
+            ),
+            self._get_campaign_request_ids(campaign, request_ids),
+            max_concurrency=max_concurrency,
+            key=lambda request_id: request_id,
+        )
+
+    async def get_auth_deep_link(
+        self,
+        branch_id: str,
+        offer_id: str,
+        request_id: str,
+        return_link: Optional[str] = None,
+    ) -> AuthDeepLink:
+
+        request_id_hash = self._hash_request_id(request_id)
+
+        deep_link = await self.diia_api.get_deep_link(
+            branch_id=branch_id,
+            offer_id=offer_id,
+            request_id=request_id_hash,
+            return_link=return_link,
+        )
 
-        return SignaturePackage(
+        return AuthDeepLink(
+            deep_link=deep_link,
             request_id=request_id,
-            diia_id_action=diia_id_action,
-            signatures=signatures,
+            request_id_hash=request_id_hash,
         )
@@ -1,9 +1,130 @@
-from diia_client.sdk.service.base_service import BaseService
+from dataclasses import replace
+from typing import AsyncIterator, Hashable, Iterator, Optional, Sequence
+
+from diia_client.sdk.bulk import (
+    DEFAULT_BULK_CONCURRENCY,
+    BulkItemResult,
+    async_iter_bulk,
+    iter_bulk,
+)
+from diia_client.sdk.cache import CacheConfig, TTLCache
+from diia_client.sdk.model import ValidationResult
+from diia_client.sdk.remote.async_diia_api import AsyncDiiaApi
+from diia_client.sdk.remote.diia_api import DiiaApi
+from diia_client.sdk.remote.single_flight import AsyncSingleFlight, SingleFlight
+from diia_client.sdk.service.base_service import AsyncBaseService, BaseService
+
+
+def _make_cache(config: Optional[CacheConfig]) -> Optional[TTLCache]:
+    if config is None:
+        return None
+    # validity must not be returned after the TTL, errors aren't cached
+    return TTLCache(replace(config, stale_ttl=0), is_missing=lambda e: False)
+
+
+def _cache_key(branch_id: str, barcode: str) -> Hashable:
+    return branch_id, barcode
 
 
 class ValidationService(BaseService):
+    def __init__(
+        self, *, diia_api: DiiaApi, cache_config: Optional[CacheConfig] = None
+    ):
+        super().__init__(diia_api=diia_api)
+        self.cache = _make_cache(cache_config)
+        self._single_flight = SingleFlight()
+
     def validate_document_by_barcode(self, branch_id: str, barcode: str) -> bool:
+        return self.get_validation_result(branch_id, barcode).is_valid
+
+    def get_validation_result(self, branch_id: str, barcode: str) -> ValidationResult:
+        if self.cache is None:
+            return ValidationResult(
+                self._validate(branch_id, barcode), from_cache=False
+            )
+
+        key = _cache_key(branch_id, barcode)
+        loaded = False
+
+        def load() -> bool:
+            nonlocal loaded
+            loaded = True
+            # concurrent scans of the document share a request
+            return self._single_flight.do(
+                key, lambda: self._validate(branch_id, barcode)
+            )
+
+        is_valid = self.cache.get(key, load)
+        return ValidationResult(is_valid, from_cache=not loaded)
+
+    def _validate(self, branch_id: str, barcode: str) -> bool:
         return self.diia_api.validate_document_by_barcode(
             branch_id=branch_id,
             barcode=barcode,
         )
+
+    def validate_documents_by_barcode(
+        self,
+        branch_id: str,
+        barcodes: Sequence[str],
+        *,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> Iterator[BulkItemResult[str, bool]]:
+        return iter_bulk(
+            lambda barcode: self.validate_document_by_barcode(branch_id, barcode),
+            barcodes,
+            max_concurrency=max_concurrency,
+            key=lambda barcode: barcode,
+        )
+
+
+class AsyncValidationService(AsyncBaseService):
+    def __init__(
+        self, *, diia_api: AsyncDiiaApi, cache_config: Optional[CacheConfig] = None
+    ):
+        super().__init__(diia_api=diia_api)
+        self.cache = _make_cache(cache_config)
+        self._single_flight = AsyncSingleFlight()
+
+    async def validate_document_by_barcode(self, branch_id: str, barcode: str) -> bool:
+        return (await self.get_validation_result(branch_id, barcode)).is_valid
+
+    async def get_validation_result(
+        self, branch_id: str, barcode: str
+    ) -> ValidationResult:
+        if self.cache is None:
+            is_valid = await self._validate(branch_id, barcode)
+            return ValidationResult(is_valid, from_cache=False)
+
+        key = _cache_key(branch_id, barcode)
+        loaded = False
+
+        async def load() -> bool:
+            nonlocal loaded
+            loaded = True
+            return await self._single_flight.do(
+                key, lambda: self._validate(branch_id, barcode)
+            )
+
+        is_valid = await self.cache.async_get(key, load)
+        return ValidationResult(is_valid, from_cache=not loaded)
+
+    async def _validate(self, branch_id: str, barcode: str) -> bool:
+        return await self.diia_api.validate_document_by_barcode(
+            branch_id=branch_id,
+            barcode=barcode,
+        )
+
+    def validate_documents_by_barcode(
+        self,
+        branch_id: str,
+        barcodes: Sequence[str],
+        *,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> AsyncIterator[BulkItemResult[str, bool]]:
+        return async_iter_bulk(
+            lambda barcode: self.validate_document_by_barcode(branch_id, barcode),
+            barcodes,
+            max_concurrency=max_concurrency,
+            key=lambda barcode: barcode,
+        )
@@ -0,0 +1,112 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from diia_client.sdk.model import HashedFile, SignaturePackage
+
+
+class SigningCampaign:
+    """Files to be signed by many signers, each with their own request id.
+
+    The files are hashed once, when the campaign is started, and all deep
+    links of the campaign sign the same hashes. Signature packages decoded
+    by the Diia instance which started the campaign are recorded in it.
+    With `forget_when_complete` set, the campaign is forgotten by the
+    instance once the packages of all signers are recorded.
+    Thread-safe.
+    """
+
+    def __init__(
+        self,
+        *,
+        campaign_id: str,
+        branch_id: str,
+        offer_id: str,
+        hashed_files: Sequence[HashedFile],
+        request_ids: Iterable[str],
+        forget_when_complete: bool = False,
+    ) -> None:
+        self.campaign_id = campaign_id
+        self.branch_id = branch_id
+        self.offer_id = offer_id
+        self.hashed_files = list(hashed_files)
+        # repeated request ids are signed once
+        self.request_ids: Tuple[str, ...] = tuple(dict.fromkeys(request_ids))
+        self.forget_when_complete = forget_when_complete
+        self._packages: Dict[str, SignaturePackage] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"SigningCampaign(campaign_id={self.campaign_id!r}, "
+            f"signers={len(self.request_ids)}, received={len(self._packages)})"
+        )
+
+    def record(self, package: SignaturePackage) -> None:
+        """Record the signature package of a signer, the last one is kept.
+
+        Raises:
+            ValueError: If the request id isn't in the campaign.
+        """
+        if package.request_id not in self.request_ids:
+            raise ValueError(
+                f"Request id {package.request_id} isn't in campaign {self.campaign_id}"
+            )
+        with self._lock:
+            self._packages[package.request_id] = package
+
+    def get_package(self, request_id: str) -> Optional[SignaturePackage]:
+        with self._lock:
+            return self._packages.get(request_id)
+
+    def received(self) -> Dict[str, SignaturePackage]:
+        """Signature packages received so far, by request ids."""
+        with self._lock:
+            return dict(self._packages)
+
+    def pending(self) -> List[str]:
+        """Request ids without signature packages, in the campaign order."""
+        with self._lock:
+            return [r for r in self.request_ids if r not in self._packages]
+
+    def is_complete(self) -> bool:
+        with self._lock:
+            return len(self._packages) == len(self.request_ids)
+
+
+class SigningCampaignRegistry:
+    """Campaigns of a sign service, by request ids of their signers."""
+
+    def __init__(self) -> None:
+        self._campaigns: Dict[str, SigningCampaign] = {}
+        self._by_request_id: Dict[str, SigningCampaign] = {}
+        self._lock = threading.Lock()
+
+    def add(self, campaign: SigningCampaign) -> None:
+        """
+        Raises:
+            ValueError: If the campaign id or request ids are in other campaigns.
+        """
+        with self._lock:
+            if campaign.campaign_id in self._campaigns:
+                raise ValueError(f"Campaign {campaign.campaign_id} exists")
+            taken = [r for r in campaign.request_ids if r in self._by_request_id]
+            if taken:
+                raise ValueError(f"Request ids are in other campaigns: {taken}")
+            self._campaigns[campaign.campaign_id] = campaign
+            for request_id in campaign.request_ids:
+                self._by_request_id[request_id] = campaign
+
+    def remove(self, campaign_id: str) -> None:
+        with self._lock:
+            campaign = self._campaigns.pop(campaign_id, None)
+            if campaign is not None:
+                for request_id in campaign.request_ids:
+                    self._by_request_id.pop(request_id, None)
+
+    def get(self, campaign_id: str) -> Optional[SigningCampaign]:
+        with self._lock:
+            return self._campaigns.get(campaign_id)
+
+    def find(self, request_id: str) -> Optional[SigningCampaign]:
+        with self._lock:
+            return self._by_request_id.get(request_id)
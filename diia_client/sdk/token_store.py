@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
+
+from diia_client.sdk.file_lock import FileLock
+
+
+@dataclass
+class SessionToken:
+    token: str
+    obtain_time: float
+
+
+class AbstractTokenStore(ABC):
+    """Storage of session tokens shared by SessionTokenService instances.
+
+    Implement it on top of an external cache (e.g. Redis with SET NX
+    based locks) to share one session token between hosts.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[SessionToken]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, token: SessionToken) -> None:
+        """Save the token; called with the lock of the key held."""
+
+    @abstractmethod
+    def acquire_lock(self, key: str) -> None:
+        """Block until the exclusive right to obtain a token for the key is acquired."""
+
+    @abstractmethod
+    def release_lock(self, key: str) -> None:
+        ...
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        self.acquire_lock(key)
+        try:
+            yield
+        finally:
+            self.release_lock(key)
+
+
+class MemoryTokenStore(AbstractTokenStore):
+    """Process-local token store, shares a token between Diia instances."""
+
+    def __init__(self) -> None:
+        self._tokens: Dict[str, SessionToken] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[SessionToken]:
+        return self._tokens.get(key)
+
+    def set(self, key: str, token: SessionToken) -> None:
+        self._tokens[key] = token
+
+    def _get_lock(self, key: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def acquire_lock(self, key: str) -> None:
+        self._get_lock(key).acquire()
+
+    def release_lock(self, key: str) -> None:
+        self._get_lock(key).release()
+
+
+class FileTokenStore(AbstractTokenStore):
+    """Token store in a local file, shared by all processes of the host.
+
+    Lets N workers of gunicorn/uvicorn use one session token, and keeps
+    the token across restarts while it is valid. The file is readable
+    by the owner only and is replaced atomically, so readers never take
+    a lock; writers are serialized by a lock on a `.lock` sidecar file.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._lock_path = self.path.with_name(self.path.name + ".lock")
+        self._file_locks: Dict[str, FileLock] = {}
+
+    def _read(self) -> Dict[str, SessionToken]:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            return {key: SessionToken(**value) for key, value in data.items()}
+        except (OSError, ValueError, TypeError, AttributeError):
+            # a corrupt file is treated as empty and replaced by the next write
+            return {}
+
+    def get(self, key: str) -> Optional[SessionToken]:
+        return self._read().get(key)
+
+    def set(self, key: str, token: SessionToken) -> None:
+        # all keys share one lock file, so holding the lock of any key
+        # serializes all writers of the file
+        tokens = self._read()
+        tokens[key] = token
+        self._write(tokens)
+
+    def _write(self, tokens: Dict[str, SessionToken]) -> None:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}."
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({key: asdict(value) for key, value in tokens.items()}, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def acquire_lock(self, key: str) -> None:
+        file_lock = FileLock(self._lock_path)
+        file_lock.acquire()
+        self._file_locks[key] = file_lock
+
+    def release_lock(self, key: str) -> None:
+        self._file_locks.pop(key).release()
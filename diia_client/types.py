@@ -1,5 +1,7 @@
-from typing import Any, Dict
+import mmap
+from typing import Any, Dict, Union
 
 
 StrDict = Dict[str, str]
 DataDict = Dict[str, Any]
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
@@ -1,9 +1,9 @@
 import logging
 
-from diia_client import Diia
+from diia_client import AsyncDiia, CacheConfig
 from diia_client.crypto.uapki import UAPKICryptoService
 from diia_client.exceptions import DiiaClientException
-from diia_client.sdk.http.requests import RequestsHTTPClient
+from diia_client.sdk.http.httpx import HttpxAsyncHTTPClient
 from fastapi import FastAPI, Request, Response
 from fastapi.responses import JSONResponse
 
@@ -14,9 +14,9 @@ from app.routers import api, index, views
 logger = logging.getLogger(__name__)
 
 
-def make_diia_client(settings: Settings) -> Diia:
-
-    http_client = RequestsHTTPClient()
+def make_diia_client(
+    settings: Settings, http_client: HttpxAsyncHTTPClient
+) -> AsyncDiia:
     crypto_service = UAPKICryptoService(
         key=settings.key,
         password=settings.password,
@@ -27,11 +27,13 @@ def make_diia_client(settings: Settings) -> Diia:
         diia_issuer_certificate=settings.diia_issuer_certificate,
     )
 
-    return Diia(
+    return AsyncDiia(
         acquirer_token=settings.acquirer_token,
         diia_host=settings.host,
         http_client=http_client,
         crypto_service=crypto_service,
+        # branches and offers change only through this app
+        cache_config=CacheConfig(),
     )
 
 
@@ -44,7 +46,12 @@ def make_app(settings: Settings) -> FastAPI:
     )
     app.state.settings = settings
 
-    app.state.diia = make_diia_client(settings)
+    http_client = HttpxAsyncHTTPClient()
+    app.state.diia = make_diia_client(settings, http_client)
+
+    @app.on_event("shutdown")
+    async def close_http_client() -> None:
+        await http_client.close()
 
     app.state.documents_storage = {}
     app.state.signatures_storage = {}
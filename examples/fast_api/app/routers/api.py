@@ -6,7 +6,7 @@ import zipfile
 from typing import Dict, List, Optional
 
 from diia_client import (
-    Diia,
+    AsyncDiia,
     DocumentPackage,
     DocumentType,
     EncodedFile,
@@ -77,9 +77,9 @@ async def receiver_diia_action(
     encode_data = await get_encode_data(request)
 
     package = None
-    diia: Diia = request.app.state.diia
+    diia: AsyncDiia = request.app.state.diia
     try:
-        package = diia.decode_signature_package(
+        package = await diia.decode_signature_package(
             headers=dict(request.headers), encode_data=encode_data
         )
         logger.info(
@@ -135,9 +135,9 @@ async def receiver_shared_documents(
     )
 
     document_package = None
-    diia: Diia = request.app.state.diia
+    diia: AsyncDiia = request.app.state.diia
     try:
-        document_package = diia.decode_document_package(
+        document_package = await diia.decode_document_package(
             headers=dict(request.headers),
             encoded_files=encoded_files,
             encoded_json_data=encode_data,
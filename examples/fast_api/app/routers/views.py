@@ -4,7 +4,7 @@ import uuid
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from diia_client import Diia, DiiaIDAction, DocumentType, File
+from diia_client import AsyncDiia, DiiaIDAction, DocumentType, File
 from fastapi import APIRouter, Depends, Form, Request, Response, UploadFile
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
@@ -22,8 +22,8 @@ router = APIRouter(dependencies=[Depends(check_basic_auth)])
 async def branches_page(
     request: Request, skip: Optional[int] = None, limit: Optional[int] = None
 ) -> Response:
-    diia: Diia = request.app.state.diia
-    branches = diia.get_branches(skip=skip, limit=limit)
+    diia: AsyncDiia = request.app.state.diia
+    branches = await diia.get_branches(skip=skip, limit=limit)
     return templates.TemplateResponse(
         "branches.jinja2", {"request": request, "branches": branches}
     )
@@ -60,8 +60,8 @@ async def create_branch(
     custom_full_name: Optional[str] = Form(None, alias="customfullname"),
     custom_full_address: Optional[str] = Form(None, alias="customfulladdress"),
 ) -> str:
-    diia: Diia = request.app.state.diia
-    diia.create_branch(
+    diia: AsyncDiia = request.app.state.diia
+    await diia.create_branch(
         name=name,
         email=email,
         region=region,
@@ -84,8 +84,8 @@ async def create_branch(
     status_code=302,
 )
 async def delete_branch(request: Request, branch_id: str) -> str:
-    diia: Diia = request.app.state.diia
-    diia.delete_branch(branch_id)
+    diia: AsyncDiia = request.app.state.diia
+    await diia.delete_branch(branch_id)
     return request.url_for("branches_page")
 
 
@@ -96,8 +96,8 @@ async def offers_page(
     skip: Optional[int] = None,
     limit: Optional[int] = None,
 ) -> Response:
-    diia: Diia = request.app.state.diia
-    offers = diia.get_offers(branch_id=branch_id, skip=skip, limit=limit)
+    diia: AsyncDiia = request.app.state.diia
+    offers = await diia.get_offers(branch_id=branch_id, skip=skip, limit=limit)
     return templates.TemplateResponse(
         "offers.jinja2", {"request": request, "branch_id": branch_id, "offers": offers}
     )
@@ -108,8 +108,8 @@ async def offers_page(
     response_class=HTMLResponse,
 )
 async def create_offer_page(request: Request, branch_id: str) -> Response:
-    diia: Diia = request.app.state.diia
-    branch = diia.get_branch(branch_id)
+    diia: AsyncDiia = request.app.state.diia
+    branch = await diia.get_branch(branch_id)
     return templates.TemplateResponse(
         "create_offer.jinja2",
         {
@@ -134,8 +134,8 @@ async def create_offer(
     diia_id: Optional[List[DiiaIDAction]] = Form(None, alias="DiiaIDAction"),
     return_link: Optional[str] = Form(None, alias="returnLink"),
 ) -> str:
-    diia: Diia = request.app.state.diia
-    diia.create_offer(
+    diia: AsyncDiia = request.app.state.diia
+    await diia.create_offer(
         branch_id=branch_id,
         name=name,
         sharing=sharing,
@@ -151,8 +151,8 @@ async def create_offer(
     status_code=302,
 )
 async def delete_offer(request: Request, branch_id: str, offer_id: str) -> str:
-    diia: Diia = request.app.state.diia
-    diia.delete_offer(branch_id=branch_id, offer_id=offer_id)
+    diia: AsyncDiia = request.app.state.diia
+    await diia.delete_offer(branch_id=branch_id, offer_id=offer_id)
     return request.url_for("offers_page", branch_id=branch_id)
 
 
@@ -161,9 +161,9 @@ async def delete_offer(request: Request, branch_id: str, offer_id: str) -> str:
     response_class=HTMLResponse,
 )
 async def share_deeplink(request: Request, branch_id: str, offer_id: str) -> Response:
-    diia: Diia = request.app.state.diia
+    diia: AsyncDiia = request.app.state.diia
     request_id = str(uuid.uuid4())
-    deep_link = diia.get_deep_link(
+    deep_link = await diia.get_deep_link(
         branch_id=branch_id,
         offer_id=offer_id,
         request_id=request_id,
@@ -209,9 +209,9 @@ async def request_document_by_barcode_page(
 async def request_document_by_barcode(
     request: Request, branch_id: str, barcode: str = Form(...)
 ) -> Dict[str, str]:
-    diia: Diia = request.app.state.diia
+    diia: AsyncDiia = request.app.state.diia
     request_id = str(uuid.uuid4())
-    ok = diia.request_document_by_barcode(
+    ok = await diia.request_document_by_barcode(
         branch_id=branch_id,
         barcode=barcode,
         request_id=request_id,
@@ -226,8 +226,8 @@ async def request_document_by_barcode(
 async def validate_document_by_barcode(
     request: Request, branch_id: str, barcode: str = Form(...)
 ) -> Dict[str, bool]:
-    diia: Diia = request.app.state.diia
-    is_valid = diia.validate_document_by_barcode(
+    diia: AsyncDiia = request.app.state.diia
+    is_valid = await diia.validate_document_by_barcode(
         branch_id=branch_id,
         barcode=barcode,
     )
@@ -257,12 +257,12 @@ async def sign_deeplink(
     offer_id: str,
     file: UploadFile,
 ) -> Response:
-    diia: Diia = request.app.state.diia
+    diia: AsyncDiia = request.app.state.diia
     request_id = str(uuid.uuid4())
 
     file_data = await read_file_as_bytes(file)
 
-    deep_link = diia.get_sign_deep_link(
+    deep_link = await diia.get_sign_deep_link(
         branch_id=branch_id,
         offer_id=offer_id,
         request_id=request_id,
@@ -291,9 +291,9 @@ async def sign_deeplink(
     response_class=HTMLResponse,
 )
 async def auth_deeplink(request: Request, branch_id: str, offer_id: str) -> Response:
-    diia: Diia = request.app.state.diia
+    diia: AsyncDiia = request.app.state.diia
     request_id = str(uuid.uuid4())
-    auth_deep_link = diia.get_auth_deep_link(
+    auth_deep_link = await diia.get_auth_deep_link(
         branch_id=branch_id, offer_id=offer_id, request_id=request_id
     )
     qr_base64 = create_qr_code_b64(auth_deep_link.deep_link)
@@ -69,10 +69,13 @@ def main(*, mode: Mode, acquirer_token: str) -> None:
     )
 
     if mode == Mode.clear_branches:
-        branches = diia.get_branches()
-        for branch in branches.branches:
-            print(f"delete_branch:  {branch.id}")
-            diia.delete_branch(branch.id)
+        # collect ids first, deleting shifts the pages
+        branch_ids = [branch.id for branch in diia.iter_branches()]
+        for branch_id in branch_ids:
+            print(f"delete_branch:  {branch_id}")
+            result = diia.delete_branch_cascade(branch_id)
+            for item in result.failed:
+                print(f"  failed to delete {item.item}: {item.error}")
         print("### BranchList after deletion: ", diia.get_branches())
         exit()
 
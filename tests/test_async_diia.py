@@ -0,0 +1,319 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from diia_client.crypto.base_service import AbstractCryptoService
+from diia_client.exceptions import DiiaClientException
+from diia_client.sdk.async_diia import AsyncDiia
+from diia_client.sdk.diia import Diia
+from diia_client.sdk.http.base_client import (
+    DEFAULT_TIMEOUT,
+    AbstractAsyncHTTPClient,
+    AbstractHTTPCLient,
+    TimeoutValue,
+    get_status_code,
+)
+from diia_client.sdk.remote.async_diia_api import AsyncDiiaApi
+from diia_client.sdk.remote.retry import RetryPolicy
+from diia_client.sdk.service import session_token_service
+from diia_client.types import DataDict, StrDict
+
+
+HOST = "https://diia"
+AUTH_PATH = "/api/v1/auth/acquirer/acquirer"
+BRANCH_PATH = "/api/v2/acquirers/branch/b1"
+BRANCHES_PATH = "/api/v2/acquirers/branches"
+DEEP_LINK_PATH = "/api/v2/acquirers/branch/b1/offer-request/dynamic"
+BRANCH = {
+    "_id": "b1",
+    "name": "Branch",
+    "email": "branch@example.com",
+    "region": "Kyiv",
+    "district": "Kyiv",
+    "location": "Kyiv",
+    "street": "Street",
+    "house": "1",
+    "customFullName": "Branch",
+    "customFullAddress": "Kyiv, Street, 1",
+    "deliveryTypes": ["api"],
+    "offerRequestType": "dynamic",
+    "scopes": {"sharing": [], "identification": [], "documentIdentification": []},
+}
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(status_code)
+        self.response = SimpleNamespace(status_code=status_code, headers={})
+
+
+class FakeTransportError(Exception):
+    pass
+
+
+class FakeDiiaServer:
+    """Scripted responses of Diia by method and path; the last one repeats."""
+
+    def __init__(self, responses: Dict[Tuple[str, str], list]) -> None:
+        self.responses = responses
+        self.tokens = 0
+        # method, path, token and body of every call except auth
+        self.calls: List[Tuple[str, str, Optional[str], Optional[DataDict]]] = []
+
+    def handle(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[StrDict],
+        json: Optional[DataDict] = None,
+    ) -> DataDict:
+        path = url.replace(HOST, "", 1)
+        if path == AUTH_PATH:
+            self.tokens += 1
+            return {"token": f"t{self.tokens}"}
+        token = (headers or {})["Authorization"].split()[1]
+        self.calls.append((method, path, token, json))
+        responses = self.responses[method, path]
+        response = responses.pop(0) if len(responses) > 1 else responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class FakeHTTPClient(AbstractHTTPCLient):
+    transport_errors = (FakeTransportError,)
+
+    def __init__(self, server: FakeDiiaServer) -> None:
+        self.server = server
+
+    def get(
+        self,
+        url: str,
+        params: Optional[DataDict] = None,
+        headers: Optional[StrDict] = None,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
+    ) -> DataDict:
+        return self.server.handle("GET", url, headers)
+
+    def post(self, url, json, headers=None, **kwargs):  # type: ignore
+        return self.server.handle("POST", url, headers, json)
+
+    def put(self, url, json, headers=None, **kwargs):  # type: ignore
+        return self.server.handle("PUT", url, headers, json)
+
+    def delete(self, url, headers=None, **kwargs):  # type: ignore
+        self.server.handle("DELETE", url, headers)
+
+
+class FakeAsyncHTTPClient(AbstractAsyncHTTPClient):
+    transport_errors = (FakeTransportError,)
+
+    def __init__(self, server: FakeDiiaServer, delay: float = 0) -> None:
+        self.server = server
+        self.delay = delay
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[DataDict] = None,
+        headers: Optional[StrDict] = None,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
+    ) -> DataDict:
+        await asyncio.sleep(self.delay)
+        return self.server.handle("GET", url, headers)
+
+    async def post(self, url, json, headers=None, **kwargs):  # type: ignore
+        await asyncio.sleep(self.delay)
+        return self.server.handle("POST", url, headers, json)
+
+    async def put(self, url, json, headers=None, **kwargs):  # type: ignore
+        await asyncio.sleep(self.delay)
+        return self.server.handle("PUT", url, headers, json)
+
+    async def delete(self, url, headers=None, **kwargs):  # type: ignore
+        await asyncio.sleep(self.delay)
+        self.server.handle("DELETE", url, headers)
+
+
+class FakeCryptoService(AbstractCryptoService):
+    def decrypt(self, encrypted_data):
+        raise NotImplementedError
+
+    def calc_hash(self, data):
+        return data
+
+
+def make_api(server: FakeDiiaServer, delay: float = 0, **kwargs) -> AsyncDiiaApi:
+    return AsyncDiiaApi(
+        acquirer_token="acquirer",
+        diia_host=HOST,
+        http_client=FakeAsyncHTTPClient(server, delay),
+        **kwargs,
+    )
+
+
+def make_diia(server: FakeDiiaServer) -> Diia:
+    return Diia(
+        acquirer_token="acquirer",
+        diia_host=HOST,
+        http_client=FakeHTTPClient(server),
+        crypto_service=FakeCryptoService(),
+    )
+
+
+def make_async_diia(server: FakeDiiaServer) -> AsyncDiia:
+    return AsyncDiia(
+        acquirer_token="acquirer",
+        diia_host=HOST,
+        http_client=FakeAsyncHTTPClient(server),
+        crypto_service=FakeCryptoService(),
+    )
+
+
+def test_async_call_authorizes_and_coalesces_reads():
+    server = FakeDiiaServer({("GET", BRANCH_PATH): [BRANCH]})
+
+    async def run():
+        api = make_api(server, delay=0.05)
+        branches = await asyncio.gather(
+            api.get_branch_by_id("b1"), api.get_branch_by_id("b1")
+        )
+        await api.session_token_service.close()
+        return branches
+
+    first, second = asyncio.run(run())
+
+    assert first.id == second.id == "b1"
+    assert server.tokens == 1
+    assert server.calls == [("GET", BRANCH_PATH, "t1", None)]
+
+
+def test_async_call_replays_rejected_token_once(monkeypatch):
+    monkeypatch.setattr(session_token_service, "SESSION_TOKEN_INVALIDATION_COOLDOWN", 0)
+    server = FakeDiiaServer({("GET", BRANCH_PATH): [FakeHTTPError(401), BRANCH]})
+
+    async def run():
+        api = make_api(server)
+        branch = await api.get_branch_by_id("b1")
+        await api.session_token_service.close()
+        return branch
+
+    assert asyncio.run(run()).id == "b1"
+    assert [token for _, _, token, _ in server.calls] == ["t1", "t2"]
+    assert server.tokens == 2
+
+
+def test_async_call_retries_only_retryable_errors():
+    server = FakeDiiaServer(
+        {
+            ("GET", BRANCH_PATH): [FakeTransportError(), FakeHTTPError(503), BRANCH],
+            ("POST", "/api/v2/acquirers/branch"): [FakeHTTPError(503)],
+        }
+    )
+    policy = RetryPolicy(budget=None, backoff_base=0)
+
+    async def run():
+        api = make_api(server, retry_policy=policy)
+        branch = await api.get_branch_by_id("b1")
+        with pytest.raises(DiiaClientException):
+            await api.create_branch(branch)
+        await api.session_token_service.close()
+        return branch
+
+    assert asyncio.run(run()).id == "b1"
+    assert [method for method, *_ in server.calls] == ["GET"] * 3 + ["POST"]
+
+
+def test_async_diia_matches_diia():
+    def make_server():
+        return FakeDiiaServer(
+            {
+                ("GET", BRANCHES_PATH): [{"total": 1, "branches": [BRANCH]}],
+                ("POST", "/api/v1/acquirers/document-identification"): [
+                    {"success": True}
+                ],
+                ("POST", DEEP_LINK_PATH): [{"deeplink": "link"}],
+            }
+        )
+
+    def call_sync(server):
+        with make_diia(server) as diia:
+            branches = diia.get_branches()
+            valid = diia.validate_document_by_barcode(branch_id="b1", barcode="123")
+            link = diia.get_auth_deep_link(
+                branch_id="b1", offer_id="o1", request_id="r1"
+            )
+        return branches, valid, link
+
+    async def call_async(server):
+        async with make_async_diia(server) as diia:
+            branches = await diia.get_branches()
+            valid = await diia.validate_document_by_barcode(
+                branch_id="b1", barcode="123"
+            )
+            link = await diia.get_auth_deep_link(
+                branch_id="b1", offer_id="o1", request_id="r1"
+            )
+        return branches, valid, link
+
+    sync_server = make_server()
+    async_server = make_server()
+
+    assert call_sync(sync_server) == asyncio.run(call_async(async_server))
+    assert sync_server.calls == async_server.calls
+
+
+def test_close_stops_deep_link_pools_and_token_refresh():
+    server = FakeDiiaServer({("POST", DEEP_LINK_PATH): [{"deeplink": "link"}]})
+
+    with make_diia(server) as diia:
+        pool = diia.auth_deep_link_pool(branch_id="b1", offer_id="o1")
+        assert pool.wait(1, timeout=5)
+    token_service = diia._diia_api.session_token_service
+
+    assert len(pool) == 0
+    assert pool._thread is not None
+    pool._thread.join(5)
+    assert not pool._thread.is_alive()
+    assert token_service._timer is None
+
+    async def run():
+        async with make_async_diia(server) as diia:
+            pool = diia.deep_link_pool(branch_id="b1", offer_id="o1")
+            assert await pool.wait(1, timeout=5)
+        return pool, diia._diia_api.session_token_service
+
+    pool, token_service = asyncio.run(run())
+
+    assert len(pool) == 0
+    assert pool._task is not None and pool._task.done()
+    assert token_service._refresh_task is None
+
+
+def test_httpx_client_keeps_status_code_of_errors():
+    httpx = pytest.importorskip("httpx")
+    from diia_client.sdk.http.httpx import HttpxAsyncHTTPClient
+
+    def handler(request):
+        if request.url.path == "/missing":
+            return httpx.Response(404, json={"error": "not found"})
+        return httpx.Response(200, json={"echo": json.loads(request.content)})
+
+    async def run():
+        transport = httpx.MockTransport(handler)
+        async with HttpxAsyncHTTPClient(
+            client=httpx.AsyncClient(transport=transport)
+        ) as client:
+            result = await client.post(f"{HOST}/echo", json={"a": 1})
+            with pytest.raises(httpx.HTTPStatusError) as e:
+                await client.get(f"{HOST}/missing")
+        return result, e.value
+
+    result, error = asyncio.run(run())
+
+    assert result == {"echo": {"a": 1}}
+    assert get_status_code(error) == 404
+    assert "not found" in str(error)
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+
+from diia_client.sdk.model import DocumentRequest
+from diia_client.sdk.service.sharing_service import AsyncSharingService, SharingService
+from diia_client.sdk.service.validation_service import (
+    AsyncValidationService,
+    ValidationService,
+)
+
+
+class FakeDiiaApi:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _call(self, call):
+        with self.lock:
+            self.calls.append(call)
+        if "bad" in call:
+            raise ValueError(call)
+        return True
+
+    def validate_document_by_barcode(self, *, branch_id, barcode):
+        return self._call(("validate", branch_id, barcode))
+
+    def request_document_by_barcode(self, *, branch_id, barcode, request_id):
+        return self._call(("barcode", branch_id, barcode, request_id))
+
+    def request_document_by_qrcode(self, *, branch_id, qrcode, request_id):
+        return self._call(("qrcode", branch_id, qrcode, request_id))
+
+
+class AsyncFakeDiiaApi(FakeDiiaApi):
+    async def validate_document_by_barcode(self, **kwargs):
+        await asyncio.sleep(0)
+        return super().validate_document_by_barcode(**kwargs)
+
+    async def request_document_by_barcode(self, **kwargs):
+        await asyncio.sleep(0)
+        return super().request_document_by_barcode(**kwargs)
+
+    async def request_document_by_qrcode(self, **kwargs):
+        await asyncio.sleep(0)
+        return super().request_document_by_qrcode(**kwargs)
+
+
+BARCODES = ["1", "2", "1", "bad"]
+
+REQUESTS = [
+    DocumentRequest(request_id="r1", barcode="1"),
+    DocumentRequest(request_id="r2", barcode="1"),
+    DocumentRequest(request_id="r1", barcode="1"),
+    DocumentRequest(request_id="r3", qrcode="q"),
+    DocumentRequest(request_id="r4", qrcode="bad"),
+]
+
+
+def summarize(results):
+    return sorted(
+        (repr(result.item), result.ok, result.duration is not None)
+        for result in results
+    )
+
+
+def expected(items):
+    return sorted((repr(item), "bad" not in repr(item), True) for item in items)
+
+
+def test_validate_documents_by_barcode_once_per_barcode():
+    diia_api = FakeDiiaApi()
+    service = ValidationService(diia_api=diia_api)
+
+    results = list(service.validate_documents_by_barcode("b1", BARCODES))
+
+    assert summarize(results) == expected(BARCODES)
+    assert sorted(diia_api.calls) == [
+        ("validate", "b1", "1"),
+        ("validate", "b1", "2"),
+        ("validate", "b1", "bad"),
+    ]
+
+
+def test_request_documents_once_per_request_id():
+    diia_api = FakeDiiaApi()
+    service = SharingService(diia_api=diia_api)
+
+    results = list(service.request_documents("b1", REQUESTS))
+
+    assert summarize(results) == expected(REQUESTS)
+    assert sorted(diia_api.calls) == [
+        ("barcode", "b1", "1", "r1"),
+        ("barcode", "b1", "1", "r2"),
+        ("qrcode", "b1", "bad", "r4"),
+        ("qrcode", "b1", "q", "r3"),
+    ]
+
+
+def test_async_batches_match_sync():
+    diia_api = AsyncFakeDiiaApi()
+    validation_service = AsyncValidationService(diia_api=diia_api)
+    sharing_service = AsyncSharingService(diia_api=diia_api)
+
+    async def collect(results):
+        return [result async for result in results]
+
+    async def run():
+        validated = await collect(
+            validation_service.validate_documents_by_barcode(
+                "b1", BARCODES, max_concurrency=2
+            )
+        )
+        requested = await collect(
+            sharing_service.request_documents("b1", REQUESTS, max_concurrency=2)
+        )
+        return validated, requested
+
+    validated, requested = asyncio.run(run())
+
+    assert summarize(validated) == expected(BARCODES)
+    assert summarize(requested) == expected(REQUESTS)
+    assert len(diia_api.calls) == 3 + 4
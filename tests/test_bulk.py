@@ -0,0 +1,114 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from diia_client.exceptions import DiiaClientException
+from diia_client.sdk.bulk import async_iter_bulk, async_run_bulk, iter_bulk, run_bulk
+from diia_client.sdk.service.bulk_service import AsyncBulkService, BulkService
+
+
+def double(item):
+    if item == 3:
+        raise ValueError(item)
+    return item * 2
+
+
+def test_run_bulk():
+    result = run_bulk(
+        double, [1, 2, 3, 4], max_concurrency=2, done=lambda i: i == 2 and 4 or None
+    )
+
+    assert [item.result for item in result.items] == [2, 4, None, 8]
+    assert [item.skipped for item in result.items] == [False, True, False, False]
+    assert not result.ok
+    assert result.failed_items() == [3]
+
+
+def test_async_run_bulk():
+    async def async_double(item):
+        await asyncio.sleep(0)
+        return double(item)
+
+    result = asyncio.run(async_run_bulk(async_double, [1, 2, 3], max_concurrency=2))
+
+    assert [item.result for item in result.items] == [2, 4, None]
+    assert isinstance(result.failed[0].error, ValueError)
+
+
+def test_iter_bulk_yields_as_completed_once_per_key():
+    calls = []
+
+    def slow_double(item):
+        calls.append(item)
+        time.sleep(0.1 if item == 1 else 0)
+        return double(item)
+
+    results = list(iter_bulk(slow_double, [1, 2, 2, 3], key=lambda i: i))
+
+    assert sorted(calls) == [1, 2, 3]
+    assert sorted(item.item for item in results[:3]) == [2, 2, 3]
+    assert results[-1].item == 1
+    assert results[-1].duration >= 0.1
+
+
+def test_async_iter_bulk():
+    async def collect():
+        return [
+            item
+            async for item in async_iter_bulk(
+                lambda item: asyncio.sleep(0, item), ["a", "b", "a"], key=lambda i: i
+            )
+        ]
+
+    results = asyncio.run(collect())
+
+    assert sorted(item.item for item in results) == ["a", "a", "b"]
+    assert all(item.duration is not None for item in results)
+
+
+def test_bulk_rejects_invalid_concurrency():
+    with pytest.raises(ValueError, match="max_concurrency"):
+        run_bulk(double, [1], max_concurrency=0)
+    with pytest.raises(ValueError, match="max_concurrency"):
+        iter_bulk(double, [1], max_concurrency=0)
+    with pytest.raises(ValueError, match="max_concurrency"):
+        async_iter_bulk(double, [1], max_concurrency=-1)
+    with pytest.raises(ValueError, match="max_concurrency"):
+        asyncio.run(async_run_bulk(double, [1], max_concurrency=0))
+
+
+class FakeNotFound(Exception):
+    def __init__(self):
+        super().__init__()
+        self.response = SimpleNamespace(status_code=404)
+
+
+class DeletedBranchOfferService:
+    def iter_offers(self, *, branch_id):
+        raise DiiaClientException("Get offers error", FakeNotFound())
+
+
+class AsyncDeletedBranchOfferService:
+    async def iter_offers(self, *, branch_id):
+        raise DiiaClientException("Get offers error", FakeNotFound())
+        yield
+
+
+def test_delete_branch_cascade_of_deleted_branch_is_done():
+    service = BulkService(
+        branch_service=None, offer_service=DeletedBranchOfferService()
+    )
+    async_service = AsyncBulkService(
+        branch_service=None, offer_service=AsyncDeletedBranchOfferService()
+    )
+
+    results = [
+        service.delete_branch_cascade("b1"),
+        asyncio.run(async_service.delete_branch_cascade("b1")),
+    ]
+
+    for result in results:
+        assert result.ok
+        assert [(item.item, item.skipped) for item in result.items] == [("b1", True)]
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from diia_client.exceptions import DiiaClientException
+from diia_client.sdk.cache import CacheConfig, TTLCache
+
+
+class FakeNotFound(Exception):
+    def __init__(self):
+        super().__init__()
+        self.response = type("Response", (), {"status_code": 404})()
+
+
+def test_cache_hits_and_invalidation():
+    cache = TTLCache(CacheConfig(max_size=2))
+    loads = []
+
+    def load(value):
+        loads.append(value)
+        return value
+
+    assert cache.get("a", lambda: load(1)) == 1
+    assert cache.get("a", lambda: load(2)) == 1
+    cache.invalidate("a")
+    assert cache.get("a", lambda: load(3)) == 3
+    cache.get("b", lambda: load(4))
+    cache.get("c", lambda: load(5))
+
+    assert loads == [1, 3, 4, 5]
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions) == (1, 4, 1)
+
+
+def test_cache_remembers_missing_keys():
+    cache = TTLCache()
+
+    def load():
+        raise DiiaClientException("Get branch error", FakeNotFound())
+
+    with pytest.raises(DiiaClientException):
+        cache.get("missing", load)
+    with pytest.raises(DiiaClientException):
+        cache.get("missing", lambda: pytest.fail("missing key loaded again"))
+    assert cache.stats().negative_hits == 1
+
+
+def test_cache_returns_stale_value_while_revalidating():
+    cache = TTLCache(CacheConfig(ttl=0, stale_ttl=60))
+    cache.get("a", lambda: 1)
+
+    assert cache.get("a", lambda: 2) == 1
+    for _ in range(100):
+        if cache.stats().stale_hits and cache.get("a", lambda: 3) == 2:
+            break
+        time.sleep(0.01)
+    else:
+        pytest.fail("stale value wasn't revalidated")
+
+
+def test_invalidation_discards_loads_of_its_key_only():
+    cache = TTLCache()
+
+    def load_invalidating(key, value):
+        def load():
+            cache.invalidate(key)
+            return value
+
+        return load
+
+    assert cache.get("a", load_invalidating("b", 1)) == 1
+    assert cache.get("b", load_invalidating("b", 2)) == 2
+
+    assert cache.get("a", lambda: 3) == 1
+    assert cache.get("b", lambda: 4) == 4
@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+from diia_client.enums import CircuitState, EndpointFamily
+from diia_client.exceptions import CircuitOpenError
+from diia_client.sdk.remote.circuit_breaker import CircuitBreaker, CircuitBreakerConfig
+
+
+def make_breaker(changes: list) -> CircuitBreaker:
+    config = CircuitBreakerConfig(
+        window_size=4,
+        minimum_calls=4,
+        open_duration=0.1,
+        half_open_calls=2,
+        on_state_change=lambda *change: changes.append(change[1:]),
+    )
+    return CircuitBreaker(EndpointFamily.BRANCHES, config)
+
+
+def call(breaker: CircuitBreaker, failed: bool, duration: float = 0) -> None:
+    breaker.before_call()
+    breaker.after_call(duration, failed=failed)
+
+
+def test_circuit_breaker_opens_and_recovers():
+    changes: list = []
+    breaker = make_breaker(changes)
+
+    for failed in [False, True, False, True]:
+        call(breaker, failed)
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.1)
+    call(breaker, failed=False)
+    assert breaker.state == CircuitState.HALF_OPEN
+    call(breaker, failed=False)
+
+    assert changes == [
+        (CircuitState.CLOSED, CircuitState.OPEN),
+        (CircuitState.OPEN, CircuitState.HALF_OPEN),
+        (CircuitState.HALF_OPEN, CircuitState.CLOSED),
+    ]
+
+
+def test_circuit_breaker_opens_on_slow_calls():
+    breaker = make_breaker([])
+
+    for _ in range(4):
+        call(breaker, failed=False, duration=10)
+
+    assert breaker.state == CircuitState.OPEN
@@ -0,0 +1,32 @@
+import json
+from pathlib import Path
+
+from diia_client import codec
+
+
+DATA_PATH = Path(__file__).parent / "data"
+
+
+def test_codec_matches_stdlib_json():
+    for path in DATA_PATH.glob("*.json"):
+        data = path.read_bytes()
+        assert codec.loads(data) == json.loads(data)
+
+    obj = {"name": "Назва відділення", "scopes": {"sharing": ["passport"]}}
+    assert json.loads(codec.dumps(obj).decode()) == obj
+
+
+def test_set_json_codec(monkeypatch):
+    calls = []
+
+    def loads(data):
+        calls.append(data)
+        return json.loads(data)
+
+    monkeypatch.setattr(codec, "_loads", codec._loads)
+    monkeypatch.setattr(codec, "_dumps", codec._dumps)
+    codec.set_json_codec(loads, codec._dumps)
+
+    assert codec.loads(b'{"a": 1}') == {"a": 1}
+    assert calls == [b'{"a": 1}']
+    assert json.loads(codec.dumps({"a": 1})) == {"a": 1}
@@ -0,0 +1,41 @@
+import base64
+import os
+
+import pytest
+
+from diia_client.crypto.base_service import AbstractCryptoService
+from diia_client.crypto.pool import ProcessPoolCryptoService
+from diia_client.exceptions import DiiaClientException
+
+
+class FakeCryptoService(AbstractCryptoService):
+    def decrypt(self, encrypted_data):
+        return base64.b64encode(
+            f"{encrypted_data[::-1]}:{os.getpid()}".encode()
+        ).decode()
+
+    def calc_hash(self, data):
+        return base64.b64encode(base64.b64decode(data).upper()).decode()
+
+
+class BrokenCryptoService(FakeCryptoService):
+    def __init__(self):
+        raise DiiaClientException("Init uapki error")
+
+
+def test_pool_decrypts_in_workers_in_order():
+    with ProcessPoolCryptoService(FakeCryptoService, workers=2, max_pending=3) as pool:
+        results = pool.decrypt_many([f"data{i}" for i in range(10)])
+
+        assert [r.split(b":")[0] for r in results] == [
+            f"{i}atad".encode() for i in range(10)
+        ]
+        assert str(os.getpid()).encode() not in {r.split(b":")[1] for r in results}
+        assert pool.calc_hash("YWJj") == "QUJD"
+        assert pool.decrypt_bytes("data").startswith(b"atad:")
+        assert pool.calc_hashes([b"a", memoryview(b"b")]) == [b"A", b"B"]
+
+
+def test_pool_fails_fast_if_service_cant_be_made():
+    with pytest.raises(DiiaClientException):
+        ProcessPoolCryptoService(BrokenCryptoService, workers=1)
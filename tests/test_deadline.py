@@ -0,0 +1,25 @@
+import pytest
+
+from diia_client.exceptions import DeadlineExceeded
+from diia_client.sdk.deadline import clamp_timeout, deadline, get_remaining_time
+from diia_client.sdk.http.base_client import Timeout
+
+
+def test_deadline_clamps_timeouts():
+    assert get_remaining_time() is None
+    assert clamp_timeout(15) == 15
+
+    with deadline(10):
+        with deadline(60):
+            assert clamp_timeout(15) <= 10
+            timeout = clamp_timeout(Timeout(connect=1, read=15))
+            assert timeout.connect == 1
+            assert timeout.read <= 10
+
+    assert get_remaining_time() is None
+
+
+def test_deadline_exceeded():
+    with deadline(0):
+        with pytest.raises(DeadlineExceeded):
+            clamp_timeout(15)
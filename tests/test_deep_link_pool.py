@@ -0,0 +1,50 @@
+import asyncio
+import itertools
+
+from diia_client.sdk.deep_link_pool import (
+    AsyncDeepLinkPool,
+    DeepLinkPool,
+    DeepLinkPoolConfig,
+)
+
+
+def test_pool_hands_out_minted_links_and_refills():
+    counter = itertools.count()
+    config = DeepLinkPoolConfig(min_size=2, max_size=5, lead_time=60, max_concurrency=1)
+    pool = DeepLinkPool(
+        lambda request_id: f"link/{request_id}",
+        config,
+        request_id_factory=lambda: f"r{next(counter)}",
+    )
+
+    with pool:
+        assert pool.wait(2, timeout=5)
+        links = [pool.get(), pool.get()]
+        assert pool.wait(2, timeout=5)
+        links.append(pool.get())
+        # demand of 3 links a minute needs 3 links ready
+        assert pool.wait(3, timeout=5)
+
+        assert links == ["link/r0", "link/r1", "link/r2"]
+        stats = pool.stats()
+        assert (stats.hits, stats.misses) == (3, 0)
+        assert stats.minted == 3 + len(pool) == 6
+
+
+def test_pool_drops_expired_links():
+    config = DeepLinkPoolConfig(min_size=1, link_ttl=0.2, min_remaining_ttl=0.1)
+
+    async def run():
+        async def mint(request_id):
+            return request_id
+
+        async with AsyncDeepLinkPool(mint, config) as pool:
+            assert await pool.wait(1, timeout=5)
+            await asyncio.sleep(0.35)
+            await pool.get()
+            return pool.stats()
+
+    stats = asyncio.run(run())
+
+    assert stats.expired >= 2
+    assert stats.hits == 1
@@ -0,0 +1,56 @@
+import base64
+import hashlib
+import io
+import mmap
+
+from diia_client.crypto.base_service import AbstractCryptoService
+from diia_client.sdk.model import File, PathFile, StreamFile, file
+from diia_client.sdk.service.sign_service import BaseSignService
+
+
+class FakeCryptoService(AbstractCryptoService):
+    def decrypt(self, encrypted_data):
+        raise NotImplementedError
+
+    def calc_hash(self, data):
+        return base64.b64encode(
+            hashlib.sha256(base64.b64decode(data)).digest()
+        ).decode()
+
+
+def test_files_are_hashed_in_order(monkeypatch, tmp_path):
+    monkeypatch.setattr(file, "CHUNK_SIZE", 4)
+    data = b"contract data"
+    expected = base64.b64encode(hashlib.sha256(data).digest()).decode()
+    path = tmp_path / "contract.pdf"
+    path.write_bytes(data)
+    service = BaseSignService(crypto_service=FakeCryptoService())
+
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        hashed_files = service._hash_files(
+            [
+                PathFile("a.pdf", path),
+                File("b.pdf", data),
+                StreamFile("c.pdf", io.BytesIO(data)),
+                File("d.pdf", m),
+                File("e.pdf", b"other"),
+            ]
+        )
+
+    assert [f.filename for f in hashed_files] == [
+        "a.pdf",
+        "b.pdf",
+        "c.pdf",
+        "d.pdf",
+        "e.pdf",
+    ]
+    assert [f.filehash for f in hashed_files[:4]] == [expected] * 4
+    assert hashed_files[4].filehash != expected
+
+
+def test_path_file_is_read_by_chunks(monkeypatch, tmp_path):
+    monkeypatch.setattr(file, "CHUNK_SIZE", 4)
+    path = tmp_path / "data"
+    path.write_bytes(b"0123456789")
+
+    assert list(PathFile("data", path).iter_chunks()) == [b"0123", b"4567", b"89"]
@@ -0,0 +1,111 @@
+import base64
+import hashlib
+import io
+import os
+import stat
+
+import pytest
+
+from diia_client.crypto.base_service import AbstractCryptoService
+from diia_client.sdk.hash_cache import HashCache, HashCacheConfig
+from diia_client.sdk.model import File, PathFile, StreamFile
+from diia_client.sdk.service.sign_service import BaseSignService
+
+
+class CountingCryptoService(AbstractCryptoService):
+    def __init__(self):
+        self.calls = 0
+
+    def decrypt(self, encrypted_data):
+        raise NotImplementedError
+
+    def calc_hash(self, data):
+        self.calls += 1
+        return base64.b64encode(
+            hashlib.sha256(base64.b64decode(data)).digest()
+        ).decode()
+
+
+class CountingStream(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def test_hashes_of_same_content_are_reused(tmp_path):
+    path = tmp_path / "contract.pdf"
+    path.write_bytes(b"contract")
+    crypto_service = CountingCryptoService()
+    service = BaseSignService(
+        crypto_service=crypto_service, hash_cache_config=HashCacheConfig()
+    )
+    stream = CountingStream(b"contract")
+
+    first = service._hash_files([File("a.pdf", b"contract"), File("b.pdf", b"other")])
+    # streamed files are hashed and fingerprinted in one pass
+    second = service._hash_files(
+        [
+            PathFile("c.pdf", path),
+            StreamFile("d.pdf", stream),
+            File("e.pdf", bytearray(b"other")),
+        ]
+    )
+    assert crypto_service.calls == 4
+    assert stream.bytes_read == len(b"contract")
+    # an unchanged file on disk is looked up without reading it
+    third = service._hash_files([PathFile("f.pdf", path)])
+
+    expected = [first[0].filehash] * 2 + [first[1].filehash] + [first[0].filehash]
+    assert [f.filehash for f in second + third] == expected
+    assert crypto_service.calls == 4
+    assert service.hash_cache.stats().hits == 2
+
+
+def test_cache_is_bounded_and_saved_on_close(tmp_path):
+    path = tmp_path / "hashes.json"
+    config = HashCacheConfig(max_size=2, path=path, save_interval=3600)
+    cache = HashCache(config)
+    for key in ["a", "b", "c"]:
+        cache.set(key, key.encode())
+    cache.get("b")
+    cache.set("d", b"d")
+
+    assert not path.exists()
+    cache.close()
+    loaded = HashCache(config)
+
+    assert [loaded.get(key) for key in ["a", "b", "c", "d"]] == [None, b"b", None, b"d"]
+    assert cache.stats().evictions == 2
+
+
+def test_processes_sharing_file_merge_hashes(tmp_path):
+    config = HashCacheConfig(path=tmp_path / "hashes.json", save_interval=0)
+    first = HashCache(config)
+    second = HashCache(config)
+
+    first.set("a", b"a")
+    second.set("b", b"b")
+    loaded = HashCache(config)
+
+    assert [loaded.get(key) for key in ["a", "b"]] == [b"a", b"b"]
+    # a save also picks up the hashes saved by others
+    assert first.get("b") is None
+    first.set("c", b"c")
+    assert first.get("b") == b"b"
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+def test_cache_file_is_private(tmp_path):
+    path = tmp_path / "cache" / "hashes.json"
+    cache = HashCache(HashCacheConfig(path=path, save_interval=0))
+
+    cache.set("a", b"a")
+
+    assert stat.S_IMODE(path.parent.stat().st_mode) == 0o700
+    for file in path.parent.iterdir():
+        assert stat.S_IMODE(file.stat().st_mode) == 0o600
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+
+import pytest
+
+from diia_client.enums import DiiaIDAction, DocumentType
+from diia_client.exceptions import DiiaClientException
+from diia_client.sdk.offer_registry import OfferRegistry
+from diia_client.sdk.remote.model import OfferList
+from diia_client.sdk.service.offer_service import (
+    AsyncOfferService,
+    OfferService,
+    make_offer,
+)
+
+
+def offer(offer_id, name, sharing=None, diia_id=None):
+    result = make_offer(name, sharing=sharing, diia_id=diia_id)
+    result.id = offer_id
+    return result
+
+
+def test_registry_finds_offer_with_fewest_extra_scopes():
+    registry = OfferRegistry()
+    registry.set_offers(
+        "b",
+        [
+            offer(
+                "1", "auth and passport", [DocumentType.PASSPORT], [DiiaIDAction.AUTH]
+            ),
+            offer("2", "auth", diia_id=[DiiaIDAction.AUTH]),
+            offer("3", "sign", diia_id=[DiiaIDAction.HASHED_FILES_SIGNING]),
+        ],
+    )
+
+    assert registry.find("b", diia_id=[DiiaIDAction.AUTH]).id == "2"
+    assert registry.find("b", sharing=[DocumentType.PASSPORT]).id == "1"
+    assert registry.find("b", sharing=[DocumentType.TAXPAYER_CARD]) is None
+    assert registry.find("other", diia_id=[DiiaIDAction.AUTH]) is None
+
+    registry.remove("b", "2")
+    assert registry.find("b", diia_id=[DiiaIDAction.AUTH]).id == "1"
+
+    # offers fetched before a change are outdated
+    generation = registry.generation()
+    registry.add("b", offer("4", "auth", diia_id=[DiiaIDAction.AUTH]))
+    registry.set_offers("b", [], generation)
+    assert registry.find("b", diia_id=[DiiaIDAction.AUTH]).id == "4"
+
+
+class FakeDiiaApi:
+    def __init__(self):
+        self.offers = []
+        self.skips = []
+
+    def get_offers(self, *, branch_id, skip=None, limit=None):
+        self.skips.append(skip)
+        end = skip + limit
+        return OfferList(total=len(self.offers), offers=self.offers[skip:end])
+
+    def create_offer(self, *, branch_id, offer):
+        self.offers.append(offer.copy(update={"id": str(len(self.offers))}))
+        return self.offers[-1].id
+
+
+def test_get_or_create_offer():
+    diia_api = FakeDiiaApi()
+    service = OfferService(diia_api=diia_api)
+
+    created = service.get_or_create_offer(
+        branch_id="b", name="sign", diia_id=[DiiaIDAction.HASHED_FILES_SIGNING]
+    )
+    found = service.get_or_create_offer(
+        branch_id="b", name="sign", diia_id=[DiiaIDAction.HASHED_FILES_SIGNING]
+    )
+
+    assert found.id == created.id
+    assert len(diia_api.offers) == 1
+
+
+class AsyncFakeDiiaApi(FakeDiiaApi):
+    async def get_offers(self, **kwargs):
+        return super().get_offers(**kwargs)
+
+
+def test_get_offer_stops_at_its_page():
+    diia_api = FakeDiiaApi()
+    diia_api.offers = [offer(str(i), f"offer {i}") for i in range(1000)]
+    service = OfferService(diia_api=diia_api)
+
+    assert service.get_offer(branch_id="b", offer_id="5").name == "offer 5"
+    assert len(diia_api.skips) <= 2
+    with pytest.raises(DiiaClientException):
+        service.get_offer(branch_id="b", offer_id="missing")
+
+    async_api = AsyncFakeDiiaApi()
+    async_api.offers = diia_api.offers
+    async_service = AsyncOfferService(diia_api=async_api)
+
+    found = asyncio.run(async_service.get_offer(branch_id="b", offer_id="5"))
+    assert found.name == "offer 5"
+    assert len(async_api.skips) <= 2
+
+
+def test_get_or_create_offer_doesnt_block_other_branches():
+    creating = threading.Event()
+    created = threading.Event()
+    waited = []
+
+    class SlowDiiaApi(FakeDiiaApi):
+        def create_offer(self, *, branch_id, offer):
+            if branch_id == "slow":
+                creating.set()
+                # waits for the offer of the other branch
+                waited.append(created.wait(5))
+            else:
+                created.set()
+            return super().create_offer(branch_id=branch_id, offer=offer)
+
+    service = OfferService(diia_api=SlowDiiaApi())
+
+    def create(branch_id):
+        service.get_or_create_offer(
+            branch_id=branch_id, name="auth", diia_id=[DiiaIDAction.AUTH]
+        )
+
+    slow = threading.Thread(target=create, args=("slow",))
+    slow.start()
+    assert creating.wait(5)
+    create("fast")
+    slow.join(5)
+
+    assert waited == [True]
@@ -0,0 +1,28 @@
+import asyncio
+
+from diia_client.sdk.pagination import async_iter_pages, iter_pages
+
+
+ITEMS = list(range(1234))
+# Diia may return less items than requested
+SERVER_MAX_LIMIT = 150
+
+
+def fetch(skip, limit):
+    end = skip + min(limit, SERVER_MAX_LIMIT)
+    return len(ITEMS), ITEMS[skip:end]
+
+
+def test_iter_pages():
+    assert list(iter_pages(fetch, page_size=100, prefetch=3)) == ITEMS
+
+
+def test_async_iter_pages():
+    async def async_fetch(skip, limit):
+        await asyncio.sleep(0)
+        return fetch(skip, limit)
+
+    async def main():
+        return [item async for item in async_iter_pages(async_fetch, page_size=100)]
+
+    assert asyncio.run(main()) == ITEMS
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+import pytest
+
+from diia_client.enums import EndpointFamily
+from diia_client.exceptions import RateLimitExceeded
+from diia_client.sdk.remote.rate_limiter import (
+    FileTokenBucket,
+    RateLimit,
+    RateLimiter,
+    TokenBucket,
+)
+
+
+def test_token_bucket_reserves_tokens_in_order():
+    bucket = TokenBucket(RateLimit(rate=10, burst=2))
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve(max_wait=0) is None
+    # waiting requests queue up for the future tokens
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_rate_limit_rejects_non_positive_rate():
+    for rate in (0, -1):
+        with pytest.raises(ValueError, match="Rate"):
+            RateLimit(rate=rate)
+
+
+def test_file_token_bucket_shares_quota(tmp_path):
+    limit = RateLimit(rate=1, burst=2)
+    workers = [FileTokenBucket(tmp_path / "bucket.json", limit) for _ in range(2)]
+
+    assert workers[0].reserve(max_wait=0) == 0
+    assert workers[1].reserve(max_wait=0) == 0
+    assert workers[0].reserve(max_wait=0) is None
+    assert workers[1].reserve(max_wait=0) is None
+
+
+def test_rate_limiter_fails_fast():
+    rate_limiter = RateLimiter(
+        {EndpointFamily.OFFER_REQUEST: RateLimit(rate=1)}, block=False
+    )
+
+    rate_limiter.acquire(EndpointFamily.OFFER_REQUEST)
+    with pytest.raises(RateLimitExceeded):
+        rate_limiter.acquire(EndpointFamily.OFFER_REQUEST)
+    # families without a limit
+    rate_limiter.acquire(EndpointFamily.BRANCHES)
+
+
+def test_async_rate_limiter_reserves_file_buckets_off_event_loop(tmp_path):
+    rate_limiter = RateLimiter(
+        {
+            EndpointFamily.OFFER_REQUEST: RateLimit(rate=1),
+            EndpointFamily.BRANCHES: RateLimit(rate=1),
+        },
+        block=False,
+    )
+    file_bucket = FileTokenBucket(tmp_path / "bucket.json", RateLimit(rate=1))
+    rate_limiter.buckets[EndpointFamily.OFFER_REQUEST] = file_bucket
+    threads = {}
+
+    def record(family, reserve):
+        def wrapper(max_wait):
+            threads[family] = threading.current_thread()
+            return reserve(max_wait)
+
+        return wrapper
+
+    for family, bucket in rate_limiter.buckets.items():
+        bucket.reserve = record(family, bucket.reserve)  # type: ignore
+
+    async def run():
+        await rate_limiter.async_acquire(EndpointFamily.OFFER_REQUEST)
+        await rate_limiter.async_acquire(EndpointFamily.BRANCHES)
+        with pytest.raises(RateLimitExceeded):
+            await rate_limiter.async_acquire(EndpointFamily.OFFER_REQUEST)
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(run())
+
+    assert threads[EndpointFamily.OFFER_REQUEST] is not loop_thread
+    assert threads[EndpointFamily.BRANCHES] is loop_thread
@@ -0,0 +1,66 @@
+from diia_client.enums import ChangeAction
+from diia_client.sdk.reconciler import DesiredState, make_plan
+from diia_client.sdk.remote.model import Branch, Offer
+
+
+BRANCH = {
+    "name": "Main",
+    "email": "main@test.com",
+    "region": "Kyiv",
+    "district": "Kyiv",
+    "location": "Kyiv",
+    "street": "Khreshchatyk",
+    "house": "1",
+    "customFullName": None,
+    "customFullAddress": None,
+    "scopes": {"sharing": ["passport", "internal-passport"]},
+    "deliveryTypes": ["api"],
+    "offerRequestType": "dynamic",
+}
+OFFER = {"name": "Sharing", "scopes": {"sharing": ["passport"]}}
+
+
+def make_state(**changes):
+    return DesiredState.parse_obj(
+        {"branches": [{**BRANCH, **changes, "offers": [OFFER]}]}
+    )
+
+
+def test_plan_is_empty_for_current_state():
+    # order of scopes doesn't matter, missing lists are empty
+    branch = Branch.parse_obj(
+        {
+            **BRANCH,
+            "_id": "b1",
+            "scopes": {"sharing": ["internal-passport", "passport"], "diiaId": []},
+        }
+    )
+    offer = Offer.parse_obj({**OFFER, "_id": "o1"})
+
+    plan = make_plan(make_state(), [branch], {"b1": [offer]})
+
+    assert plan.empty
+
+
+def test_plan_changes():
+    current = [
+        Branch.parse_obj({**BRANCH, "_id": "b1"}),
+        Branch.parse_obj({**BRANCH, "_id": "b2", "name": "Old"}),
+    ]
+    offers = {
+        "b1": [
+            Offer.parse_obj({**OFFER, "_id": "o1", "scopes": {"diiaId": ["auth"]}}),
+            Offer.parse_obj({**OFFER, "_id": "o2", "name": "Old"}),
+        ]
+    }
+
+    plan = make_plan(make_state(email="new@test.com"), current, offers)
+
+    assert [c.action for c in plan.changes] == [
+        ChangeAction.UPDATE_BRANCH,
+        ChangeAction.REPLACE_OFFER,
+        ChangeAction.DELETE_OFFER,
+        ChangeAction.DELETE_BRANCH,
+    ]
+    assert plan.changes[0].diff == {"email": ("main@test.com", "new@test.com")}
+    assert '-/+ offer "Sharing" of branch "Main"' in plan.format()
@@ -0,0 +1,81 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from diia_client.sdk.http.requests import RequestsHTTPClient
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.release.wait(5)
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.release = threading.Event()
+    server.release.set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def test_pool_is_sized_and_connections_are_reused(server_url):
+    server, url = server_url
+    server.release.clear()
+
+    with RequestsHTTPClient(pool_maxsize=2, pool_block=True) as client:
+        with ThreadPoolExecutor(4) as executor:
+            futures = [executor.submit(client.get, f"{url}/{i}") for i in range(8)]
+            server.release.set()
+        assert [f.result() for f in futures] == [{"path": f"/{i}"} for i in range(8)]
+
+        (stats,) = client.pool_stats()
+        assert stats.host == f"http://127.0.0.1:{server.server_address[1]}"
+        # blocking pool of 2 opens at most 2 connections and keeps them alive
+        assert stats.num_connections == 2
+        assert stats.num_requests == 8
+        assert stats.idle_connections == 2
+
+
+def test_close_drops_pooled_connections(server_url):
+    _, url = server_url
+    client = RequestsHTTPClient()
+    client.get(url)
+    assert client.pool_stats()
+
+    client.close()
+
+    assert client.pool_stats() == []
+
+
+def test_session_of_caller_keeps_its_adapters(server_url):
+    _, url = server_url
+    session = requests.Session()
+    adapter = HTTPAdapter(max_retries=3, pool_maxsize=1)
+    session.mount("http://", adapter)
+
+    with RequestsHTTPClient(pool_maxsize=5, session=session) as client:
+        assert client.get(url) == {"path": "/"}
+        assert session.get_adapter(url) is adapter
+        (stats,) = client.pool_stats()
+        assert stats.num_requests == 1
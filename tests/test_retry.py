@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+from diia_client.sdk.remote.retry import RetryBudget, RetryPolicy
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, status_code: int, headers: dict = None) -> None:
+        super().__init__(status_code)
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+def retry_delay(policy: RetryPolicy, error: Exception, idempotent: bool = True):
+    return policy.on_failure(
+        error, method="GET", url="url", attempt=1, duration=0, idempotent=idempotent
+    )
+
+
+def test_retry_only_retryable_errors():
+    policy = RetryPolicy(budget=None)
+
+    assert retry_delay(policy, FakeHTTPError(502)) is not None
+    assert retry_delay(policy, FakeHTTPError(400)) is None
+    assert retry_delay(policy, FakeHTTPError(502), idempotent=False) is None
+    assert retry_delay(policy, FakeHTTPError(429), idempotent=False) is not None
+
+
+def test_retry_after_honoured():
+    policy = RetryPolicy(budget=None, backoff_max=0, max_retry_after=10)
+
+    assert retry_delay(policy, FakeHTTPError(503, {"Retry-After": "3"})) == 3
+    assert retry_delay(policy, FakeHTTPError(503, {"Retry-After": "60"})) is None
+
+
+def test_retry_budget_stops_retries():
+    policy = RetryPolicy(budget=RetryBudget(max_tokens=10, token_ratio=3))
+
+    delays = [retry_delay(policy, FakeHTTPError(502)) for _ in range(6)]
+    assert [delay is not None for delay in delays] == [True] * 4 + [False] * 2
+
+    policy.on_success(method="GET", url="url", attempt=1, duration=0)
+    assert retry_delay(policy, FakeHTTPError(502)) is not None
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import threading
+import time
+from typing import List, Optional
+
+import pytest
+
+from diia_client.sdk.http.base_client import (
+    DEFAULT_TIMEOUT,
+    AbstractHTTPCLient,
+    TimeoutValue,
+)
+from diia_client.sdk.service import session_token_service
+from diia_client.sdk.service.session_token_service import (
+    AsyncSessionTokenService,
+    SessionTokenService,
+)
+from diia_client.sdk.token_store import FileTokenStore, MemoryTokenStore
+from diia_client.types import DataDict, StrDict
+
+
+class FakeAuthHTTPClient(AbstractHTTPCLient):
+    def __init__(self, tokens: List[str], delay: float = 0) -> None:
+        self.tokens = tokens
+        self.delay = delay
+        self.calls = 0
+
+    def get(
+        self,
+        url: str,
+        params: Optional[DataDict] = None,
+        headers: Optional[StrDict] = None,
+        timeout: TimeoutValue = DEFAULT_TIMEOUT,
+    ) -> DataDict:
+        time.sleep(self.delay)
+        self.calls += 1
+        return {"token": self.tokens[min(self.calls, len(self.tokens)) - 1]}
+
+    def post(self, *args, **kwargs):  # type: ignore
+        raise NotImplementedError()
+
+    def put(self, *args, **kwargs):  # type: ignore
+        raise NotImplementedError()
+
+    def delete(self, *args, **kwargs):  # type: ignore
+        raise NotImplementedError()
+
+
+class SlowLockTokenStore(MemoryTokenStore):
+    def __init__(self) -> None:
+        super().__init__()
+        self.unblock = threading.Event()
+        self.released = threading.Event()
+
+    def acquire_lock(self, key: str) -> None:
+        self.unblock.wait()
+        super().acquire_lock(key)
+
+    def release_lock(self, key: str) -> None:
+        super().release_lock(key)
+        self.released.set()
+
+
+def test_session_token_obtained_once_by_concurrent_callers():
+    http_client = FakeAuthHTTPClient(["t1"], delay=0.1)
+    service = SessionTokenService("acquirer", "host", http_client)
+
+    threads = [threading.Thread(target=service.get_session_token) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    service.close()
+
+    assert http_client.calls == 1
+    assert service.get_session_token() == "t1"
+
+
+def test_session_token_refreshed_in_background(monkeypatch):
+    monkeypatch.setattr(session_token_service, "SESSION_TOKEN_TIME_TO_LIVE", 2)
+    http_client = FakeAuthHTTPClient(["t1", "t2", "t3"])
+    service = SessionTokenService("acquirer", "host", http_client, refresh_margin=1.7)
+
+    assert service.get_session_token() == "t1"
+    time.sleep(0.45)
+    service.close()
+
+    assert http_client.calls == 2
+    assert service.get_session_token() == "t2"
+
+
+def test_session_token_shared_via_file_token_store(tmp_path):
+    token_store = FileTokenStore(tmp_path / "tokens.json")
+    first_client = FakeAuthHTTPClient(["t1"])
+    second_client = FakeAuthHTTPClient(["t2"])
+    first = SessionTokenService(
+        "acquirer", "host", first_client, token_store=token_store
+    )
+    second = SessionTokenService(
+        "acquirer", "host", second_client, token_store=token_store
+    )
+
+    assert first.get_session_token() == "t1"
+    assert second.get_session_token() == "t1"
+    first.close()
+    second.close()
+
+    assert first_client.calls == 1
+    assert second_client.calls == 0
+
+
+def test_file_token_store_of_unexpected_shape_is_empty(tmp_path):
+    path = tmp_path / "tokens.json"
+    token_store = FileTokenStore(path)
+
+    for content in ("[]", '{"acquirer": 1}', "not json"):
+        path.write_text(content)
+        assert token_store.get("acquirer") is None
+
+    service = SessionTokenService(
+        "acquirer", "host", FakeAuthHTTPClient(["t1"]), token_store=token_store
+    )
+    assert service.get_session_token() == "t1"
+    service.close()
+    # the corrupt file is replaced
+    assert len(json.loads(path.read_text())) == 1
+
+
+def test_invalidated_session_token_replaced_once(monkeypatch):
+    monkeypatch.setattr(session_token_service, "SESSION_TOKEN_INVALIDATION_COOLDOWN", 0)
+    http_client = FakeAuthHTTPClient(["t1", "t2", "t3"])
+    service = SessionTokenService("acquirer", "host", http_client)
+    stale_token = service.get_session_token()
+
+    assert service.invalidate(stale_token) == "t2"
+    assert service.invalidate(stale_token) == "t2"
+    service.close()
+
+    assert http_client.calls == 2
+
+
+def test_store_lock_released_if_waiter_cancelled():
+    token_store = SlowLockTokenStore()
+
+    async def run():
+        service = AsyncSessionTokenService(
+            "acquirer",
+            "host",
+            http_client=None,  # type: ignore
+            token_store=token_store,
+        )
+        task = asyncio.ensure_future(service.get_session_token())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        token_store.unblock.set()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, token_store.released.wait, 5)
+
+    assert asyncio.run(run())
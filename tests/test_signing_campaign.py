@@ -0,0 +1,114 @@
+import asyncio
+import base64
+import json
+import threading
+
+import pytest
+
+from diia_client.crypto.base_service import AbstractCryptoService
+from diia_client.sdk.model import File
+from diia_client.sdk.service.sign_service import AsyncSignService, SignService
+
+
+class CountingCryptoService(AbstractCryptoService):
+    def __init__(self):
+        self.calls = 0
+
+    def decrypt(self, encrypted_data):
+        raise NotImplementedError
+
+    def calc_hash(self, data):
+        self.calls += 1
+        return data
+
+
+class FakeDiiaApi:
+    def __init__(self):
+        self.request_ids = []
+        self.lock = threading.Lock()
+
+    def get_deep_link(self, *, branch_id, offer_id, request_id, hashed_files):
+        with self.lock:
+            self.request_ids.append(request_id)
+        return f"link/{offer_id}/{request_id}/{hashed_files[0].filehash}"
+
+
+class AsyncFakeDiiaApi(FakeDiiaApi):
+    async def get_deep_link(self, **kwargs):
+        await asyncio.sleep(0)
+        return super().get_deep_link(**kwargs)
+
+
+def signature_package_data(request_id):
+    headers = {
+        "x-document-request-trace-id": request_id,
+        "x-diia-id-action": "hashedFilesSigning",
+    }
+    data = {"signedItems": [{"name": "contract.pdf", "signature": "sig"}]}
+    return headers, base64.b64encode(json.dumps(data).encode()).decode()
+
+
+def test_campaign_hashes_files_once_and_tracks_packages():
+    crypto_service = CountingCryptoService()
+    diia_api = FakeDiiaApi()
+    service = SignService(diia_api=diia_api, crypto_service=crypto_service)
+    request_ids = [f"r{i}" for i in range(10)] + ["r0"]
+
+    campaign = service.start_signing_campaign(
+        "b", "o", [File("contract.pdf", b"data")], request_ids, campaign_id="c"
+    )
+    results = list(service.get_campaign_deep_links(campaign, max_concurrency=4))
+
+    assert crypto_service.calls == 1
+    assert sorted(diia_api.request_ids) == sorted(request_ids[:10])
+    assert {r.item: r.result for r in results} == {
+        r: f"link/o/{r}/ZGF0YQ==" for r in request_ids
+    }
+    assert campaign.pending() == request_ids[:10]
+
+    service.decode_signature_package(*signature_package_data("r3"))
+    service.decode_signature_package(*signature_package_data("other"))
+
+    assert list(campaign.received()) == ["r3"]
+    assert "r3" not in campaign.pending()
+    assert not campaign.is_complete()
+    with pytest.raises(ValueError):
+        service.start_signing_campaign("b", "o", [], ["r1", "r20"])
+    with pytest.raises(ValueError):
+        service.get_campaign_deep_links(campaign, request_ids=["r20"])
+
+
+def test_async_campaign_streams_deep_links():
+    service = AsyncSignService(
+        diia_api=AsyncFakeDiiaApi(), crypto_service=CountingCryptoService()
+    )
+
+    async def run():
+        campaign = await service.start_signing_campaign(
+            "b", "o", [File("contract.pdf", b"data")], ["r1", "r2", "r3"]
+        )
+        return [
+            result.item
+            async for result in service.get_campaign_deep_links(
+                campaign, request_ids=["r2", "r3"]
+            )
+        ]
+
+    assert sorted(asyncio.run(run())) == ["r2", "r3"]
+
+
+def test_campaign_forgotten_when_complete():
+    service = SignService(
+        diia_api=FakeDiiaApi(), crypto_service=CountingCryptoService()
+    )
+    campaign = service.start_signing_campaign(
+        "b", "o", [], ["r1", "r2"], campaign_id="c", forget_when_complete=True
+    )
+
+    service.decode_signature_package(*signature_package_data("r1"))
+    assert service.campaigns.get("c") is campaign
+    service.decode_signature_package(*signature_package_data("r2"))
+
+    assert campaign.is_complete()
+    assert service.campaigns.get("c") is None
+    assert service.campaigns.find("r1") is None
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from diia_client.sdk.remote.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_single_flight_shares_call():
+    single_flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"total": 1}
+
+    with ThreadPoolExecutor(4) as executor:
+        futures = [executor.submit(single_flight.do, "key", fetch)]
+        while not calls:
+            pass
+        futures += [executor.submit(single_flight.do, "key", fetch) for _ in range(3)]
+        time.sleep(0.1)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+    # completed calls aren't reused
+    assert single_flight.do("key", fetch) == {"total": 1}
+    assert len(calls) == 2
+
+
+def test_async_single_flight_shares_call():
+    single_flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"total": 1}
+
+    async def main():
+        leader = asyncio.ensure_future(single_flight.do("key", fetch))
+        followers = [single_flight.do("key", fetch) for _ in range(3)]
+        await asyncio.sleep(0)
+        # cancellation of the leader doesn't affect other callers
+        leader.cancel()
+        return await asyncio.gather(*followers)
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert results == [{"total": 1}] * 3
@@ -0,0 +1,92 @@
+import base64
+import json
+import mmap
+import os
+from pathlib import Path
+
+import pytest
+
+from diia_client.crypto.uapki import uapkic
+from diia_client.crypto.uapki.uapki import VENDOR_DIR, UAPKICryptoService
+from diia_client.crypto.uapki.vendor.wrapper import UAPKI
+
+
+TEST_HASH = base64.b64decode("HCJOaeQHM/5LwMr7Mfj7mA7q8l6Dt6ADHUW76Lwv+J4=")
+
+
+@pytest.fixture
+def lib():
+    try:
+        return uapkic.UAPKIC(str(VENDOR_DIR))
+    except OSError as e:
+        pytest.skip(f"uapkic can't be loaded: {e}")
+
+
+def test_digest_of_buffers(lib):
+    data = b"test data"
+
+    assert lib.digest(data) == TEST_HASH
+    assert lib.digest(bytearray(data)) == TEST_HASH
+    assert lib.digest(memoryview(b"xx" + data)[2:]) == TEST_HASH
+
+
+def test_digest_of_empty_data(lib):
+    empty_hash = lib.digest(b"")
+
+    assert lib.digest(bytearray()) == empty_hash
+    with lib.new_hash() as hash_:
+        hash_.update(bytearray())
+        hash_.update(b"test data")
+        hash_.update(memoryview(bytearray()))
+        assert hash_.digest() == TEST_HASH
+
+
+def test_digest_by_chunks(lib, monkeypatch, tmp_path):
+    monkeypatch.setattr(uapkic, "CHUNK_SIZE", 3)
+    path = tmp_path / "data"
+    path.write_bytes(b"test data")
+
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        assert lib.digest(m) == TEST_HASH
+
+    with lib.new_hash() as hash_:
+        hash_.update(b"test ")
+        hash_.update(bytearray(b"data"))
+        assert hash_.digest() == TEST_HASH
+
+
+def test_digest_many_keeps_order(lib):
+    data = [b"test data", b"other", bytearray(b"test data")] * 3
+
+    hashes = lib.digest_many(data, workers=4)
+
+    assert hashes == [lib.digest(item) for item in data]
+    assert hashes[0] == hashes[2] == TEST_HASH != hashes[1]
+
+
+def test_wrapper_returns_results():
+    wrapper = UAPKI()
+    try:
+        wrapper.Init(json.dumps({"global": {}}), f"{VENDOR_DIR}/")
+    except OSError as e:
+        pytest.skip(f"UAPKI wrapper can't be loaded: {e}")
+
+    result = wrapper.DigestGost34311(base64.b64encode(b"test data"))
+
+    assert result["errorCode"] != 0
+    assert result["method"] == "DIGEST"
+
+
+def test_digest_matches_wrapper(lib):
+    # UAPKI needs a key to be initialized: a JSON file of UAPKICryptoService
+    # arguments
+    config = os.environ.get("UAPKI_TEST_CONFIG")
+    if not config:
+        pytest.skip("UAPKI_TEST_CONFIG isn't set")
+    service = UAPKICryptoService(**json.loads(Path(config).read_text()))
+    payloads = [b"", b"test data", os.urandom(3 * uapkic.CHUNK_SIZE + 1)]
+
+    for data in payloads:
+        result = service._uapki.DigestGost34311(base64.b64encode(data))
+        service._check_result(result, "Calculate hash error")
+        assert lib.digest(data) == base64.b64decode(result["result"]["bytes"])
@@ -0,0 +1,61 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from diia_client.sdk.cache import CacheConfig
+from diia_client.sdk.service.validation_service import ValidationService
+
+
+class FakeDiiaApi:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        self.release = threading.Event()
+        self.release.set()
+
+    def validate_document_by_barcode(self, *, branch_id, barcode):
+        self.calls += 1
+        self.release.wait()
+        if self.fail:
+            raise ValueError(barcode)
+        return barcode.startswith("valid")
+
+
+def test_validation_results_are_cached_for_ttl():
+    diia_api = FakeDiiaApi()
+    service = ValidationService(diia_api=diia_api, cache_config=CacheConfig(ttl=0.1))
+
+    first = service.get_validation_result("b", "valid-1")
+    second = service.get_validation_result("b", "valid-1")
+    time.sleep(0.1)
+    third = service.get_validation_result("b", "valid-1")
+
+    assert (first.is_valid, first.from_cache) == (True, False)
+    assert (second.is_valid, second.from_cache) == (True, True)
+    assert not third.from_cache
+    assert diia_api.calls == 2
+
+    diia_api.fail = True
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            service.get_validation_result("b", "other")
+    assert diia_api.calls == 4
+
+
+def test_concurrent_validations_share_request():
+    diia_api = FakeDiiaApi()
+    diia_api.release.clear()
+    service = ValidationService(diia_api=diia_api, cache_config=CacheConfig(ttl=10))
+
+    with ThreadPoolExecutor(4) as executor:
+        futures = [
+            executor.submit(service.validate_document_by_barcode, "b", "invalid")
+            for _ in range(4)
+        ]
+        time.sleep(0.1)
+        diia_api.release.set()
+
+    assert [future.result() for future in futures] == [False] * 4
+    assert diia_api.calls == 1